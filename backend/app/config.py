@@ -10,6 +10,9 @@ class Config:
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
     CACHE_TYPE = 'redis'
     CACHE_REDIS_URL = REDIS_URL
+    INGEST_TOKEN = os.environ.get('INGEST_TOKEN')  # /api/jobs/batch 需携带 X-Ingest-Token，未设置时该接口关闭
+    INGEST_MAX_BYTES = int(os.environ.get('INGEST_MAX_BYTES') or 64 * 1024 * 1024)  # 批量入库请求体解压后的上限
+    INGEST_MAX_LINE_BYTES = 1024 * 1024  # 单条记录的上限
 
 class DevelopmentConfig(Config):
     DEBUG = True
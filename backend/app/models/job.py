@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
-from typing import Dict, Any
-from sqlalchemy import Index, Text
-from sqlalchemy.dialects.postgresql import JSONB
+from typing import Dict, Any, List, Tuple
+from sqlalchemy import Index, Text, func, or_, literal_column
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from .. import db
 
 class Job(db.Model):
@@ -85,3 +85,48 @@ class Job(db.Model):
             new_job = cls(**job_data)
             db.session.add(new_job)
             return new_job
+    
+    # 批量入库时由爬虫写入的列（投递状态、创建时间由系统/用户维护）
+    INGEST_COLUMNS = (
+        'company_name', 'company_type', 'industry', 'recruitment_type', 'location', 'target_group',
+        'job_name', 'description', 'requirements', 'deadline', 'url', 'announcement', 'referral_code',
+        'metadata_info'
+    )
+    
+    @classmethod
+    def bulk_upsert(cls, rows: List[Dict[str, Any]]) -> Dict[Tuple[str, str], str]:
+        """批量插入或更新（一条 INSERT ... ON CONFLICT），返回 (source, source_id) -> inserted/updated/unchanged
+        
+        rows 中的 (source, source_id) 必须唯一；内容未变化的记录不会被改写，updated_at 保持不变。
+        调用方负责提交事务。仅支持PostgreSQL（ON CONFLICT 和 xmax 判断是否新插入）。
+        """
+        if not rows:
+            return {}
+        
+        dialect = db.session.get_bind().dialect.name
+        if dialect != 'postgresql':
+            raise NotImplementedError(f'Job.bulk_upsert requires PostgreSQL, got {dialect}')
+        
+        table = cls.__table__
+        now = datetime.now(timezone.utc)
+        values = [
+            {**row, 'delivery_status': '未投递', 'created_at': now, 'updated_at': now}
+            for row in rows
+        ]
+        
+        stmt = pg_insert(table).values(values)
+        merged = {
+            column: func.coalesce(stmt.excluded[column], table.c[column])
+            for column in cls.INGEST_COLUMNS
+        }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['source', 'source_id'],
+            set_={**merged, 'updated_at': stmt.excluded.updated_at},
+            # 只有内容真正变化时才更新
+            where=or_(*(table.c[column].is_distinct_from(value) for column, value in merged.items()))
+        ).returning(table.c.source, table.c.source_id, (literal_column('xmax') == 0).label('inserted'))
+        
+        outcomes = {(row['source'], row['source_id']): 'unchanged' for row in rows}
+        for result in db.session.execute(stmt):
+            outcomes[(result.source, result.source_id)] = 'inserted' if result.inserted else 'updated'
+        return outcomes
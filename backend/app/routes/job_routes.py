@@ -1,4 +1,7 @@
-from flask import Blueprint, request, jsonify
+import hmac
+import json
+import zlib
+from flask import Blueprint, Response, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, current_user
 from flask_caching import cache
 from sqlalchemy import or_, and_
@@ -11,6 +14,11 @@ from ..utils.pagination import paginate_results
 from datetime import datetime, timezone
 from .. import db, cache, limiter  # 从app包中导入已初始化的实例
 
+try:
+    import msgpack
+except ImportError:  # msgpack为可选依赖，仅 application/msgpack 请求需要
+    msgpack = None
+
 # 初始化蓝图
 job_bp = Blueprint('job', __name__)
 
@@ -143,6 +151,231 @@ def update_delivery_status(job_id):
         'status': data['status']
     })
 
+# 批量入库：每个分块一个事务
+INGEST_CHUNK_SIZE = 500
+INGEST_READ_SIZE = 64 * 1024
+INGEST_REQUIRED_FIELDS = ('source', 'source_id', 'job_name', 'company_name')
+
+class IngestTooLarge(Exception):
+    """请求体（解压后）或单条记录超过上限"""
+    pass
+
+def _limit_bytes(chunks, limit):
+    """累计字节数超过 limit 时中止"""
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        if total > limit:
+            raise IngestTooLarge(f'Request body exceeds {limit} bytes')
+        yield chunk
+
+def _iter_request_bytes():
+    """按块读取请求体，Content-Encoding: gzip 时流式解压（每次最多解压出 INGEST_READ_SIZE 字节，防止压缩炸弹）"""
+    decompressor = None
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    
+    def read():
+        while True:
+            chunk = request.stream.read(INGEST_READ_SIZE)
+            if not chunk:
+                break
+            if decompressor is None:
+                yield chunk
+                continue
+            while chunk:
+                yield decompressor.decompress(chunk, INGEST_READ_SIZE)
+                chunk = decompressor.unconsumed_tail
+        if decompressor:
+            yield decompressor.flush()
+    
+    return _limit_bytes(read(), current_app.config['INGEST_MAX_BYTES'])
+
+def _split_lines(chunks, max_line):
+    """把字节块切分为行；只在新到达的字节中查找换行，单行超过 max_line 字节时中止"""
+    buffer = bytearray()
+    for chunk in chunks:
+        searched = len(buffer)
+        buffer += chunk
+        start = 0
+        end = buffer.find(b'\n', searched)
+        while end != -1:
+            yield bytes(buffer[start:end])
+            start = end + 1
+            end = buffer.find(b'\n', start)
+        del buffer[:start]
+        if len(buffer) > max_line:
+            raise IngestTooLarge(f'Record exceeds {max_line} bytes')
+    if buffer:
+        yield bytes(buffer)
+
+def _iter_ndjson_records():
+    """逐行解析NDJSON，无法解析的行以异常对象产出"""
+    for line in _split_lines(_iter_request_bytes(), current_app.config['INGEST_MAX_LINE_BYTES']):
+        if line.strip():
+            yield _decode_json_line(line)
+
+def _decode_json_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f'Invalid JSON: {e}')
+
+def _iter_msgpack_records():
+    unpacker = msgpack.Unpacker(raw=False, max_buffer_size=current_app.config['INGEST_MAX_LINE_BYTES'])
+    for chunk in _iter_request_bytes():
+        try:
+            unpacker.feed(chunk)
+        except msgpack.BufferFull:
+            raise IngestTooLarge(f'Record exceeds {current_app.config["INGEST_MAX_LINE_BYTES"]} bytes')
+        yield from unpacker
+
+def _normalize_ingest_record(record):
+    """校验并转换为 jobs 表的一行，返回 (row, error)"""
+    if isinstance(record, Exception):
+        return None, str(record)
+    if not isinstance(record, dict):
+        return None, 'Record must be an object'
+    
+    missing = [field for field in INGEST_REQUIRED_FIELDS if not record.get(field)]
+    if missing:
+        return None, f'Missing required fields: {", ".join(missing)}'
+    
+    row = {'source': str(record['source']), 'source_id': str(record['source_id'])}
+    extras = {}
+    for key, value in record.items():
+        if key in Job.INGEST_COLUMNS:
+            row[key] = value
+        elif key not in ('source', 'source_id', 'metadata') and value is not None:
+            extras[key] = value
+    
+    # 没有对应列的字段并入元数据
+    metadata = {**extras, **(record.get('metadata') or {})}
+    row['metadata_info'] = metadata or None
+    
+    for column in Job.INGEST_COLUMNS + ('source', 'source_id'):
+        length = getattr(Job.__table__.c[column].type, 'length', None)
+        if length and isinstance(row.get(column), str) and len(row[column]) > length:
+            return None, f'Field {column} exceeds {length} characters'
+    
+    if row.get('deadline'):
+        try:
+            row['deadline'] = datetime.fromisoformat(str(row['deadline']))
+        except ValueError:
+            return None, f'Invalid deadline: {row["deadline"]}'
+    
+    return row, None
+
+def _flush_ingest_chunk(chunk):
+    """在一个事务中写入分块，返回每条记录的结果"""
+    rows = [row for _, row in chunk]
+    try:
+        outcomes = Job.bulk_upsert(rows)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'Batch ingest chunk failed: {e}')
+        return [
+            {'index': index, 'source_id': row['source_id'], 'status': 'rejected', 'error': 'Database error'}
+            for index, row in chunk
+        ]
+    
+    return [
+        {'index': index, 'source_id': row['source_id'], 'status': outcomes[(row['source'], row['source_id'])]}
+        for index, row in chunk
+    ]
+
+def _ingest_records(records, summary):
+    """按固定大小分块校验和入库，逐块产出每条记录的结果
+    
+    records 可以是边读请求体边解析的生成器，每凑满一块就写入，内存中最多保留一个分块。
+    """
+    chunk, keys = [], set()
+    try:
+        for index, record in enumerate(records):
+            row, error = _normalize_ingest_record(record)
+            if error:
+                summary['rejected'] += 1
+                source_id = record.get('source_id') if isinstance(record, dict) else None
+                yield [{'index': index, 'source_id': source_id, 'status': 'rejected', 'error': error}]
+                continue
+            
+            # 同一分块内出现重复键时先提交前面的记录，保证每条记录都有真实结果
+            key = (row['source'], row['source_id'])
+            if key in keys or len(chunk) >= INGEST_CHUNK_SIZE:
+                yield _count_outcomes(_flush_ingest_chunk(chunk), summary)
+                chunk, keys = [], set()
+            chunk.append((index, row))
+            keys.add(key)
+        
+        if chunk:
+            yield _count_outcomes(_flush_ingest_chunk(chunk), summary)
+    finally:
+        # 请求体中途超限时，之前的分块已经提交，同样需要清除缓存
+        if summary['inserted'] or summary['updated']:
+            cache.clear()
+
+def _count_outcomes(results, summary):
+    for result in results:
+        summary[result['status']] += 1
+    return results
+
+@job_bp.route('/batch', methods=['POST'])
+@log_request
+@rate_limit(limit="1200 per minute")  # 每个爬虫每5秒左右入库一批，多个工作进程共用出口IP
+def batch_ingest():
+    """批量入库职位（爬虫使用，需要 X-Ingest-Token；依赖PostgreSQL的 ON CONFLICT）
+    
+    支持 application/x-ndjson（可 gzip）与 application/msgpack 请求体，按分块一个事务写入，
+    响应为NDJSON：每条记录一行结果（inserted/updated/unchanged/rejected），最后一行为汇总。
+    请求体边读边解析、每凑满一块就入库，内存中只保留每条记录的简短结果；请求体读完后才开始写响应，
+    客户端发送完请求体才开始读响应也不会死锁。请求体解压后超过 INGEST_MAX_BYTES 时返回413，
+    其中的 summary 为超限前已经入库的部分。
+    兼容旧的 application/json {"jobs": [...]} 请求体。
+    """
+    token = current_app.config.get('INGEST_TOKEN')
+    if not token:
+        return jsonify({'error': 'Batch ingest is disabled: INGEST_TOKEN is not configured'}), 503
+    if not hmac.compare_digest(request.headers.get('X-Ingest-Token', ''), token):
+        return jsonify({'error': 'Unauthorized'}), 401
+    if db.engine.dialect.name != 'postgresql':
+        return jsonify({'error': 'Batch ingest requires PostgreSQL'}), 501
+    
+    content_type = request.mimetype
+    summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+    max_bytes = current_app.config['INGEST_MAX_BYTES']
+    if request.content_length and request.content_length > max_bytes:
+        return jsonify({'error': f'Request body exceeds {max_bytes} bytes'}), 413
+    
+    if content_type == 'application/json':
+        payload = request.get_json(silent=True) or {}
+        jobs = payload.get('jobs')
+        if not isinstance(jobs, list):
+            return jsonify({'error': 'Request body must be {"jobs": [...]}'}), 400
+        results = [result for results in _ingest_records(jobs, summary) for result in results]
+        return jsonify({'summary': summary, 'results': results})
+    
+    if content_type in ('application/x-ndjson', 'application/jsonl'):
+        parse = _iter_ndjson_records
+    elif content_type in ('application/msgpack', 'application/x-msgpack'):
+        if msgpack is None:
+            return jsonify({'error': 'msgpack is not supported on this server'}), 415
+        parse = _iter_msgpack_records
+    else:
+        return jsonify({'error': f'Unsupported content type: {content_type}'}), 415
+    
+    try:
+        results = [result for chunk in _ingest_records(parse(), summary) for result in chunk]
+    except IngestTooLarge as e:
+        return jsonify({'error': str(e), 'summary': summary}), 413
+    
+    def generate():
+        for result in results:
+            yield json.dumps(result, ensure_ascii=False) + '\n'
+        yield json.dumps({'summary': summary}) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
 @job_bp.route('/<int:job_id>/deliver', methods=['POST'])
 @jwt_required()
 @log_request
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawler.core.crawler_manager import CrawlerConfig, setup_logging
+from crawler.core.async_engine import AsyncFetchEngine
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """本地替身站点：每个请求固定延迟后返回一段HTML，并发超过 capacity 时返回429"""
+    latency = 0.2
+    capacity = 0
+    in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with SlowHandler.lock:
+            SlowHandler.in_flight += 1
+            overloaded = 0 < self.capacity < SlowHandler.in_flight
+        try:
+            if overloaded:
+                self.send_response(429)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            time.sleep(self.latency)
+            self._send_page()
+        finally:
+            with SlowHandler.lock:
+                SlowHandler.in_flight -= 1
+
+    def _send_page(self):
+        body = f"<html><body><div class='j_joblist'>{self.path}</div></body></html>".encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stand_in(latency: float, capacity: int = 0) -> ThreadingHTTPServer:
+    """启动本地HTTP替身服务"""
+    SlowHandler.latency = latency
+    SlowHandler.capacity = capacity
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+async def run_engine(base_url: str, pages: int, per_host: int, rate: float, adaptive: bool) -> float:
+    """用指定的主机并发数抓取 pages 个页面，返回耗时"""
+    config = CrawlerConfig(max_per_host=per_host, host_rate=rate, adaptive_concurrency=adaptive,
+                           retry_base_delay=0.1, proxy_enabled=False)
+    urls = [f"{base_url}/job/{i}" for i in range(pages)]
+
+    start = time.time()
+    async with AsyncFetchEngine(config) as engine:
+        results = await engine.fetch_many(urls)
+    elapsed = time.time() - start
+
+    failures = sum(1 for r in results if isinstance(r, Exception))
+    stats = engine.retry_budget.stats
+    print(f"per_host={per_host:<3} pages={pages} failures={failures} attempts={stats.attempts} time={elapsed:.2f}s")
+    if adaptive:
+        print(f"  windows: {engine.concurrency.get_stats()}")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description='异步抓取引擎基准测试（本地替身站点）')
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--rate', type=float, default=50.0, help='每个主机每秒允许的请求数')
+    parser.add_argument('--per-host', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--capacity', type=int, default=0, help='替身站点可承受的并发数，超出返回429（0为不限）')
+    parser.add_argument('--adaptive', action='store_true', help='启用AIMD自适应并发（per-host 作为上限）')
+    args = parser.parse_args()
+
+    setup_logging()
+    server = start_stand_in(args.latency, args.capacity)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        baseline = None
+        for per_host in args.per_host:
+            elapsed = asyncio.run(run_engine(base_url, args.pages, per_host, args.rate, args.adaptive))
+            if baseline is None:
+                baseline = elapsed
+            else:
+                print(f"  speedup vs per_host={args.per_host[0]}: {baseline / elapsed:.1f}x")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import copy
+import glob
+import importlib
+import time
+from urllib.parse import urlparse
+
+from tests.pages_51job import build_detail_page, build_list_page
+
+# 站点模块名以数字开头，只能通过 importlib 导入
+job51 = importlib.import_module('crawler.sites.51job_crawler')
+
+def load_pages(pattern: str):
+    return [open(path, encoding='utf-8').read() for path in sorted(glob.glob(pattern))] if pattern else []
+
+def load_archive(directory: str):
+    """从抓取归档中读取页面：jobs.51job.com 下为详情页，其余为列表页"""
+    from crawler.core.archive import ArchiveReader
+    list_pages, detail_pages = [], []
+    if directory:
+        with ArchiveReader(directory) as reader:
+            for page in reader:
+                pages = detail_pages if urlparse(page.url).netloc == 'jobs.51job.com' else list_pages
+                pages.append(page.text)
+    return list_pages, detail_pages
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='51job 解析后端基准：快速后端与BeautifulSoup参考实现的一致性和速度')
+    parser.add_argument('--list-pages', default='', help='录制的列表页HTML文件（glob），缺省时生成样例页面')
+    parser.add_argument('--detail-pages', default='', help='录制的详情页HTML文件（glob）')
+    parser.add_argument('--archive', default='', help='抓取归档目录（archive_enabled 时写入的 archive/51job）')
+    parser.add_argument('--items', type=int, default=50, help='样例列表页的职位数')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    archived_list, archived_detail = load_archive(args.archive)
+    list_pages = load_pages(args.list_pages) + archived_list or [build_list_page(args.items)]
+    detail_pages = load_pages(args.detail_pages) + archived_detail or [build_detail_page()]
+    base_job = {'source': '51job', 'metadata': {}}
+
+    # 一致性检查
+    mismatches = 0
+    for index, page in enumerate(list_pages):
+        if job51.parse_job_list(page) != job51.fast_parse_job_list(page):
+            mismatches += 1
+            print(f"List page {index} differs")
+    for index, page in enumerate(detail_pages):
+        reference = job51.parse_job_detail(page, copy.deepcopy(base_job))
+        fast = job51.fast_parse_job_detail(page, copy.deepcopy(base_job))
+        if reference != fast:
+            mismatches += 1
+            print(f"Detail page {index} differs:\n  soup: {reference}\n  lxml: {fast}")
+
+    # 速度对比
+    for kind, pages, reference, fast in (
+        ('list', list_pages, lambda p: job51.parse_job_list(p), lambda p: job51.fast_parse_job_list(p)),
+        ('detail', detail_pages, lambda p: job51.parse_job_detail(p, copy.deepcopy(base_job)),
+         lambda p: job51.fast_parse_job_detail(p, copy.deepcopy(base_job))),
+    ):
+        soup_time = timed(lambda: [reference(page) for page in pages], args.repeat)
+        lxml_time = timed(lambda: [fast(page) for page in pages], args.repeat)
+        count = len(pages) * args.repeat
+        print(f"{kind:6s} soup: {soup_time / count * 1000:.2f} ms/page  "
+              f"lxml: {lxml_time / count * 1000:.2f} ms/page  speedup: {soup_time / lxml_time:.1f}x")
+
+    print('Outputs identical' if not mismatches else f"{mismatches} pages differ")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import importlib
+import signal
+
+from crawler.core.crawler_manager import CrawlerConfig, CrawlerManager, setup_logging
+
+# 分布式模式可用的站点（模块名以数字开头，需要通过 importlib 导入）
+SITES = {
+    '51job': ('crawler.sites.51job_crawler', 'FiveOneJobCrawler'),
+}
+
+def build_manager(sites) -> CrawlerManager:
+    # 所有工作进程共享Redis令牌桶，保证整体不超过每个主机的请求预算
+    config = CrawlerConfig(rate_limiter_backend='redis')
+    manager = CrawlerManager(config)
+    for site in sites:
+        module_name, class_name = SITES[site]
+        manager.register_crawler(getattr(importlib.import_module(module_name), class_name))
+    return manager
+
+def main():
+    parser = argparse.ArgumentParser(description='分布式爬取：协调者入队任务，工作进程消费Redis任务队列')
+    parser.add_argument('role', choices=['coordinator', 'worker', 'stats', 'requeue-dead'])
+    parser.add_argument('--sites', nargs='+', default=list(SITES), choices=list(SITES))
+    parser.add_argument('--keyword', nargs='+', default=None, help='协调者入队的关键词')
+    parser.add_argument('--city', nargs='+', default=None, help='协调者入队的城市编码（51job jobArea）')
+    parser.add_argument('--max-tasks', type=int, default=None, help='工作进程处理满该数量后退出')
+    parser.add_argument('--idle-timeout', type=float, default=None, help='工作进程空闲该秒数后退出')
+    args = parser.parse_args()
+
+    setup_logging()
+    manager = build_manager(args.sites)
+
+    if args.role == 'coordinator':
+        manager.enqueue_all(keywords=args.keyword, cities=args.city)
+    elif args.role == 'worker':
+        worker = manager.create_worker()
+        # 收到终止信号时处理完当前这批任务再退出，未确认的任务在租约到期后由其他进程接手
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        signal.signal(signal.SIGINT, lambda *_: worker.stop())
+        worker.run(args.max_tasks, args.idle_timeout)
+    elif args.role == 'requeue-dead':
+        print(f"Requeued {manager.work_queue.requeue_dead()} dead tasks")
+    print(manager.work_queue.get_stats())
+
+if __name__ == "__main__":
+    main()
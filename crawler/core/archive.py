@@ -0,0 +1,376 @@
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstandard为可选依赖，未安装时归档使用gzip
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，每个写入端总是新建段文件
+    fcntl = None
+
+from .exceptions import CrawlerException
+
+logger = logging.getLogger('archive')
+
+CODEC_GZIP = 1
+CODEC_ZSTD = 2
+CODECS = {'gzip': CODEC_GZIP, 'zstd': CODEC_ZSTD}
+
+# 记录头：crc32(压缩正文)、压缩后长度、原始长度、抓取时间、状态码、URL长度、编码名长度、压缩算法
+RECORD = struct.Struct('<IIIdHIBB')
+# 索引项：URL哈希、抓取时间、记录偏移、记录总长度（按 URL哈希、抓取时间 排序）
+INDEX = struct.Struct('<QdQI')
+
+_SEGMENT_NAME = re.compile(r'^(\d{8})\.seg$')
+
+def url_key(url: str) -> int:
+    """索引使用的URL键（64位哈希，读取时再比对URL本身）"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def resolve_codec(codec: str) -> int:
+    """auto：安装了 zstandard 时用zstd，否则用gzip"""
+    if codec == 'auto':
+        return CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+    if codec not in CODECS:
+        raise CrawlerException(f"Unknown archive codec: {codec}")
+    if codec == 'zstd' and zstandard is None:
+        raise CrawlerException("zstandard is required for the zstd archive codec")
+    return CODECS[codec]
+
+def decompress(codec: int, payload) -> bytes:
+    """解压一条记录，payload 可以是 mmap 上的 memoryview（不复制输入）"""
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise CrawlerException("zstandard is required to read zstd archive records")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload, 31)
+
+def _segment_paths(directory: str, seq: int) -> Tuple[str, str]:
+    return os.path.join(directory, f"{seq:08d}.seg"), os.path.join(directory, f"{seq:08d}.idx")
+
+def _list_segments(directory: str) -> List[int]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(m.group(1)) for m in map(_SEGMENT_NAME.match, os.listdir(directory)) if m)
+
+def _try_lock(f) -> bool:
+    """对段文件加排他锁（不等待），已被其他写入端持有时返回False"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+class ArchivedPage:
+    """归档中的一条记录
+
+    payload 是段文件 mmap 上的 memoryview 切片（压缩后的正文，不复制），在读取器关闭前有效；
+    content / text 在访问时才解压。
+    """
+
+    __slots__ = ('url', 'fetched_at', 'status', 'encoding', 'codec', 'raw_size', 'payload')
+
+    def __init__(self, url: str, fetched_at: float, status: int, encoding: str, codec: int,
+                 raw_size: int, payload: memoryview):
+        self.url = url
+        self.fetched_at = fetched_at
+        self.status = status
+        self.encoding = encoding
+        self.codec = codec
+        self.raw_size = raw_size
+        self.payload = payload
+
+    @property
+    def content(self) -> bytes:
+        return decompress(self.codec, self.payload)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def __repr__(self) -> str:
+        return f"ArchivedPage({self.url!r}, fetched_at={self.fetched_at}, status={self.status}, size={self.raw_size})"
+
+def read_record(view: memoryview, offset: int) -> Optional[Tuple[ArchivedPage, int]]:
+    """读取 offset 处的记录，返回 (记录, 下一条记录的偏移)；记录不完整或校验失败时返回None"""
+    end = offset + RECORD.size
+    if end > len(view):
+        return None
+    crc, payload_size, raw_size, fetched_at, status, url_size, encoding_size, codec = RECORD.unpack_from(view, offset)
+    payload_start = end + url_size + encoding_size
+    next_offset = payload_start + payload_size
+    if next_offset > len(view):
+        return None
+    payload = view[payload_start:next_offset]
+    if zlib.crc32(payload) != crc:
+        payload.release()
+        return None
+    url = bytes(view[end:end + url_size]).decode('utf-8')
+    encoding = bytes(view[end + url_size:payload_start]).decode('ascii')
+    return ArchivedPage(url, fetched_at, status, encoding, codec, raw_size, payload), next_offset
+
+def iter_segment(view: memoryview) -> Iterator[Tuple[int, int, ArchivedPage]]:
+    """按写入顺序遍历段内的记录，产出 (偏移, 记录长度, 记录)，遇到不完整的末尾记录时停止"""
+    offset = 0
+    while True:
+        result = read_record(view, offset)
+        if result is None:
+            return
+        page, next_offset = result
+        yield offset, next_offset - offset, page
+        offset = next_offset
+
+def scan_segment(path: str) -> Tuple[List[Tuple[int, float, int, int]], int]:
+    """扫描未封存的段文件，返回 (索引项, 完整记录的结束偏移)"""
+    entries = []
+    end = 0
+    if os.path.getsize(path) == 0:
+        return entries, end
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        for offset, length, page in iter_segment(view):
+            entries.append((url_key(page.url), page.fetched_at, offset, length))
+            end = offset + length
+            page.payload.release()
+        view.release()
+    return entries, end
+
+class HtmlArchive:
+    """原始HTML归档（写入端）
+
+    每条响应单独压缩（zstd，未安装 zstandard 时为gzip）后追加到当前段文件 {序号}.seg，
+    段文件超过 segment_bytes 时封存：写出按 (URL哈希, 抓取时间) 排序的定长索引 {序号}.idx，读取端直接 mmap 二分查找。
+    未封存的段在重新打开时扫描重建索引，并截掉崩溃时写了一半的末尾记录。线程安全。
+    同一主机上的多个工作进程可以共用归档目录：写入端对当前段持有排他文件锁（fcntl.flock），
+    只接着写没有被其他进程锁定的未封存段，否则以 O_EXCL 新建下一个序号的段，各进程的记录不会写进同一个段。
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 256 * 1024 * 1024, codec: str = 'auto'):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.codec = resolve_codec(codec)
+        self.lock = threading.Lock()
+        self.local = threading.local()  # zstd压缩器不是线程安全的，每个线程一个
+        self.stats = {'records': 0, 'raw_bytes': 0, 'stored_bytes': 0, 'segments_sealed': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._open_segment()
+
+    @classmethod
+    def from_config(cls, config, name: str) -> 'HtmlArchive':
+        return cls(
+            os.path.join(config.archive_dir, name),
+            segment_bytes=config.archive_segment_bytes,
+            codec=config.archive_codec
+        )
+
+    def _open_segment(self) -> None:
+        """取得一个由本写入端独占的段：优先接着写未被锁定的未封存段，否则新建"""
+        segments = _list_segments(self.directory)
+        self.entries: List[Tuple[int, float, int, int]] = []
+        if fcntl is not None:
+            for seq in segments:
+                path, index_path = _segment_paths(self.directory, seq)
+                if os.path.exists(index_path):
+                    continue
+                f = open(path, 'ab')
+                # 加锁后再确认一次：封存方在写完索引之后才释放锁
+                if not _try_lock(f) or os.path.exists(index_path):
+                    f.close()
+                    continue
+                # 继续写入上次未封存的段
+                self.seq, self.file = seq, f
+                self.entries, end = scan_segment(path)
+                if end < os.path.getsize(path):
+                    logger.warning(f"Truncating incomplete archive record in {path} at offset {end}")
+                    f.truncate(end)
+                self.offset = end
+                return
+
+        seq = segments[-1] + 1 if segments else 1
+        while True:
+            path = _segment_paths(self.directory, seq)[0]
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+            except FileExistsError:
+                seq += 1
+                continue
+            f = os.fdopen(fd, 'ab')
+            # 新建和加锁之间，其他进程可能把它当作未封存段先锁定
+            if _try_lock(f):
+                break
+            f.close()
+            seq += 1
+        self.seq, self.file, self.offset = seq, f, 0
+
+    def _compress(self, content: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            compressor = getattr(self.local, 'compressor', None)
+            if compressor is None:
+                compressor = self.local.compressor = zstandard.ZstdCompressor(level=3)
+            return compressor.compress(content)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        return compressor.compress(content) + compressor.flush()
+
+    def append(self, url: str, content: bytes, status: int = 200, encoding: str = 'utf-8',
+               fetched_at: float = None) -> None:
+        """追加一条响应（压缩在调用线程中进行，只有写文件在锁内）"""
+        fetched_at = fetched_at or time.time()
+        payload = self._compress(content)
+        url_bytes = url.encode('utf-8')
+        encoding_bytes = (encoding or '').encode('ascii', 'ignore')[:255]
+        header = RECORD.pack(
+            zlib.crc32(payload), len(payload), len(content), fetched_at, status,
+            len(url_bytes), len(encoding_bytes), self.codec
+        )
+        length = len(header) + len(url_bytes) + len(encoding_bytes) + len(payload)
+
+        with self.lock:
+            self.file.writelines((header, url_bytes, encoding_bytes, payload))
+            self.file.flush()
+            self.entries.append((url_key(url), fetched_at, self.offset, length))
+            self.offset += length
+            self.stats['records'] += 1
+            self.stats['raw_bytes'] += len(content)
+            self.stats['stored_bytes'] += length
+            if self.offset >= self.segment_bytes:
+                self._seal()
+
+    def _seal(self) -> None:
+        """封存当前段：写出排序后的索引（先写临时文件再改名，索引存在即表示段已完整）并开始新段
+
+        索引写完后才关闭段文件、释放锁，其他进程不会在封存过程中接手这个段。
+        """
+        index_path = _segment_paths(self.directory, self.seq)[1]
+        with open(index_path + '.tmp', 'wb') as f:
+            f.writelines(INDEX.pack(*entry) for entry in sorted(self.entries))
+        os.replace(index_path + '.tmp', index_path)
+        self.file.close()
+        self.stats['segments_sealed'] += 1
+        logger.info(f"Sealed archive segment {self.seq:08d} ({self.offset} bytes, {len(self.entries)} records)")
+
+        self._open_segment()
+
+    def rotate(self) -> None:
+        """立即封存当前段（没有记录时不做任何事）"""
+        with self.lock:
+            if self.entries:
+                self._seal()
+
+    def close(self) -> None:
+        """关闭当前段并释放锁（不封存，下次打开时继续写入）"""
+        with self.lock:
+            self.file.close()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return dict(self.stats, segment=self.seq, segment_bytes=self.offset)
+
+class _Segment:
+    """读取端的一个段：段文件和索引都通过 mmap 访问"""
+
+    def __init__(self, directory: str, seq: int):
+        path, index_path = _segment_paths(directory, seq)
+        self.maps = []
+        self.view = self._map(path)
+        if os.path.exists(index_path):
+            self.index = self._map(index_path)
+        else:
+            # 未封存的段没有索引文件，扫描后在内存中构建同样格式的索引
+            entries, _ = scan_segment(path)
+            self.index = memoryview(b''.join(INDEX.pack(*entry) for entry in sorted(entries)))
+        self.count = len(self.index) // INDEX.size
+
+    def _map(self, path: str) -> memoryview:
+        if os.path.getsize(path) == 0:
+            return memoryview(b'')
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.maps.append(mapped)
+        return memoryview(mapped)
+
+    def find(self, key: int) -> Iterator[Tuple[float, int]]:
+        """二分查找URL哈希，按抓取时间顺序产出 (抓取时间, 偏移)"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if INDEX.unpack_from(self.index, mid * INDEX.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        for position in range(lo, self.count):
+            entry_key, fetched_at, offset, _ = INDEX.unpack_from(self.index, position * INDEX.size)
+            if entry_key != key:
+                return
+            yield fetched_at, offset
+
+    def close(self) -> None:
+        self.view.release()
+        self.index.release()
+        for mapped in self.maps:
+            try:
+                mapped.close()
+            except BufferError:
+                # 仍有记录引用该段，映射在这些记录被回收后释放
+                pass
+
+class ArchiveReader:
+    """归档读取端：按写入顺序流式遍历，或按URL和抓取时间查找
+
+    打开时映射目录下已有的全部段，之后写入的记录需要重新打开读取器才能看到。
+    返回的 ArchivedPage 直接引用映射内存，读取器关闭后不可再访问。
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.segments = [_Segment(directory, seq) for seq in _list_segments(directory)]
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[ArchivedPage]:
+        return self.iter_records()
+
+    def iter_records(self, since: float = None, until: float = None) -> Iterator[ArchivedPage]:
+        """按写入顺序遍历记录，可按抓取时间 [since, until) 过滤"""
+        for segment in self.segments:
+            for _, _, page in iter_segment(segment.view):
+                if (since is None or page.fetched_at >= since) and (until is None or page.fetched_at < until):
+                    yield page
+
+    def history(self, url: str) -> List[ArchivedPage]:
+        """某个URL的全部归档记录（按抓取时间排序）"""
+        key = url_key(url)
+        pages = []
+        for segment in self.segments:
+            for _, offset in segment.find(key):
+                result = read_record(segment.view, offset)
+                if result is not None and result[0].url == url:
+                    pages.append(result[0])
+        pages.sort(key=lambda page: page.fetched_at)
+        return pages
+
+    def lookup(self, url: str, at: float = None) -> Optional[ArchivedPage]:
+        """某个URL在 at 时刻（缺省为最新）或之前最后一次抓取的记录"""
+        pages = [page for page in self.history(url) if at is None or page.fetched_at <= at]
+        return pages[-1] if pages else None
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
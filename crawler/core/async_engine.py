@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from abc import abstractmethod
+from typing import Dict, List, Optional
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp为可选依赖，仅异步模式需要
+    aiohttp = None
+
+from .crawler_manager import BaseCrawler, CrawlerConfig, build_headers
+from .proxy_pool import ProxyPool
+from .rate_limiter import RateLimiter, create_rate_limiter
+from .retry_policy import RetryBudget, RetryPolicy
+from .concurrency import AdaptiveConcurrency, is_congestion_signal
+from .parse_executor import ParseExecutor
+from .user_agent_pool import UserAgentPool
+from .exceptions import CrawlerException, RetryException, RateLimitException, BlockedException
+
+logger = logging.getLogger('async_engine')
+
+class AsyncFetchEngine:
+    """异步抓取引擎 - 按主机自适应限制在途请求数，按主机令牌桶限速且不阻塞事件循环"""
+
+    def __init__(self, config: CrawlerConfig, user_agent_pool: UserAgentPool = None, proxy_pool: ProxyPool = None,
+                 rate_limiter: RateLimiter = None, concurrency: AdaptiveConcurrency = None):
+        if aiohttp is None:
+            raise CrawlerException("aiohttp is required for the async fetch engine")
+
+        self.config = config
+        self.user_agent_pool = user_agent_pool or UserAgentPool()
+        self.proxy_pool = proxy_pool
+        self.rate_limiter = rate_limiter or create_rate_limiter(config)
+        self.retry_budget = RetryBudget(config.retry_budget_ratio, config.retry_budget_min)
+        self.concurrency = concurrency or AdaptiveConcurrency.from_config(config)
+        self.session: Optional['aiohttp.ClientSession'] = None
+        self.stats = {'requests': 0, 'failures': 0}
+
+    async def __aenter__(self) -> 'AsyncFetchEngine':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """创建连接会话（必须在事件循环内调用）"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit_per_host=self.config.max_per_host)
+            self.session = aiohttp.ClientSession(connector=connector)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_proxy(self) -> Optional[str]:
+        if self.config.proxy_enabled and self.proxy_pool:
+            proxy = self.proxy_pool.get_proxy()
+            if proxy:
+                return proxy.get('http')
+        return None
+
+    async def fetch(self, url: str, params: Dict = None, retry_budget: RetryBudget = None,
+                    check_response=None) -> str:
+        """异步抓取网页，同一主机的在途请求数由AIMD窗口控制；retry_budget 可按爬虫单独统计"""
+        if self.session is None:
+            await self.open()
+
+        policy = RetryPolicy.from_config(self.config, retry_budget or self.retry_budget)
+        while True:
+            proxy = self._get_proxy()
+            async with self.concurrency.slot(url) as slot:
+                try:
+                    await self.rate_limiter.acquire_async(url)
+
+                    attempt = policy.begin_attempt()
+                    logger.info(f"Fetching {url} (attempt {attempt}/{policy.max_attempts})")
+                    self.stats['requests'] += 1
+                    slot.start()
+                    started = time.monotonic()
+
+                    async with self.session.get(
+                        url,
+                        params=params,
+                        headers=build_headers(self.user_agent_pool),
+                        proxy=proxy,
+                        timeout=aiohttp.ClientTimeout(total=policy.attempt_timeout(self.config.timeout)),
+                        allow_redirects=True
+                    ) as response:
+                        response.raise_for_status()
+                        text = await response.text()
+                        if check_response:
+                            check_response(url, response)
+
+                    slot.succeeded = True
+                    if proxy and self.proxy_pool:
+                        self.proxy_pool.report(proxy, True, time.monotonic() - started)
+                    return text
+
+                except (aiohttp.ClientError, asyncio.TimeoutError, RateLimitException, BlockedException) as e:
+                    self.stats['failures'] += 1
+                    logger.warning(f"Request failed: {str(e)}")
+                    slot.congested = is_congestion_signal(e)
+
+                    if proxy and self.proxy_pool:
+                        # 代理本身的错误立即熔断，目标站点的普通错误（如404）不算代理失败
+                        if isinstance(e, (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError)):
+                            self.proxy_pool.mark_bad_proxy(proxy)
+                        elif isinstance(e, aiohttp.ClientResponseError) and not slot.congested:
+                            self.proxy_pool.report(proxy, True)
+                        else:
+                            self.proxy_pool.report(proxy, False)
+
+                    delay = policy.next_delay(e)
+                    if delay is None:
+                        raise RetryException(f"Failed to fetch {url} after {attempt} attempts") from e
+
+            # 抖动退避（在槽位之外等待，不占用主机并发）
+            await asyncio.sleep(delay)
+
+    async def fetch_many(self, urls: List[str]) -> List:
+        """并发抓取多个URL，失败项以异常对象返回"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+
+class AsyncBaseCrawler(BaseCrawler):
+    """异步爬虫基类，在单个事件循环中驱动多个并发请求"""
+
+    def __init__(self, config: CrawlerConfig, proxy_pool: ProxyPool = None, user_agent_pool: UserAgentPool = None,
+                 rate_limiter: RateLimiter = None, concurrency: AdaptiveConcurrency = None,
+                 parse_executor: ParseExecutor = None, resources=None):
+        super().__init__(config, proxy_pool, user_agent_pool, rate_limiter, concurrency, parse_executor, resources)
+        self.engine: Optional[AsyncFetchEngine] = None
+
+    async def fetch_async(self, url: str, params: Dict = None) -> str:
+        """通过异步引擎抓取网页"""
+        return await self.engine.fetch(url, params, self.retry_budget, self.check_response)
+
+    async def parse_async(self, func, *args):
+        """在解析进程池中执行模块级解析函数，解析期间事件循环继续处理其他请求"""
+        return await self.parse_executor.run_async(func, *args)
+
+    async def run_async(self, keyword: str = None, engine: AsyncFetchEngine = None) -> List[Dict]:
+        """在当前事件循环中执行爬取；传入共享引擎时按主机的并发限制在爬虫间共享"""
+        if engine is not None:
+            self.engine = engine
+            return await self.crawl_async(keyword)
+
+        async with AsyncFetchEngine(self.config, self.user_agent_pool, self.proxy_pool, self.rate_limiter,
+                                    self.concurrency) as own_engine:
+            self.engine = own_engine
+            try:
+                return await self.crawl_async(keyword)
+            finally:
+                self.engine = None
+
+    def crawl(self, keyword: str = None) -> List[Dict]:
+        """同步入口，兼容 CrawlerManager.run_crawler"""
+        return asyncio.run(self.run_async(keyword))
+
+    @abstractmethod
+    async def crawl_async(self, keyword: str = None) -> List[Dict]:
+        """异步执行爬取，子类必须实现"""
+        pass
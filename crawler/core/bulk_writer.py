@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, JSON, MetaData, String, Table, Text, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
+
+logger = logging.getLogger('bulk_writer')
+
+metadata = MetaData()
+
+# 与 backend/app/models/job.py 中的 jobs 表保持一致（爬虫独立部署，不依赖Flask模型）
+jobs_table = Table(
+    'jobs', metadata,
+    Column('id', BigInteger().with_variant(Integer, 'sqlite'), primary_key=True),
+    Column('company_name', String(255), nullable=False),
+    Column('company_type', String(100)),
+    Column('industry', String(100)),
+    Column('recruitment_type', String(100)),
+    Column('location', String(255)),
+    Column('target_group', String(100)),
+    Column('job_name', String(255), nullable=False),
+    Column('description', Text),
+    Column('requirements', Text),
+    Column('deadline', DateTime(timezone=True)),
+    Column('url', String(512)),
+    Column('announcement', Text),
+    Column('referral_code', String(100)),
+    Column('source', String(100)),
+    Column('source_id', String(100)),
+    Column('delivery_status', String(50)),
+    Column('metadata_info', JSON().with_variant(JSONB, 'postgresql')),
+    Column('created_at', DateTime(timezone=True)),
+    Column('updated_at', DateTime(timezone=True)),
+    Index('idx_source_source_id', 'source', 'source_id', unique=True),  # ON CONFLICT 依赖的唯一索引
+)
+
+# 爬虫写入的列（id 由数据库生成）
+WRITE_COLUMNS = [
+    'company_name', 'company_type', 'industry', 'recruitment_type', 'location', 'target_group',
+    'job_name', 'description', 'requirements', 'deadline', 'url', 'announcement', 'referral_code',
+    'source', 'source_id', 'delivery_status', 'metadata_info', 'created_at', 'updated_at'
+]
+REQUIRED_COLUMNS = ('source', 'source_id', 'job_name', 'company_name')
+# 冲突时不覆盖的列（投递状态由用户维护）
+PRESERVED_COLUMNS = ('source', 'source_id', 'delivery_status', 'created_at')
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if not value or isinstance(value, datetime):
+        return value or None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+def to_row(job: Dict, now: datetime = None) -> Optional[Dict]:
+    """把爬虫输出的职位字典转换为 jobs 表的一行，缺少必要字段时返回None"""
+    now = now or datetime.now(timezone.utc)
+    row = {column: job.get(column) for column in WRITE_COLUMNS}
+    row['deadline'] = _parse_datetime(job.get('deadline'))
+    row['delivery_status'] = '未投递'
+    row['created_at'] = now
+    row['updated_at'] = now
+
+    # 表中没有对应列的字段并入元数据，避免丢失
+    extras = {
+        key: value for key, value in job.items()
+        if key not in jobs_table.c and key != 'metadata' and value is not None
+    }
+    row['metadata_info'] = {**extras, **(job.get('metadata') or {})} or None
+
+    if any(not row.get(column) for column in REQUIRED_COLUMNS):
+        return None
+    row['source_id'] = str(row['source_id'])
+    return row
+
+class BulkJobWriter:
+    """批量写入职位：每批一条 INSERT ... ON CONFLICT (source, source_id) DO UPDATE，
+    超大批量时经 COPY 写入临时表后再合并，入库往返次数与批次数而不是职位数成正比。"""
+
+    def __init__(self, engine, batch_size: int = 500, copy_threshold: int = 5000):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.copy_threshold = copy_threshold
+
+    def write(self, jobs: Iterable[Dict]) -> int:
+        """写入职位，返回写入（插入或更新）的行数"""
+        now = datetime.now(timezone.utc)
+        rows = {}
+        for job in jobs:
+            row = to_row(job, now)
+            if row is None:
+                logger.warning(f"Skipping job without required fields: {job.get('source_id')}")
+                continue
+            # 同一批内重复的 (source, source_id) 只保留最后一条，否则 ON CONFLICT 会报错
+            rows[(row['source'], row['source_id'])] = row
+        rows = list(rows.values())
+
+        if not rows:
+            return 0
+
+        if len(rows) >= self.copy_threshold and self.engine.dialect.name == 'postgresql':
+            return self._copy_upsert(rows)
+
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            with self.engine.begin() as conn:
+                conn.execute(self._upsert_statement(batch))
+        return len(rows)
+
+    def _upsert_statement(self, batch: List[Dict]):
+        dialect = self.engine.dialect.name
+        if dialect == 'postgresql':
+            stmt = postgresql.insert(jobs_table).values(batch)
+        elif dialect == 'sqlite':
+            stmt = sqlite.insert(jobs_table).values(batch)
+        else:
+            raise ValueError(f"Bulk upsert is not supported for dialect: {dialect}")
+
+        # 新值为空时保留原值（列表页记录不会清空已抓到的详情字段）
+        updates = {
+            column: func.coalesce(stmt.excluded[column], jobs_table.c[column])
+            for column in WRITE_COLUMNS if column not in PRESERVED_COLUMNS
+        }
+        updates['updated_at'] = stmt.excluded.updated_at
+        return stmt.on_conflict_do_update(index_elements=['source', 'source_id'], set_=updates)
+
+    def _copy_upsert(self, rows: List[Dict]) -> int:
+        """COPY 到临时表后一次性合并（PostgreSQL）"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([self._copy_value(row[column]) for column in WRITE_COLUMNS])
+        buffer.seek(0)
+
+        columns = ', '.join(WRITE_COLUMNS)
+        updates = ', '.join(
+            f"{column} = COALESCE(EXCLUDED.{column}, jobs.{column})"
+            for column in WRITE_COLUMNS if column not in PRESERVED_COLUMNS + ('updated_at',)
+        )
+
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.execute(
+                    "CREATE TEMP TABLE jobs_stage "
+                    "(LIKE jobs INCLUDING DEFAULTS EXCLUDING CONSTRAINTS) ON COMMIT DROP"
+                )
+                cursor.copy_expert(
+                    f"COPY jobs_stage ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                    buffer
+                )
+                cursor.execute(
+                    f"INSERT INTO jobs ({columns}) "
+                    f"SELECT {columns} FROM jobs_stage "
+                    f"ON CONFLICT (source, source_id) DO UPDATE SET {updates}, updated_at = EXCLUDED.updated_at"
+                )
+            raw.commit()
+        except Exception:
+            raw.rollback()
+            raise
+        finally:
+            raw.close()
+
+        logger.info(f"Bulk loaded {len(rows)} jobs via COPY")
+        return len(rows)
+
+    @staticmethod
+    def _copy_value(value):
+        if value is None:
+            return '\\N'
+        if isinstance(value, dict):
+            return json.dumps(value, ensure_ascii=False, default=str)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
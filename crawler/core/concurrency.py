@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from .exceptions import BlockedException, RateLimitException
+from .rate_limiter import host_of
+
+logger = logging.getLogger('concurrency')
+
+# 表示站点已过载或开始限流的状态码
+CONGESTION_STATUSES = frozenset([429, 503])
+
+def is_congestion_signal(error: Exception) -> bool:
+    """判断失败是否意味着站点拥塞（429/503、超时、封禁或限流信号）"""
+    if isinstance(error, (RateLimitException, BlockedException)):
+        return True
+    if isinstance(error, (requests.exceptions.Timeout, asyncio.TimeoutError, TimeoutError)):
+        return True
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status', None)
+    return status in CONGESTION_STATUSES
+
+class HostWindow:
+    """单个主机的AIMD并发窗口"""
+
+    def __init__(self, initial: float):
+        self.limit = float(initial)
+        self.in_flight = 0
+        self.latency = None  # 延迟EWMA
+        self.baseline = None  # 健康状态下的基准延迟
+        self.last_decrease = 0.0
+        self.successes = 0
+        self.congestions = 0
+        self.async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+class AdaptiveConcurrency:
+    """按主机自适应的并发控制器（加性增、乘性减）
+
+    延迟和错误率健康时，每完成约一个窗口的请求，并发上限加1；
+    遇到429/503、超时或封禁/限流信号，或延迟超过基准的 latency_tolerance 倍时，上限乘以 backoff。
+    同一个往返时间内的多次拥塞信号只触发一次减小。
+    """
+
+    def __init__(self, initial: int = 2, min_limit: int = 1, max_limit: int = 8,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0, smoothing: float = 0.2):
+        self.initial = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.windows: Dict[str, HostWindow] = {}
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+
+    @classmethod
+    def from_config(cls, config) -> 'AdaptiveConcurrency':
+        if not config.adaptive_concurrency:
+            # 关闭自适应时退化为固定的每主机并发数
+            return cls(config.max_per_host, config.max_per_host, config.max_per_host)
+        return cls(
+            initial=min(config.initial_per_host, config.max_per_host),
+            min_limit=1,
+            max_limit=config.max_per_host,
+            latency_tolerance=config.latency_tolerance
+        )
+
+    def _window(self, host: str) -> HostWindow:
+        window = self.windows.get(host)
+        if window is None:
+            window = HostWindow(self.initial)
+            self.windows[host] = window
+        return window
+
+    def _try_acquire(self, host: str) -> bool:
+        window = self._window(host)
+        if window.in_flight < int(window.limit):
+            window.in_flight += 1
+            return True
+        return False
+
+    def acquire(self, url_or_host: str) -> str:
+        """阻塞直到目标主机有空闲并发槽位，返回主机名"""
+        host = host_of(url_or_host)
+        with self.cond:
+            while not self._try_acquire(host):
+                self.cond.wait()
+        return host
+
+    async def acquire_async(self, url_or_host: str) -> str:
+        """异步等待空闲槽位，不阻塞事件循环"""
+        host = host_of(url_or_host)
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.lock:
+                if self._try_acquire(host):
+                    return host
+                future = loop.create_future()
+                self._window(host).async_waiters.append((loop, future))
+            await future
+
+    def release(self, host: str, latency: Optional[float] = None, congested: bool = False) -> None:
+        """归还槽位并根据结果调整窗口：latency 为成功请求的耗时，congested 表示拥塞信号"""
+        with self.cond:
+            window = self._window(host)
+            window.in_flight = max(0, window.in_flight - 1)
+            now = time.monotonic()
+
+            if congested:
+                window.congestions += 1
+                self._decrease(host, window, now, 'congestion signal')
+            elif latency is not None:
+                window.successes += 1
+                window.latency = latency if window.latency is None else \
+                    window.latency + self.smoothing * (latency - window.latency)
+                if window.baseline is None or window.latency < window.baseline:
+                    window.baseline = window.latency
+                else:
+                    # 基准缓慢上浮，适应网络整体变化
+                    window.baseline += (window.latency - window.baseline) * 0.01
+
+                if window.latency > window.baseline * self.latency_tolerance:
+                    self._decrease(host, window, now, f"latency {window.latency:.2f}s")
+                else:
+                    window.limit = min(self.max_limit, window.limit + 1.0 / window.limit)
+
+            self.cond.notify_all()
+            self._wake_async(window)
+
+    def _decrease(self, host: str, window: HostWindow, now: float, reason: str) -> None:
+        # 一个往返时间内只减小一次，避免同一波失败把窗口压到最小
+        if now - window.last_decrease < (window.latency or 1.0):
+            return
+        window.last_decrease = now
+        previous = window.limit
+        window.limit = max(self.min_limit, window.limit * self.backoff)
+        logger.info(f"Backing off {host}: {previous:.1f} -> {window.limit:.1f} ({reason})")
+
+    @staticmethod
+    def _wake_async(window: HostWindow) -> None:
+        waiters, window.async_waiters = window.async_waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_result(None))
+
+    def slot(self, url_or_host: str) -> 'ConcurrencySlot':
+        """同步上下文管理器：进入时获取槽位，退出时按结果归还"""
+        return ConcurrencySlot(self, url_or_host)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self.lock:
+            return {
+                host: {
+                    'limit': round(window.limit, 2),
+                    'in_flight': window.in_flight,
+                    'latency': window.latency,
+                    'successes': window.successes,
+                    'congestions': window.congestions
+                }
+                for host, window in self.windows.items()
+            }
+
+class ConcurrencySlot:
+    """一次请求占用的并发槽位；调用方设置 succeeded / congested 来反馈结果"""
+
+    def __init__(self, controller: AdaptiveConcurrency, url_or_host: str):
+        self.controller = controller
+        self.url_or_host = url_or_host
+        self.host = None
+        self.started = None
+        self.succeeded = False
+        self.congested = False
+
+    def start(self) -> None:
+        """开始计时（在限流等待之后调用，延迟不含排队时间）"""
+        self.started = time.monotonic()
+
+    def _finish(self) -> None:
+        latency = None
+        if self.succeeded and self.started is not None:
+            latency = time.monotonic() - self.started
+        self.controller.release(self.host, latency, self.congested)
+
+    def __enter__(self) -> 'ConcurrencySlot':
+        self.host = self.controller.acquire(self.url_or_host)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._finish()
+        return False
+
+    async def __aenter__(self) -> 'ConcurrencySlot':
+        self.host = await self.controller.acquire_async(self.url_or_host)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self._finish()
+        return False
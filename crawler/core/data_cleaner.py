@@ -1,14 +1,82 @@
 import re
 import logging
-from typing import Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from .classifier import KeywordClassifier
+
 logger = logging.getLogger('data_cleaner')
 
+# 所有正则在模块加载时编译一次
+_WHITESPACE = re.compile(r'\s+')
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+_LOCATION_SUFFIX = re.compile(r'[·•].*$')
+_LOCATION_DISTRICT = re.compile(r'\s*-\s*.*$')
+_HTML_TAG = re.compile(r'<[^>]+>')
+_DAYS_AGO = re.compile(r'(\d+)天前')
+_DATE_PATTERNS = [
+    re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'),
+    re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})'),
+    re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})'),
+    re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+]
+
+class LRUCache:
+    """有界LRU缓存，记录命中率"""
+    
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def get_or_compute(self, key, compute: Callable):
+        with self.lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return self.data[key]
+            self.misses += 1
+        
+        value = compute()
+        with self.lock:
+            self.data[key] = value
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+        return value
+    
+    def clear(self) -> None:
+        with self.lock:
+            self.data.clear()
+    
+    def get_stats(self) -> Dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self.data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0
+            }
+
 class DataCleaner:
-    """数据清洗器 - 标准化和清洗爬取的数据"""
+    """数据清洗器 - 标准化和清洗爬取的数据
+    
+    清洗规则表驱动、正则和查找表预先编译；批量清洗按列进行，同一批次中重复的原始值只清洗一次。
+    薪资、日期、地点、学历、经验的标准化结果按原始值缓存在有界LRU中跨批次复用；
+    相对日期（今天、3天前等）以每次运行的基准时间解析，同一次运行内结果一致。
+    """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 10000):
+        self.reference_time = datetime.now()
+        self.caches = {
+            name: LRUCache(cache_size)
+            for name in ('salary', 'date', 'location', 'education', 'experience')
+        }
+
         # 薪资范围正则表达式
         self.salary_patterns = [
             r'(\d+)[kK][-~](\d+)[kK]',  # 10k-20k
@@ -21,7 +89,7 @@ class DataCleaner:
         self.education_mapping = {
             '不限': '不限',
             '中专': '中专',
-            '高中': '高中', 
+            '高中': '高中',
             '大专': '大专',
             '本科': '本科',
             '硕士': '硕士',
@@ -41,42 +109,110 @@ class DataCleaner:
             '5-10年': '5-10年',
             '10年以上': '10年以上'
         }
+        
+        self.compile()
+    
+    def compile(self) -> None:
+        """编译正则和查找表（修改上面的映射或薪资规则后需重新调用）"""
+        self.salary_regexes = [re.compile(pattern) for pattern in self.salary_patterns]
+        # 学历和经验映射编译进同一个关键词分类器
+        self.classifier = KeywordClassifier()
+        self.classifier.register('education', self.education_mapping)
+        self.classifier.register('experience', self.experience_mapping)
+        
+        # 清洗规则表：(输入字段, 输出字段, 清洗函数, 跨批次缓存名)，按此顺序写入结果；
+        # 输出字段为元组时清洗函数返回同样长度的元组；没有缓存名的字段只在批次内去重
+        self.rules: List[Tuple[str, object, Callable, Optional[str]]] = [
+            ('title', 'title', self._clean_text, None),
+            ('company', 'company', self._clean_text, None),
+            ('location', 'location', self._clean_location, 'location'),
+            ('salary', ('salary_min', 'salary_max'), self._parse_salary, 'salary'),
+            ('education', 'education', self._clean_education, 'education'),
+            ('experience', 'experience', self._clean_experience, 'experience'),
+            ('description', 'description', self._clean_description, None),
+            ('posted_at', 'posted_at', self._parse_reference_date, 'date'),
+            ('deadline', 'deadline', self._parse_reference_date, 'date'),
+        ]
+        for cache in self.caches.values():
+            cache.clear()
+    
+    def start_run(self, reference_time: datetime = None) -> None:
+        """开始新一次运行：更新相对日期的基准时间（日期缓存随之失效）"""
+        self.reference_time = reference_time or datetime.now()
+        self.caches['date'].clear()
+    
+    def get_stats(self) -> Dict[str, Dict]:
+        """各标准化缓存的命中统计"""
+        return {name: cache.get_stats() for name, cache in self.caches.items()}
     
     def clean_job_data(self, job_data: Dict) -> Dict:
         """清洗单个职位数据"""
-        cleaned_data = job_data.copy()
-        
-        # 清洗职位名称
-        cleaned_data['title'] = self._clean_text(job_data.get('title', ''))
-        
-        # 清洗公司名称
-        cleaned_data['company'] = self._clean_text(job_data.get('company', ''))
-        
-        # 清洗地点
-        cleaned_data['location'] = self._clean_location(job_data.get('location', ''))
-        
-        # 清洗薪资
-        salary_min, salary_max = self._parse_salary(job_data.get('salary', ''))
-        cleaned_data['salary_min'] = salary_min
-        cleaned_data['salary_max'] = salary_max
-        
-        # 清洗学历要求
-        cleaned_data['education'] = self._clean_education(job_data.get('education', ''))
-        
-        # 清洗经验要求
-        cleaned_data['experience'] = self._clean_experience(job_data.get('experience', ''))
-        
-        # 清洗职位描述
-        cleaned_data['description'] = self._clean_description(job_data.get('description', ''))
-        
-        # 标准化日期格式
-        cleaned_data['posted_at'] = self._parse_date(job_data.get('posted_at', ''))
-        cleaned_data['deadline'] = self._parse_date(job_data.get('deadline', ''))
-        
-        # 添加数据来源时间戳
-        cleaned_data['crawled_at'] = datetime.now().isoformat()
-        
-        return cleaned_data
+        cleaned, errors = self._clean_columns([job_data])
+        if errors:
+            raise errors[0]
+        return cleaned[0]
+    
+    def clean_batch(self, job_list: List[Dict]) -> List[Dict]:
+        """按列批量清洗，清洗失败的记录被跳过"""
+        cleaned, errors = self._clean_columns(job_list)
+        for index, error in errors.items():
+            logger.error(f"数据清洗失败: {error}, 数据: {job_list[index]}")
+        return [job for index, job in enumerate(cleaned) if index not in errors]
+    
+    def _clean_columns(self, job_list: List[Dict]) -> Tuple[List[Dict], Dict[int, Exception]]:
+        """逐列清洗，返回清洗结果和 {记录下标: 异常}"""
+        columns = []
+        errors: Dict[int, Exception] = {}
+        
+        for field, output, clean, cache_name in self.rules:
+            shared = self.caches.get(cache_name)
+            cache = {}
+            values = []
+            for index, job in enumerate(job_list):
+                raw = job.get(field, '')
+                try:
+                    key = (type(raw), raw)
+                    if key not in cache:
+                        if shared is not None:
+                            cache[key] = shared.get_or_compute(key, lambda: self._apply(clean, raw))
+                        else:
+                            cache[key] = self._apply(clean, raw)
+                    result = cache[key]
+                except TypeError:
+                    # 不可哈希的原始值不缓存
+                    result = self._apply(clean, raw)
+                if isinstance(result, Exception):
+                    errors.setdefault(index, result)
+                values.append(result)
+            
+            if isinstance(output, tuple):
+                # 多输出字段拆成多列（清洗失败的记录整条丢弃，占位即可）
+                for position, name in enumerate(output):
+                    columns.append((name, [
+                        None if isinstance(value, Exception) else value[position] for value in values
+                    ]))
+            else:
+                columns.append((output, values))
+        
+        # 添加数据来源时间戳（同一批次共用）
+        crawled_at = datetime.now().isoformat()
+        cleaned_jobs = []
+        for index, job in enumerate(job_list):
+            cleaned_data = job.copy()
+            for name, values in columns:
+                cleaned_data[name] = values[index]
+            cleaned_data['crawled_at'] = crawled_at
+            cleaned_jobs.append(cleaned_data)
+        
+        return cleaned_jobs, errors
+    
+    @staticmethod
+    def _apply(clean: Callable, raw):
+        """执行清洗函数，异常作为结果返回，由调用方按记录处理"""
+        try:
+            return clean(raw)
+        except Exception as e:
+            return e
     
     def _clean_text(self, text: str) -> str:
         """清洗文本内容"""
@@ -84,10 +220,10 @@ class DataCleaner:
             return ''
         
         # 移除多余空白字符
-        text = re.sub(r'\s+', ' ', text.strip())
+        text = _WHITESPACE.sub(' ', text.strip())
         
         # 移除特殊字符
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+        text = _CONTROL_CHARS.sub('', text)
         
         return text
     
@@ -97,8 +233,8 @@ class DataCleaner:
             return ''
         
         # 移除多余的地区信息
-        location = re.sub(r'[·•].*$', '', location)
-        location = re.sub(r'\s*-\s*.*$', '', location)
+        location = _LOCATION_SUFFIX.sub('', location)
+        location = _LOCATION_DISTRICT.sub('', location)
         
         return self._clean_text(location)
     
@@ -108,8 +244,8 @@ class DataCleaner:
             return None, None
         
         # 尝试各种薪资格式
-        for pattern in self.salary_patterns:
-            match = re.search(pattern, salary_str)
+        for pattern in self.salary_regexes:
+            match = pattern.search(salary_str)
             if match:
                 min_val, max_val = match.groups()
                 
@@ -140,28 +276,16 @@ class DataCleaner:
         if not education:
             return '不限'
         
-        education = education.strip()
-        
-        # 查找匹配的学历
-        for key, value in self.education_mapping.items():
-            if key in education:
-                return value
-        
-        return '不限'
+        # 查找匹配的学历（按映射顺序取第一个）
+        return self.classifier.classify_one('education', education.strip()) or '不限'
     
     def _clean_experience(self, experience: str) -> str:
         """清洗经验要求"""
         if not experience:
             return '不限'
         
-        experience = experience.strip()
-        
-        # 查找匹配的经验要求
-        for key, value in self.experience_mapping.items():
-            if key in experience:
-                return value
-        
-        return '不限'
+        # 查找匹配的经验要求（按映射顺序取第一个）
+        return self.classifier.classify_one('experience', experience.strip()) or '不限'
     
     def _clean_description(self, description: str) -> str:
         """清洗职位描述"""
@@ -169,43 +293,40 @@ class DataCleaner:
             return ''
         
         # 移除HTML标签
-        description = re.sub(r'<[^>]+>', '', description)
+        description = _HTML_TAG.sub('', description)
         
-        # 移除多余的换行和空格
-        description = re.sub(r'\n+', '\n', description)
-        description = re.sub(r'\s+', ' ', description)
+        # 移除多余的换行和空格（连续空白整体折叠为一个空格，换行也在其中）
+        description = _WHITESPACE.sub(' ', description)
         
         return description.strip()
     
-    def _parse_date(self, date_str: str) -> Optional[str]:
-        """解析日期字符串"""
+    def _parse_reference_date(self, date_str: str) -> Optional[str]:
+        """以本次运行的基准时间解析日期"""
+        return self._parse_date(date_str, self.reference_time)
+    
+    def _parse_date(self, date_str: str, now: datetime = None) -> Optional[str]:
+        """解析日期字符串，相对日期以 now 为基准"""
         if not date_str:
             return None
         
+        now = now or datetime.now()
         try:
             # 处理相对日期
             if '今天' in date_str or '刚刚' in date_str:
-                return datetime.now().strftime('%Y-%m-%d')
+                return now.strftime('%Y-%m-%d')
             elif '昨天' in date_str:
-                return (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+                return (now - timedelta(days=1)).strftime('%Y-%m-%d')
             elif '前天' in date_str:
-                return (datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d')
+                return (now - timedelta(days=2)).strftime('%Y-%m-%d')
             elif '天前' in date_str:
-                days = re.search(r'(\d+)天前', date_str)
+                days = _DAYS_AGO.search(date_str)
                 if days:
                     days_ago = int(days.group(1))
-                    return (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+                    return (now - timedelta(days=days_ago)).strftime('%Y-%m-%d')
             
             # 处理绝对日期
-            date_patterns = [
-                r'(\d{4})-(\d{1,2})-(\d{1,2})',
-                r'(\d{4})/(\d{1,2})/(\d{1,2})',
-                r'(\d{1,2})-(\d{1,2})-(\d{4})',
-                r'(\d{1,2})/(\d{1,2})/(\d{4})'
-            ]
-            
-            for pattern in date_patterns:
-                match = re.search(pattern, date_str)
+            for pattern in _DATE_PATTERNS:
+                match = pattern.search(date_str)
                 if match:
                     groups = match.groups()
                     if len(groups[0]) == 4:  # YYYY-MM-DD format
@@ -239,15 +360,11 @@ class DataCleaner:
         """批量清洗职位数据"""
         cleaned_jobs = []
         
-        for job_data in job_list:
-            try:
-                cleaned_job = self.clean_job_data(job_data)
-                if self.validate_job_data(cleaned_job):
-                    cleaned_jobs.append(cleaned_job)
-                else:
-                    logger.warning(f"职位数据验证失败，跳过: {job_data.get('title', 'Unknown')}")
-            except Exception as e:
-                logger.error(f"数据清洗失败: {e}, 数据: {job_data}")
+        for cleaned_job in self.clean_batch(job_list):
+            if self.validate_job_data(cleaned_job):
+                cleaned_jobs.append(cleaned_job)
+            else:
+                logger.warning(f"职位数据验证失败，跳过: {cleaned_job.get('title', 'Unknown')}")
         
         logger.info(f"批量清洗完成，有效数据: {len(cleaned_jobs)}/{len(job_list)}")
-        return cleaned_jobs
\ No newline at end of file
+        return cleaned_jobs
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Set
+
+logger = logging.getLogger('dedup')
+
+class BloomFilter:
+    """进程内布隆过滤器：不在其中的元素一定没见过，在其中的可能是误判"""
+
+    def __init__(self, capacity: int = 200000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # 双重哈希：一次blake2b摘要派生k个位置
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def clear(self) -> None:
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+class DedupLedger:
+    """批量去重账本
+
+    Redis中按天分桶保存已处理的 source_id（每天一个集合，整桶随TTL过期），
+    相比每个 source_id 一个带过期时间的键大幅节省内存；批量检查通过一次流水线完成。
+    进程内布隆过滤器挡在前面：布隆判定为新的 ID 无需访问Redis，本进程确认过的 ID 直接命中本地缓存。
+    其他进程（分布式工作进程、另一次运行）标记的ID不会进入本进程的布隆过滤器，
+    因此每隔 refresh_interval 秒从Redis分桶重建一次，其他进程的标记最迟在该间隔后生效；
+    重建时按Redis中的ID总数确定容量，ID数超过容量后也会提前重建，误判率不随数据增长而升高。
+    """
+
+    def __init__(self, redis_client, namespace: str, ttl: int = 86400 * 7,
+                 capacity: int = 200000, error_rate: float = 0.001, prefix: str = 'crawler:seen',
+                 refresh_interval: float = 300):
+        self.redis = redis_client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.prefix = prefix
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.local: Dict[str, float] = {}  # 本进程确认过的ID -> 过期时间
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.refreshed_at = None  # 上次重建的时间（monotonic），None 表示还没有建过
+        self.stats = {'local_hits': 0, 'bloom_negatives': 0, 'redis_checks': 0, 'round_trips': 0}
+
+    def _bucket_key(self, day: int) -> str:
+        return f"{self.prefix}:{self.namespace}:{day}"
+
+    def _live_days(self) -> List[int]:
+        """仍在有效期内的天分桶（含今天）"""
+        today = int(time.time() // 86400)
+        return list(range(today - math.ceil(self.ttl / 86400), today + 1))
+
+    def rebuild(self) -> int:
+        """从Redis重建布隆过滤器（在锁外构建后整体替换，不阻塞并发检查），返回加载的ID数量"""
+        days = self._live_days()
+        pipe = self.redis.pipeline(transaction=False)
+        for day in days:
+            pipe.scard(self._bucket_key(day))
+        total = sum(pipe.execute())
+        # 留出一倍余量，容量只增不减
+        self.capacity = max(self.capacity, total * 2)
+        bloom = BloomFilter(self.capacity, self.error_rate)
+
+        loaded = 0
+        for day in days:
+            for member in self.redis.sscan_iter(self._bucket_key(day), count=1000):
+                bloom.add(member.decode('utf-8') if isinstance(member, bytes) else member)
+                loaded += 1
+
+        with self.lock:
+            # 扫描期间本进程标记的ID可能没有被扫描到，从本地缓存补上
+            for source_id in self.local:
+                if source_id not in bloom:
+                    bloom.add(source_id)
+            self.bloom = bloom
+            self.refreshed_at = time.monotonic()
+        logger.info(f"Rebuilt bloom filter for {self.namespace} with {loaded} ids (capacity {self.capacity})")
+        return loaded
+
+    def _refresh_if_stale(self) -> None:
+        """首次使用时同步构建；之后过期时只由一个线程重建，其他线程继续使用旧的过滤器"""
+        refreshed_at = self.refreshed_at
+        if refreshed_at is not None and time.monotonic() - refreshed_at < self.refresh_interval:
+            return
+        if not self.refresh_lock.acquire(blocking=refreshed_at is None):
+            return
+        try:
+            if self.refreshed_at == refreshed_at:
+                self.rebuild()
+        finally:
+            self.refresh_lock.release()
+
+    def seen_many(self, source_ids: Iterable[str]) -> Set[str]:
+        """批量检查，返回其中已处理过的ID集合（最多一次Redis往返）"""
+        self._refresh_if_stale()
+
+        ids = list(dict.fromkeys(str(i) for i in source_ids if i))
+        if not ids:
+            return set()
+
+        now = time.time()
+        seen = set()
+        to_confirm = []
+        with self.lock:
+            for source_id in ids:
+                if self.local.get(source_id, 0) > now:
+                    seen.add(source_id)
+                    self.stats['local_hits'] += 1
+                elif source_id not in self.bloom:
+                    self.stats['bloom_negatives'] += 1
+                else:
+                    to_confirm.append(source_id)
+
+        if to_confirm:
+            # 布隆可能误判或记录已过期，用一次流水线向Redis确认
+            pipe = self.redis.pipeline(transaction=False)
+            for day in self._live_days():
+                pipe.smismember(self._bucket_key(day), to_confirm)
+            flags_by_day = pipe.execute()
+            self.stats['redis_checks'] += len(to_confirm)
+            self.stats['round_trips'] += 1
+
+            for index, source_id in enumerate(to_confirm):
+                if any(flags[index] for flags in flags_by_day):
+                    seen.add(source_id)
+
+        return seen
+
+    def is_seen(self, source_id: str) -> bool:
+        return str(source_id) in self.seen_many([source_id])
+
+    def mark_many(self, source_ids: Iterable[str]) -> None:
+        """批量标记为已处理（一次Redis往返）"""
+        ids = list(dict.fromkeys(str(i) for i in source_ids if i))
+        if not ids:
+            return
+
+        key = self._bucket_key(int(time.time() // 86400))
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.sadd(key, *ids)
+        # 分桶在最后一次写入后再保留 ttl，整桶过期
+        pipe.expire(key, self.ttl + 86400)
+        pipe.execute()
+        self.stats['round_trips'] += 1
+
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            # 本地缓存只是加速，超过容量时整体清空即可
+            if len(self.local) > self.capacity:
+                self.local.clear()
+            for source_id in ids:
+                self.bloom.add(source_id)
+                self.local[source_id] = expires_at
+            if self.bloom.count > self.bloom.capacity and self.refreshed_at is not None:
+                # 超出容量后误判率上升，下次检查时按实际ID数扩容重建
+                self.refreshed_at = 0.0
@@ -0,0 +1,86 @@
+import hashlib
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger('fingerprint')
+
+# 参与列表指纹的列表页字段：职位名、公司、薪资、地点、发布日期
+LIST_FIELDS = ('job_name', 'company_name', 'salary', 'location', 'publish_date')
+
+def list_fingerprint(job: Dict, fields: Iterable[str] = LIST_FIELDS) -> str:
+    """列表行指纹，列表页上可见的字段不变时详情通常也没有变化"""
+    raw = '\x1f'.join(str(job.get(field) or '').strip() for field in fields)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+class FingerprintStore:
+    """已入库职位的列表指纹
+
+    Redis 哈希 crawler:fingerprint:{爬虫名} 中每个 source_id 对应「指纹|详情抓取时间」，
+    批量读写各一次往返。与去重账本不同，这里的记录不随 dedup_ttl 过期，
+    列表指纹不变且未超过 refresh_interval 的职位不再重新抓取详情。
+    有序集合 crawler:fingerprint:{爬虫名}:fetched 按抓取时间索引，写入时顺带删除超过 refresh_interval 的记录
+    （这些职位无论指纹是否变化都要重新抓取，删除后行为不变），哈希大小随活跃职位数而不是历史总数增长。
+    """
+
+    # KEYS: 哈希, 时间索引；ARGV: now, cutoff, 单次最多清理数, 之后依次为 source_id, 值；返回清理的记录数
+    MARK_SCRIPT = """
+    local now = tonumber(ARGV[1])
+    for i = 4, #ARGV, 2 do
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+        redis.call('ZADD', KEYS[2], now, ARGV[i])
+    end
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[2], 'LIMIT', 0, tonumber(ARGV[3]))
+    if #expired > 0 then
+        redis.call('HDEL', KEYS[1], unpack(expired))
+        redis.call('ZREM', KEYS[2], unpack(expired))
+    end
+    return #expired
+    """
+
+    def __init__(self, redis_client, namespace: str, refresh_interval: int = 86400 * 30,
+                 prefix: str = 'crawler:fingerprint', prune_batch: int = 1000):
+        self.redis = redis_client
+        self.key = f"{prefix}:{namespace}"
+        self.index_key = f"{self.key}:fetched"
+        self.refresh_interval = refresh_interval
+        self.prune_batch = prune_batch
+        self._mark = redis_client.register_script(self.MARK_SCRIPT)
+
+    def get_many(self, source_ids: Iterable[str]) -> Dict[str, Tuple[str, float]]:
+        """批量读取 {source_id: (指纹, 详情抓取时间)}"""
+        ids = list(dict.fromkeys(str(i) for i in source_ids if i))
+        if not ids:
+            return {}
+        records = {}
+        for source_id, value in zip(ids, self.redis.hmget(self.key, ids)):
+            if value is None:
+                continue
+            if isinstance(value, bytes):
+                value = value.decode('utf-8')
+            fingerprint, _, fetched_at = value.partition('|')
+            try:
+                records[source_id] = (fingerprint, float(fetched_at))
+            except ValueError:
+                continue
+        return records
+
+    def needs_refresh(self, record: Optional[Tuple[str, float]], fingerprint: str, now: float = None) -> bool:
+        """指纹变化或超过刷新期限时需要重新抓取"""
+        if record is None:
+            return True
+        stored, fetched_at = record
+        now = now or time.time()
+        return stored != fingerprint or now - fetched_at >= self.refresh_interval
+
+    def mark_many(self, fingerprints: Dict[str, str]) -> None:
+        """记录 {source_id: 指纹}，抓取时间取当前时间；同一次往返中清理最多 prune_batch 条过期记录"""
+        if not fingerprints:
+            return
+        now = int(time.time())
+        args = [now, now - self.refresh_interval, self.prune_batch]
+        for source_id, fingerprint in fingerprints.items():
+            args += [str(source_id), f"{fingerprint}|{now}"]
+        pruned = self._mark(keys=[self.key, self.index_key], args=args)
+        if pruned:
+            logger.debug(f"Pruned {pruned} expired fingerprints from {self.key}")
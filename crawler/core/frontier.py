@@ -0,0 +1,186 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Set, Tuple
+
+import redis
+
+logger = logging.getLogger('frontier')
+
+class RedisFrontierStore:
+    """断点存储（Redis）：每个范围（爬虫名:关键词）一个元信息哈希、已完成列表页集合和待处理详情哈希"""
+
+    def __init__(self, redis_client, prefix: str = 'crawler:frontier'):
+        self.redis = redis_client
+        self.prefix = prefix
+
+    def _keys(self, scope: str) -> Tuple[str, str, str]:
+        base = f"{self.prefix}:{scope}"
+        return f"{base}:meta", f"{base}:pages", f"{base}:details"
+
+    def load(self, scope: str) -> Tuple[Dict, Set[int], Dict[str, Dict]]:
+        meta_key, pages_key, details_key = self._keys(scope)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(meta_key)
+        pipe.smembers(pages_key)
+        pipe.hgetall(details_key)
+        meta, pages, details = pipe.execute()
+        decode = lambda value: value.decode('utf-8') if isinstance(value, bytes) else value
+        return (
+            {decode(k): decode(v) for k, v in meta.items()},
+            {int(page) for page in pages},
+            {decode(k): json.loads(v) for k, v in details.items()}
+        )
+
+    def start(self, scope: str, meta: Dict) -> None:
+        self.redis.hset(self._keys(scope)[0], mapping=meta)
+
+    def add_details(self, scope: str, details: Dict[str, Dict]) -> None:
+        if details:
+            self.redis.hset(self._keys(scope)[2], mapping={
+                source_id: json.dumps(job, ensure_ascii=False, default=str) for source_id, job in details.items()
+            })
+
+    def complete_page(self, scope: str, page: int) -> None:
+        self.redis.sadd(self._keys(scope)[1], page)
+
+    def ack_details(self, scope: str, source_ids: List[str]) -> None:
+        if source_ids:
+            self.redis.hdel(self._keys(scope)[2], *source_ids)
+
+    def clear(self, scope: str) -> None:
+        self.redis.delete(*self._keys(scope))
+
+class SQLiteFrontierStore:
+    """断点存储（本地SQLite），Redis不可用时使用"""
+
+    def __init__(self, path: str = 'crawler_frontier.db'):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS frontier ("
+                "scope TEXT NOT NULL, kind TEXT NOT NULL, item TEXT NOT NULL, payload TEXT, "
+                "PRIMARY KEY (scope, kind, item))"
+            )
+
+    def load(self, scope: str) -> Tuple[Dict, Set[int], Dict[str, Dict]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT kind, item, payload FROM frontier WHERE scope = ?", (scope,)
+            ).fetchall()
+        meta, pages, details = {}, set(), {}
+        for kind, item, payload in rows:
+            if kind == 'meta':
+                meta[item] = payload
+            elif kind == 'page':
+                pages.add(int(item))
+            else:
+                details[item] = json.loads(payload)
+        return meta, pages, details
+
+    def _upsert(self, rows: List[Tuple[str, str, str, str]]) -> None:
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO frontier VALUES (?, ?, ?, ?)", rows)
+
+    def start(self, scope: str, meta: Dict) -> None:
+        self._upsert([(scope, 'meta', key, str(value)) for key, value in meta.items()])
+
+    def add_details(self, scope: str, details: Dict[str, Dict]) -> None:
+        self._upsert([
+            (scope, 'detail', source_id, json.dumps(job, ensure_ascii=False, default=str))
+            for source_id, job in details.items()
+        ])
+
+    def complete_page(self, scope: str, page: int) -> None:
+        self._upsert([(scope, 'page', str(page), None)])
+
+    def ack_details(self, scope: str, source_ids: List[str]) -> None:
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "DELETE FROM frontier WHERE scope = ? AND kind = 'detail' AND item = ?",
+                [(scope, source_id) for source_id in source_ids]
+            )
+
+    def clear(self, scope: str) -> None:
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM frontier WHERE scope = ?", (scope,))
+
+def create_frontier_store(config, redis_client):
+    """优先使用Redis（任何节点都能续爬），Redis不可用时退化为本地SQLite文件"""
+    try:
+        redis_client.ping()
+        return RedisFrontierStore(redis_client)
+    except redis.RedisError as e:
+        logger.warning(f"Redis unavailable for crawl frontier ({e}), using SQLite at {config.frontier_path}")
+        return SQLiteFrontierStore(config.frontier_path)
+
+class CrawlFrontier:
+    """一次爬取（爬虫 + 关键词）的持久化前沿
+
+    记录已完成的列表页和已发现、尚未入库的详情页；进程中途退出后，下一次运行跳过已完成的列表页，
+    并先处理上次遗留的详情页。详情的完成确认在内存中攒批，每 ack_batch_size 条或 ack_interval 秒写入一次。
+    同一次运行中多个查询各有一个前沿，ack 只接受本前沿登记过的职位，其他ID直接忽略。
+    """
+
+    def __init__(self, store, scope: str, ack_batch_size: int = 50, ack_interval: float = 5.0):
+        self.store = store
+        self.scope = scope
+        self.ack_batch_size = ack_batch_size
+        self.ack_interval = ack_interval
+        self.lock = threading.Lock()
+        self.pending_acks: List[str] = []
+        self.last_flush = time.monotonic()
+        self.exhausted = False  # 列表页已正常遍历完
+
+        meta, self.done_pages, self.pending_details = store.load(scope)
+        self.outstanding: Set[str] = set(self.pending_details)  # 已登记、尚未确认的详情
+        self.resumed = bool(meta)
+        if self.resumed:
+            logger.info(
+                f"Resuming {scope} from checkpoint: {len(self.done_pages)} pages done, "
+                f"{len(self.pending_details)} details pending"
+            )
+        else:
+            store.start(scope, {'started_at': str(int(time.time()))})
+
+    def add_details(self, jobs: Iterable[Dict]) -> None:
+        details = {str(job['source_id']): job for job in jobs if job.get('source_id')}
+        self.store.add_details(self.scope, details)
+        with self.lock:
+            self.outstanding.update(details)
+
+    def complete_page(self, page: int) -> None:
+        self.store.complete_page(self.scope, page)
+        self.done_pages.add(page)
+
+    def ack(self, source_ids: Iterable[str]) -> None:
+        """确认详情已完成（入库或放弃），批量写入存储；不属于本前沿的ID忽略"""
+        with self.lock:
+            for source_id in source_ids:
+                source_id = str(source_id or '')
+                if source_id in self.outstanding:
+                    self.outstanding.discard(source_id)
+                    self.pending_acks.append(source_id)
+            if len(self.pending_acks) < self.ack_batch_size and \
+                    time.monotonic() - self.last_flush < self.ack_interval:
+                return
+            batch, self.pending_acks = self.pending_acks, []
+            self.last_flush = time.monotonic()
+        self.store.ack_details(self.scope, batch)
+
+    def flush(self) -> None:
+        with self.lock:
+            batch, self.pending_acks = self.pending_acks, []
+            self.last_flush = time.monotonic()
+        self.store.ack_details(self.scope, batch)
+
+    def complete(self) -> None:
+        """本次爬取全部完成：清除断点；列表页未遍历完时只写入确认，保留断点供续爬"""
+        self.flush()
+        if self.exhausted:
+            self.store.clear(self.scope)
+        else:
+            logger.info(f"Crawl of {self.scope} incomplete, keeping checkpoint for resume")
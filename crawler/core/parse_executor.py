@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+logger = logging.getLogger('parse_executor')
+
+class ParseExecutor:
+    """HTML解析执行器
+
+    BeautifulSoup 建树是占用GIL的CPU密集操作，在抓取线程中解析会拖慢所有抓取线程。
+    解析函数（必须是模块级纯函数，参数和返回值为HTML字符串和普通字典）被发送到进程池执行，
+    解析吞吐随CPU核数扩展，与抓取并发数分别配置。workers 为1（默认）时在调用线程中直接解析，
+    大于1时启用进程池，0表示按CPU核数。
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'ParseExecutor':
+        return cls(config.parse_workers)
+
+    @property
+    def inline(self) -> bool:
+        return self.workers <= 1
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.pool is None:
+                # spawn 启动的子进程不继承父进程的线程、锁和网络连接
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                logger.info(f"Started parse pool with {self.workers} processes")
+            return self.pool
+
+    def submit(self, func: Callable, *args) -> Future:
+        """提交解析任务，返回Future"""
+        if self.inline:
+            future = Future()
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._get_pool().submit(func, *args)
+
+    def run(self, func: Callable, *args):
+        """执行解析并等待结果；进程池异常退出时重建进程池并在当前线程中解析本次任务"""
+        try:
+            return self.submit(func, *args).result()
+        except BrokenProcessPool:
+            logger.error("Parse pool broken, parsing inline and restarting pool")
+            with self.lock:
+                self.pool = None
+            return func(*args)
+
+    async def run_async(self, func: Callable, *args):
+        """在事件循环中等待解析结果，不阻塞其他协程"""
+        if self.inline:
+            return func(*args)
+        return await asyncio.wrap_future(self._get_pool().submit(func, *args))
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=True)
+                self.pool = None
@@ -0,0 +1,226 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger('pipeline')
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+_DONE = object()  # 工作线程结束标记
+
+def iter_concurrent(
+    func: Callable[[T], Optional[R]],
+    items: Iterable[T],
+    workers: int = 4,
+    queue_size: int = 100,
+    name: str = 'pipeline'
+) -> Iterator[R]:
+    """有界工作队列流水线
+
+    生产者线程迭代 items（可以是边抓取边产出的生成器）并放入有界队列，
+    workers 个工作线程并发执行 func，结果按完成顺序产出；func 返回 None 的项被丢弃。
+    调用方提前停止迭代时，生产者和工作线程会随之退出。
+    迭代 items 时抛出的异常（例如列表页重试失败）不会当作正常结束：已入队的项处理完后在调用方线程中重新抛出。
+    """
+    work_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    result_queue: queue.Queue = queue.Queue()
+    produced = threading.Event()
+    stop = threading.Event()
+    errors: List[Exception] = []
+
+    def produce():
+        try:
+            for item in items:
+                while not stop.is_set():
+                    try:
+                        work_queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    break
+        except Exception as e:
+            logger.error(f"[{name}] Producer failed: {e}", exc_info=True)
+            errors.append(e)
+        finally:
+            produced.set()
+
+    def work():
+        try:
+            while not stop.is_set():
+                try:
+                    item = work_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if produced.is_set() and work_queue.empty():
+                        break
+                    continue
+
+                try:
+                    result = func(item)
+                except Exception as e:
+                    logger.error(f"[{name}] Worker failed on {item!r}: {e}", exc_info=True)
+                    continue
+
+                if result is not None:
+                    result_queue.put(result)
+        finally:
+            result_queue.put(_DONE)
+
+    threads = [threading.Thread(target=produce, name=f"{name}-producer", daemon=True)]
+    threads.extend(
+        threading.Thread(target=work, name=f"{name}-worker-{i}", daemon=True)
+        for i in range(max(1, workers))
+    )
+    for thread in threads:
+        thread.start()
+
+    finished = 0
+    try:
+        while finished < len(threads) - 1:
+            result = result_queue.get()
+            if result is _DONE:
+                finished += 1
+                continue
+            yield result
+    finally:
+        stop.set()
+
+    if errors:
+        raise errors[0]
+
+class StreamingPipeline:
+    """多阶段流式流水线
+
+    数据源和每个阶段各自运行在独立线程中，阶段之间用有界队列连接，
+    峰值内存由队列容量决定。map 阶段逐条处理（返回None即丢弃），
+    batch 阶段按条数或时间间隔凑批处理，返回的列表逐条传给下一阶段。
+    数据源或 batch 阶段抛出异常时整条流水线停止，run() 在调用方线程中重新抛出该异常，
+    调用方据此得知有数据没有处理完（例如不清除断点）。
+    """
+
+    def __init__(self, queue_size: int = 100, name: str = 'pipeline'):
+        self.queue_size = queue_size
+        self.name = name
+        self.stages = []
+
+    def map(self, stage_name: str, func: Callable) -> 'StreamingPipeline':
+        self.stages.append((stage_name, func, None, None))
+        return self
+
+    def batch(self, stage_name: str, func: Callable, batch_size: int = 50,
+              flush_interval: float = 5.0) -> 'StreamingPipeline':
+        self.stages.append((stage_name, func, batch_size, flush_interval))
+        return self
+
+    def run(self, source: Iterable) -> Iterator:
+        """启动流水线并按顺序产出最后一个阶段的输出"""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        errors: List[Exception] = []
+
+        def fail(error: Exception) -> None:
+            errors.append(error)
+            stop.set()
+
+        def put(q: queue.Queue, item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def feed():
+            try:
+                for item in source:
+                    if not put(queues[0], item):
+                        return
+            except Exception as e:
+                logger.error(f"[{self.name}] Source failed: {e}", exc_info=True)
+                fail(e)
+            finally:
+                put(queues[0], _DONE)
+
+        def get(q: queue.Queue, timeout: float = 0.1):
+            try:
+                return q.get(timeout=timeout)
+            except queue.Empty:
+                return None
+
+        def run_map(stage_name, func, inbox, outbox):
+            while not stop.is_set():
+                item = get(inbox)
+                if item is None:
+                    continue
+                if item is _DONE:
+                    break
+                try:
+                    result = func(item)
+                except Exception as e:
+                    logger.error(f"[{self.name}/{stage_name}] Stage failed: {e}", exc_info=True)
+                    continue
+                if result is not None and not put(outbox, result):
+                    return
+            put(outbox, _DONE)
+
+        def run_batch(stage_name, func, batch_size, flush_interval, inbox, outbox):
+            done = False
+            while not done and not stop.is_set():
+                batch = []
+                deadline = None
+                while len(batch) < batch_size and not stop.is_set():
+                    timeout = 0.1 if deadline is None else min(0.1, max(0.0, deadline - time.monotonic()))
+                    item = get(inbox, timeout)
+                    if item is None:
+                        if deadline is not None and time.monotonic() >= deadline:
+                            break  # 到达时间间隔，提前刷新
+                        continue
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+                    if deadline is None:
+                        deadline = time.monotonic() + flush_interval
+
+                if not batch:
+                    continue
+                try:
+                    results = func(batch) or []
+                except Exception as e:
+                    logger.error(f"[{self.name}/{stage_name}] Batch of {len(batch)} failed: {e}", exc_info=True)
+                    fail(e)
+                    return
+                for result in results:
+                    if not put(outbox, result):
+                        return
+            put(outbox, _DONE)
+
+        threads = [threading.Thread(target=feed, name=f"{self.name}-source", daemon=True)]
+        for index, (stage_name, func, batch_size, flush_interval) in enumerate(self.stages):
+            inbox, outbox = queues[index], queues[index + 1]
+            if batch_size is None:
+                target, args = run_map, (stage_name, func, inbox, outbox)
+            else:
+                target, args = run_batch, (stage_name, func, batch_size, flush_interval, inbox, outbox)
+            threads.append(threading.Thread(target=target, args=args, name=f"{self.name}-{stage_name}", daemon=True))
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while not errors:
+                item = get(queues[-1])
+                if item is None:
+                    continue
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            stop.set()
+
+        if errors:
+            raise errors[0]
@@ -1,22 +1,99 @@
+import heapq
+import itertools
+import json
 import logging
+import os
 import random
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Union
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import threading
 
 logger = logging.getLogger('proxy_pool')
 
+# 需要持久化的代理字段（last_used 和熔断状态只在进程内有意义）
+PERSISTED_FIELDS = (
+    'proxy', 'response_time', 'latency', 'success_rate', 'success_count', 'fail_count', 'status', 'checked_at'
+)
+
+def proxy_address(proxy: Union[Dict, str, None]) -> str:
+    """从 get_proxy 返回的字典或代理URL中取出 host:port"""
+    if isinstance(proxy, dict):
+        proxy = proxy.get('http') or proxy.get('https') or ''
+    proxy = proxy or ''
+    return proxy.split('://', 1)[1] if '://' in proxy else proxy
+
+class FileProxyStore:
+    """代理池快照保存在本地JSON文件（先写临时文件再替换，避免写到一半的文件）"""
+
+    def __init__(self, path: str = 'proxies.json'):
+        self.path = path
+
+    def load(self) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, proxies: List[Dict]) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(proxies, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+class RedisProxyStore:
+    """代理池快照保存在Redis（crawler:proxies），多个进程重启时共享同一份已验证代理"""
+
+    def __init__(self, redis_client, key: str = 'crawler:proxies'):
+        self.redis = redis_client
+        self.key = key
+
+    def load(self) -> List[Dict]:
+        raw = self.redis.get(self.key)
+        return json.loads(raw) if raw else []
+
+    def save(self, proxies: List[Dict]) -> None:
+        self.redis.set(self.key, json.dumps(proxies, ensure_ascii=False))
+
 class ProxyPool:
-    """代理池管理器 - 企业级代理管理"""
+    """代理池管理器 - 企业级代理管理
+    
+    构造时只从快照（文件或Redis）加载已知代理，不做网络请求；
+    后台验证线程定期从代理源发现新代理，并按上次验证时间从旧到新分批重新验证，
+    每批结束后保存快照，重启后即可直接使用。get_proxy 只在内存中选择，从不等待网络。
     
-    def __init__(self, max_proxies: int = 100, check_interval: int = 300):
+    选择：每个代理的代价为 EWMA延迟 / EWMA成功率（由真实抓取结果通过 report 更新），
+    可用代理按「虚拟时间」放在最小堆中，每次取堆顶并把它的虚拟时间推后一个代价，
+    因此快而稳定的代理按比例被更频繁地使用，取出和放回都是 O(log n)。
+    熔断：连续失败 failure_threshold 次、成功率低于 min_success_rate 或被 mark_bad_proxy 标记时打开熔断，
+    冷却 cooldown 秒（重复熔断时加倍，最长 max_cooldown）后半开，只放行一个探测请求，成功才恢复。
+    """
+    
+    def __init__(self, max_proxies: int = 100, check_interval: int = 300, store=None,
+                 autostart: bool = True, validate_workers: int = 20, validate_batch: int = 20,
+                 failure_threshold: int = 2, min_success_rate: float = 0.3, cooldown: float = 30.0,
+                 max_cooldown: float = 600.0, smoothing: float = 0.3):
         self.max_proxies = max_proxies
         self.check_interval = check_interval
-        self.proxies: List[Dict] = []
+        self.store = store
+        self.validate_workers = validate_workers
+        self.validate_batch = validate_batch
+        self.failure_threshold = failure_threshold
+        self.min_success_rate = min_success_rate
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.smoothing = smoothing
+        self.proxies: Dict[str, Dict] = {}  # 代理地址 -> 状态
+        self.ready: List[Tuple[float, int, str]] = []  # 可用代理 (虚拟时间, 版本, 地址) 最小堆
+        self.tripped: List[Tuple[float, int, str]] = []  # 熔断代理 (可探测时间, 版本, 地址) 最小堆
+        self.vclock = 0.0  # 最近一次取出的虚拟时间
+        self.versions = itertools.count(1)  # 堆中条目的版本号，状态变化后旧条目作废
         self.lock = threading.Lock()
-        self.last_check = 0
+        self.last_check = 0  # 最近一次从代理源获取的时间
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.validator: Optional[threading.Thread] = None
         
         # 免费代理源列表
         self.proxy_sources = [
@@ -24,8 +101,75 @@ class ProxyPool:
             'https://api.proxyscrape.com/v2/?request=get&protocol=http&timeout=10000&country=all&ssl=all&anonymity=all',
         ]
         
-        # 初始化代理池
-        self._refresh_proxies()
+        # 从快照热启动，验证在后台进行
+        self._load_snapshot()
+        if autostart:
+            self.start()
+    
+    @classmethod
+    def from_config(cls, config, redis_client=None) -> 'ProxyPool':
+        """按配置创建代理池：未启用代理时不启动后台验证"""
+        store = None
+        if config.proxy_persistence == 'redis' and redis_client is not None:
+            store = RedisProxyStore(redis_client)
+        elif config.proxy_persistence == 'file':
+            store = FileProxyStore(config.proxy_store_path)
+        return cls(
+            max_proxies=config.proxy_max,
+            check_interval=config.proxy_check_interval,
+            store=store,
+            autostart=config.proxy_enabled,
+            failure_threshold=config.proxy_failure_threshold,
+            cooldown=config.proxy_cooldown,
+            max_cooldown=config.proxy_max_cooldown
+        )
+    
+    def _load_snapshot(self) -> None:
+        if self.store is None:
+            return
+        try:
+            records = self.store.load()
+        except Exception as e:
+            logger.warning(f"加载代理快照失败: {e}")
+            return
+        with self.lock:
+            for record in records:
+                if not record.get('proxy'):
+                    continue
+                proxy = self._new_proxy(record['proxy'])
+                proxy.update({field: record[field] for field in PERSISTED_FIELDS if record.get(field) is not None})
+                if proxy['status'] == 'active':
+                    self._schedule(proxy, self.vclock)
+                else:
+                    proxy['status'] = 'unchecked'
+                self.proxies[proxy['proxy']] = proxy
+        logger.info(f"从快照加载 {len(records)} 个代理")
+    
+    def _save_snapshot(self) -> None:
+        if self.store is None:
+            return
+        with self.lock:
+            records = [{field: p.get(field) for field in PERSISTED_FIELDS} for p in self.proxies.values()]
+        try:
+            self.store.save(records)
+        except Exception as e:
+            logger.warning(f"保存代理快照失败: {e}")
+    
+    def start(self) -> None:
+        """启动后台验证线程（幂等）"""
+        if self.validator is not None and self.validator.is_alive():
+            return
+        self.stopped.clear()
+        self.validator = threading.Thread(target=self._run_validator, name='proxy-validator', daemon=True)
+        self.validator.start()
+    
+    def stop(self, timeout: float = None) -> None:
+        """停止后台验证并保存快照"""
+        self.stopped.set()
+        self.wakeup.set()
+        if self.validator is not None:
+            self.validator.join(timeout)
+        self._save_snapshot()
     
     def _fetch_free_proxies(self) -> List[str]:
         """从免费代理源获取代理列表"""
@@ -54,8 +198,8 @@ class ProxyPool:
         try:
             start_time = time.time()
             response = requests.get(
-                test_url, 
-                proxies=proxy_dict, 
+                test_url,
+                proxies=proxy_dict,
                 timeout=10,
                 headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
             )
@@ -75,91 +219,202 @@ class ProxyPool:
         
         return None
     
-    def _refresh_proxies(self):
-        """刷新代理池"""
-        logger.info("开始刷新代理池...")
-        
-        # 获取免费代理
-        proxy_list = self._fetch_free_proxies()
-        
-        # 并发测试代理
-        valid_proxies = []
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            future_to_proxy = {executor.submit(self._test_proxy, proxy): proxy for proxy in proxy_list}
-            
-            for future in as_completed(future_to_proxy):
-                result = future.result()
-                if result:
-                    valid_proxies.append(result)
-                    if len(valid_proxies) >= self.max_proxies:
-                        break
-        
+    def _discover(self) -> None:
+        """从代理源发现新代理，加入待验证（未验证的代理不会被分配）"""
+        candidates = self._fetch_free_proxies()
         with self.lock:
-            self.proxies = valid_proxies
             self.last_check = time.time()
-        
-        logger.info(f"代理池刷新完成，可用代理数量: {len(valid_proxies)}")
+            for address in candidates:
+                if address not in self.proxies and len(self.proxies) < self.max_proxies * 2:
+                    self.proxies[address] = self._new_proxy(address)
+    
+    @staticmethod
+    def _new_proxy(address: str) -> Dict:
+        return {
+            'proxy': address, 'response_time': None, 'latency': None, 'success_rate': 1.0, 'last_used': 0,
+            'success_count': 0, 'fail_count': 0, 'status': 'unchecked', 'checked_at': 0,
+            'check_failures': 0, 'breaker': 'closed', 'consecutive_failures': 0, 'trips': 0, 'version': 0
+        }
+    
+    def _next_batch(self) -> List[str]:
+        """取出最久未验证且已到期的一批代理"""
+        now = time.time()
+        with self.lock:
+            due = [p for p in self.proxies.values() if now - p['checked_at'] >= self.check_interval]
+            due.sort(key=lambda p: p['checked_at'])
+            return [p['proxy'] for p in due[:self.validate_batch]]
+    
+    def _apply_results(self, results: Dict[str, Optional[Dict]]) -> None:
+        now = time.time()
+        with self.lock:
+            for address, result in results.items():
+                proxy = self.proxies.get(address)
+                if proxy is None:
+                    continue
+                proxy['checked_at'] = now
+                if result:
+                    proxy['response_time'] = result['response_time']
+                    if proxy['latency'] is None:
+                        proxy['latency'] = result['response_time']
+                    proxy['check_failures'] = 0
+                    if proxy['status'] != 'active':
+                        proxy['status'] = 'active'
+                        self._schedule(proxy, self.vclock)
+                else:
+                    proxy['check_failures'] += 1
+                    if proxy['status'] == 'unchecked' or proxy['check_failures'] >= 3:
+                        # 新代理验证失败、或连续多次失败的代理直接移除
+                        del self.proxies[address]
+    
+    def _run_validator(self) -> None:
+        """后台验证循环：到期时发现新代理，每轮增量验证一批"""
+        with ThreadPoolExecutor(max_workers=self.validate_workers, thread_name_prefix='proxy-test') as executor:
+            while not self.stopped.is_set():
+                try:
+                    # 池中没有可用代理时更频繁地从代理源补充
+                    interval = self.check_interval if self._active_count() else min(self.check_interval, 60)
+                    if time.time() - self.last_check >= interval:
+                        self._discover()
+                    batch = self._next_batch()
+                    if batch:
+                        results = dict(zip(batch, executor.map(self._test_proxy, batch)))
+                        self._apply_results(results)
+                        self._save_snapshot()
+                        logger.info(f"验证 {len(batch)} 个代理，可用代理数量: {self._active_count()}")
+                        continue
+                except Exception as e:
+                    logger.error(f"代理验证失败: {e}", exc_info=True)
+                # 没有到期的代理时等待，或被 get_proxy 在池空时唤醒
+                self.wakeup.wait(min(self.check_interval, 30))
+                self.wakeup.clear()
+    
+    def _active_count(self) -> int:
+        with self.lock:
+            return sum(1 for p in self.proxies.values() if p['status'] == 'active' and p['breaker'] == 'closed')
+    
+    def _cost(self, proxy: Dict) -> float:
+        """一次请求的预期代价：延迟越高、成功率越低代价越大"""
+        latency = proxy['latency'] or proxy['response_time'] or 1.0
+        return latency / max(proxy['success_rate'], 0.05)
+    
+    def _schedule(self, proxy: Dict, key: float) -> None:
+        """把代理以虚拟时间 key 放入可用堆（调用方持有锁）"""
+        proxy['version'] = next(self.versions)
+        heapq.heappush(self.ready, (key, proxy['version'], proxy['proxy']))
+    
+    def _trip(self, proxy: Dict, now: float) -> None:
+        """打开熔断：移出可用堆，冷却结束后半开（调用方持有锁）"""
+        cooldown = min(self.max_cooldown, self.cooldown * (2 ** proxy['trips']))
+        proxy['trips'] += 1
+        proxy['breaker'] = 'open'
+        proxy['version'] = next(self.versions)
+        heapq.heappush(self.tripped, (now + cooldown, proxy['version'], proxy['proxy']))
+        logger.info(f"代理 {proxy['proxy']} 熔断 {cooldown:.0f}s（连续失败 {proxy['consecutive_failures']} 次）")
+    
+    @staticmethod
+    def _format(proxy: Dict) -> Dict:
+        return {
+            'http': f"http://{proxy['proxy']}",
+            'https': f"http://{proxy['proxy']}"
+        }
     
     def get_proxy(self) -> Optional[Dict]:
-        """获取一个可用代理"""
-        # 检查是否需要刷新代理池
-        if time.time() - self.last_check > self.check_interval:
-            self._refresh_proxies()
-        
+        """获取一个可用代理（只读内存，不做网络请求），O(log n)"""
         with self.lock:
-            if not self.proxies:
-                return None
+            now = time.monotonic()
+            # 冷却结束的熔断代理优先放行一个探测请求（半开），探测超时未报告结果时再放行下一个
+            while self.tripped and self.tripped[0][0] <= now:
+                _, version, address = heapq.heappop(self.tripped)
+                proxy = self.proxies.get(address)
+                if proxy is None or proxy['version'] != version:
+                    continue
+                proxy['breaker'] = 'half_open'
+                proxy['version'] = next(self.versions)
+                heapq.heappush(self.tripped, (now + self.cooldown, proxy['version'], address))
+                proxy['last_used'] = time.time()
+                return self._format(proxy)
             
-            # 选择响应时间最快且最少使用的代理
-            available_proxies = [p for p in self.proxies if p['status'] == 'active']
-            if not available_proxies:
-                return None
+            # 取虚拟时间最小的代理，并按其代价推后
+            while self.ready:
+                key, version, address = heapq.heappop(self.ready)
+                proxy = self.proxies.get(address)
+                if proxy is None or proxy['version'] != version:
+                    continue  # 已移除或状态已变化的旧条目
+                self.vclock = key
+                self._schedule(proxy, key + self._cost(proxy))
+                proxy['last_used'] = time.time()
+                return self._format(proxy)
             
-            # 按响应时间和使用次数排序
-            proxy = min(available_proxies, key=lambda x: (x['last_used'], x['response_time']))
-            proxy['last_used'] = time.time()
+            # 通知后台尽快补充，本次直连
+            self.wakeup.set()
+            return None
+    
+    def report(self, proxy: Union[Dict, str], success: bool, latency: float = None) -> None:
+        """报告一次真实请求的结果，更新EWMA延迟和成功率，并驱动熔断器"""
+        address = proxy_address(proxy)
+        with self.lock:
+            state = self.proxies.get(address)
+            if state is None:
+                return
+            alpha = self.smoothing
+            state['success_rate'] += alpha * ((1.0 if success else 0.0) - state['success_rate'])
             
-            return {
-                'http': f"http://{proxy['proxy']}",
-                'https': f"http://{proxy['proxy']}"
-            }
+            if success:
+                state['success_count'] += 1
+                state['consecutive_failures'] = 0
+                if latency is not None:
+                    state['latency'] = latency if state['latency'] is None else \
+                        state['latency'] + alpha * (latency - state['latency'])
+                if state['breaker'] == 'half_open':
+                    # 探测成功，恢复使用
+                    state['breaker'] = 'closed'
+                    state['trips'] = 0
+                    self._schedule(state, self.vclock)
+                return
+            
+            state['fail_count'] += 1
+            state['consecutive_failures'] += 1
+            if state['breaker'] == 'half_open' or (state['breaker'] == 'closed' and (
+                    state['consecutive_failures'] >= self.failure_threshold or
+                    state['success_rate'] < self.min_success_rate)):
+                self._trip(state, time.monotonic())
+    
+    def mark_bad_proxy(self, proxy: Union[Dict, str]) -> None:
+        """代理本身不可用（连接被拒、代理错误等）：立即熔断"""
+        address = proxy_address(proxy)
+        with self.lock:
+            state = self.proxies.get(address)
+            if state is None or state['breaker'] == 'open':
+                return
+            state['fail_count'] += 1
+            state['consecutive_failures'] += 1
+            state['success_rate'] += self.smoothing * (0.0 - state['success_rate'])
+            self._trip(state, time.monotonic())
     
     def mark_proxy_failed(self, proxy_dict: Dict):
         """标记代理失败"""
-        if not proxy_dict:
-            return
-            
-        proxy_str = proxy_dict.get('http', '').replace('http://', '')
-        
-        with self.lock:
-            for proxy in self.proxies:
-                if proxy['proxy'] == proxy_str:
-                    proxy['fail_count'] += 1
-                    if proxy['fail_count'] >= 3:
-                        proxy['status'] = 'inactive'
-                    break
-    
-    def mark_proxy_success(self, proxy_dict: Dict):
+        if proxy_dict:
+            self.report(proxy_dict, False)
+    
+    def mark_proxy_success(self, proxy_dict: Dict, latency: float = None):
         """标记代理成功"""
-        if not proxy_dict:
-            return
-            
-        proxy_str = proxy_dict.get('http', '').replace('http://', '')
-        
-        with self.lock:
-            for proxy in self.proxies:
-                if proxy['proxy'] == proxy_str:
-                    proxy['success_count'] += 1
-                    proxy['fail_count'] = max(0, proxy['fail_count'] - 1)
-                    break
+        if proxy_dict:
+            self.report(proxy_dict, True, latency)
     
     def get_stats(self) -> Dict:
         """获取代理池统计信息"""
         with self.lock:
-            active_count = len([p for p in self.proxies if p['status'] == 'active'])
+            unchecked_count = len([p for p in self.proxies.values() if p['status'] == 'unchecked'])
+            open_count = len([p for p in self.proxies.values() if p['breaker'] == 'open'])
+            half_open_count = len([p for p in self.proxies.values() if p['breaker'] == 'half_open'])
+            active_count = len(self.proxies) - unchecked_count - open_count - half_open_count
             return {
                 'total_proxies': len(self.proxies),
                 'active_proxies': active_count,
-                'inactive_proxies': len(self.proxies) - active_count,
-                'last_refresh': self.last_check
-            }
\ No newline at end of file
+                'inactive_proxies': open_count + half_open_count,
+                'open_circuits': open_count,
+                'half_open_circuits': half_open_count,
+                'unchecked_proxies': unchecked_count,
+                'last_refresh': self.last_check,
+                'validator_running': self.validator is not None and self.validator.is_alive()
+            }
@@ -0,0 +1,147 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger('query_planner')
+
+@dataclass(frozen=True)
+class CrawlQuery:
+    """一个爬取查询：关键词 + 城市编码（None 表示不限城市）"""
+    keyword: Optional[str] = None
+    city: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """水位线、断点和产出统计使用的键，不限城市时与单关键词模式相同"""
+        if not self.city:
+            return self.keyword or ''
+        return f"{self.keyword or ''}@{self.city}"
+
+class QueryClaims:
+    """一次运行内各查询共享的已见职位
+
+    同一职位只由第一个发现它的查询抓取详情；一整页职位都已被之前的查询列出时视为重叠页，
+    该查询不再继续翻页。同时按查询累计页数、列出数和新认领数，作为下次计划的产出统计。
+    """
+
+    def __init__(self):
+        self.seen: Set[str] = set()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.lock = threading.Lock()
+
+    def _stats(self, query: CrawlQuery) -> Dict[str, int]:
+        return self.stats.setdefault(query.key, {'pages': 0, 'listed': 0, 'new': 0, 'overlapping': 0})
+
+    def claim_jobs(self, query: CrawlQuery, jobs: Iterable[Dict]) -> List[Dict]:
+        """认领职位，返回之前的查询没有见过的部分"""
+        with self.lock:
+            stats = self._stats(query)
+            new = []
+            for job in jobs:
+                source_id = str(job.get('source_id') or '')
+                if source_id and source_id not in self.seen:
+                    self.seen.add(source_id)
+                    new.append(job)
+            stats['new'] += len(new)
+            return new
+
+    def claim_page(self, query: CrawlQuery, job_list: List[Dict], selected: List[Dict]) -> Tuple[List[Dict], bool]:
+        """认领一页列表：返回 (本查询需要抓取详情的新职位, 整页是否都已被之前的查询见过)"""
+        with self.lock:
+            ids = {str(job.get('source_id') or '') for job in job_list}
+            overlapping = bool(ids) and ids <= self.seen
+            new = [job for job in selected if str(job.get('source_id') or '') not in self.seen]
+            self.seen.update(ids)
+            stats = self._stats(query)
+            stats['pages'] += 1
+            stats['listed'] += len(job_list)
+            stats['new'] += len(new)
+            stats['overlapping'] += int(overlapping)
+            return new, overlapping
+
+    def get(self, query: CrawlQuery) -> Dict[str, int]:
+        with self.lock:
+            return dict(self._stats(query))
+
+class QueryPlanner:
+    """关键词 × 城市的查询计划
+
+    每个查询的产出（每翻一页新认领的职位数）按指数加权平均保存在
+    Redis 哈希 crawler:query_stats:{爬虫名} 中，计划按预期产出从高到低排序，
+    产出高的查询先执行、先认领重叠的职位。没有统计或超过 explore_interval 未执行的查询
+    按已知的最高产出估计，保证低产出的查询也会定期重新评估。budget > 0 时每次只执行前 budget 个查询。
+    """
+
+    def __init__(self, redis_client, smoothing: float = 0.5, explore_interval: int = 86400 * 7,
+                 budget: int = 0, prefix: str = 'crawler:query_stats'):
+        self.redis = redis_client
+        self.smoothing = smoothing
+        self.explore_interval = explore_interval
+        self.budget = budget
+        self.prefix = prefix
+
+    @classmethod
+    def from_config(cls, redis_client, config) -> 'QueryPlanner':
+        return cls(
+            redis_client,
+            smoothing=config.query_yield_smoothing,
+            explore_interval=config.query_explore_interval,
+            budget=config.query_budget
+        )
+
+    @staticmethod
+    def expand(keywords: Iterable[Optional[str]], cities: Iterable[Optional[str]] = None) -> List[CrawlQuery]:
+        """展开为查询集合（去重并保持输入顺序）"""
+        cities = list(cities or [None])
+        queries = [CrawlQuery(keyword, city) for keyword in keywords for city in cities]
+        return list(dict.fromkeys(queries))
+
+    def _load(self, namespace: str, queries: List[CrawlQuery]) -> Dict[str, Dict]:
+        keys = [query.key for query in queries]
+        if not keys:
+            return {}
+        records = {}
+        for key, raw in zip(keys, self.redis.hmget(f"{self.prefix}:{namespace}", keys)):
+            if raw is not None:
+                records[key] = json.loads(raw)
+        return records
+
+    def plan(self, namespace: str, keywords: Iterable[Optional[str]],
+             cities: Iterable[Optional[str]] = None, now: float = None) -> List[CrawlQuery]:
+        """按预期产出排序的查询计划"""
+        now = now or time.time()
+        queries = self.expand(keywords, cities)
+        records = self._load(namespace, queries)
+        fresh = {
+            key: record['yield'] for key, record in records.items()
+            if now - record.get('updated_at', 0) < self.explore_interval
+        }
+        prior = max(fresh.values(), default=0.0)
+        expected = {query: fresh.get(query.key, prior) for query in queries}
+
+        plan = sorted(queries, key=lambda query: -expected[query])
+        if self.budget > 0:
+            plan = plan[:self.budget]
+        logger.info(
+            f"Query plan for {namespace}: " +
+            ", ".join(f"{query.key or '-'} ({expected[query]:.1f}/page)" for query in plan)
+        )
+        return plan
+
+    def record(self, namespace: str, query: CrawlQuery, stats: Dict[str, int], now: float = None) -> None:
+        """记录一次查询的产出，更新指数加权平均"""
+        now = now or time.time()
+        observed = stats.get('new', 0) / max(stats.get('pages', 0), 1)
+        record = self._load(namespace, [query]).get(query.key)
+        if record is None:
+            record = {'yield': observed, 'runs': 0}
+        else:
+            record['yield'] = self.smoothing * observed + (1 - self.smoothing) * record['yield']
+        record['runs'] += 1
+        record['last'] = stats
+        record['updated_at'] = now
+        self.redis.hset(f"{self.prefix}:{namespace}", query.key, json.dumps(record, ensure_ascii=False))
+        logger.info(f"Query {query.key or '-'} on {namespace}: {stats}, expected yield {record['yield']:.1f}/page")
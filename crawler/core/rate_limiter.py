@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+logger = logging.getLogger('rate_limiter')
+
+def host_of(url_or_host: str) -> str:
+    """从URL中提取主机名作为限流键"""
+    if '://' not in url_or_host:
+        return url_or_host.lower()
+    return urlsplit(url_or_host).netloc.lower()
+
+class TokenBucket:
+    """令牌桶（线程安全）
+
+    采用预占方式：令牌可以透支，透支量决定调用方需要等待的时间，
+    并发调用方因此按到达顺序排队，而不是轮询抢令牌。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """预占令牌，返回需要等待的秒数（0表示立即可用）"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+class RateLimiter:
+    """按主机划分的令牌桶限流器，在同一进程的所有爬虫间共享"""
+
+    def __init__(self, rate: float = 1.0, burst: int = 2):
+        self.rate = rate
+        self.burst = burst
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self.buckets[host] = bucket
+            return bucket
+
+    def reserve(self, url_or_host: str) -> float:
+        """为目标主机预占一个许可，返回需要等待的秒数"""
+        return self._bucket(host_of(url_or_host)).reserve()
+
+    def acquire(self, url_or_host: str) -> float:
+        """获取许可（仅在预算耗尽时等待），返回实际等待时间"""
+        wait = self.reserve(url_or_host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url_or_host: str) -> float:
+        """异步获取许可，等待期间不阻塞事件循环"""
+        wait = self.reserve(url_or_host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+class RedisRateLimiter(RateLimiter):
+    """基于Redis的分布式令牌桶，多个爬虫进程共享同一主机预算"""
+
+    # 令牌桶状态保存在哈希中，时间取Redis服务器时间，避免各进程时钟偏差
+    RESERVE_SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - 1
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+    if tokens >= 0 then
+        return '0'
+    end
+    return tostring(-tokens / rate)
+    """
+
+    def __init__(self, redis_client, rate: float = 1.0, burst: int = 2, prefix: str = 'crawler:ratelimit'):
+        super().__init__(rate, burst)
+        self.redis = redis_client
+        self.prefix = prefix
+        self._script = redis_client.register_script(self.RESERVE_SCRIPT)
+
+    def reserve(self, url_or_host: str) -> float:
+        key = f"{self.prefix}:{host_of(url_or_host)}"
+        try:
+            return float(self._script(keys=[key], args=[self.rate, self.burst]))
+        except Exception as e:
+            # Redis不可用时退化为进程内限流，保证不会无限制地请求
+            logger.warning(f"Redis rate limiter unavailable, falling back to local bucket: {e}")
+            return super().reserve(url_or_host)
+
+    async def acquire_async(self, url_or_host: str) -> float:
+        wait = await asyncio.to_thread(self.reserve, url_or_host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+def create_rate_limiter(config, redis_client=None) -> RateLimiter:
+    """根据配置创建限流器"""
+    rate = config.host_rate or 1.0 / max(config.request_delay, 0.001)
+
+    if config.rate_limiter_backend == 'redis':
+        if redis_client is None:
+            import redis
+            redis_client = redis.from_url(config.redis_url)
+        return RedisRateLimiter(redis_client, rate, config.host_burst)
+    return RateLimiter(rate, config.host_burst)
@@ -0,0 +1,102 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, Hashable
+
+import redis
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+from .archive import HtmlArchive
+from .proxy_pool import ProxyPool
+from .transport import create_transport, transport_options
+from .user_agent_pool import UserAgentPool
+
+logger = logging.getLogger('resources')
+
+# ProxyPool.from_config 用到的配置项，这些配置不同的爬虫各用一个代理池
+PROXY_POOL_FIELDS = (
+    'proxy_enabled', 'proxy_max', 'proxy_check_interval', 'proxy_persistence', 'proxy_store_path',
+    'proxy_failure_threshold', 'proxy_cooldown', 'proxy_max_cooldown', 'redis_url'
+)
+
+class ResourceRegistry:
+    """进程内共享资源注册表
+
+    按连接参数缓存 Redis 客户端、数据库引擎、HTTP传输、代理池和UA池，同一进程中的管理器和所有爬虫共用，
+    连接池大小取自 CrawlerConfig。新增站点爬虫不再各自创建连接池，也不会各自启动一轮代理验证。
+    HTTP传输和代理池按影响其行为的全部配置项区分，配置不同的爬虫不会拿到按别人的配置创建的实例。
+    close() 统一释放（进程退出或测试结束时调用）。
+    """
+
+    def __init__(self):
+        self.resources: Dict[Hashable, object] = {}
+        self.lock = threading.RLock()  # 代理池的构造会再取 Redis 客户端，需要可重入
+
+    def get(self, key: Hashable, factory: Callable[[], object]) -> object:
+        """取出 key 对应的资源，不存在时调用 factory 创建（每个 key 只创建一次）"""
+        with self.lock:
+            resource = self.resources.get(key)
+            if resource is None:
+                resource = factory()
+                self.resources[key] = resource
+                logger.debug(f"Created shared resource {key[0]}")
+            return resource
+
+    def redis(self, config) -> redis.Redis:
+        """共享的Redis客户端，连接数达到 redis_max_connections 时等待空闲连接而不是报错"""
+        def factory():
+            pool = redis.BlockingConnectionPool.from_url(
+                config.redis_url, max_connections=config.redis_max_connections, timeout=config.timeout
+            )
+            return redis.Redis(connection_pool=pool)
+        return self.get(('redis', config.redis_url), factory)
+
+    def engine(self, config):
+        """共享的数据库引擎（连接池 db_pool_size + db_max_overflow，取出连接前探活）"""
+        def factory():
+            options = {'pool_pre_ping': True}
+            if make_url(config.db_url).get_backend_name() != 'sqlite':
+                options.update(pool_size=config.db_pool_size, max_overflow=config.db_max_overflow)
+            return create_engine(config.db_url, **options)
+        return self.get(('engine', config.db_url), factory)
+
+    def transport(self, config):
+        """共享的HTTP传输（连接池线程安全，传输配置相同的爬虫复用同一组长连接）"""
+        key = ('transport',) + tuple(sorted(transport_options(config).items()))
+        return self.get(key, lambda: create_transport(config))
+
+    def proxy_pool(self, config) -> ProxyPool:
+        """共享的代理池，代理配置相同的爬虫共用一个后台验证线程"""
+        key = ('proxy_pool',) + tuple(getattr(config, field) for field in PROXY_POOL_FIELDS)
+        return self.get(key, lambda: ProxyPool.from_config(config, self.redis(config)))
+
+    def archive(self, config, name: str) -> HtmlArchive:
+        """爬虫的原始HTML归档（同名爬虫写入同一组段文件）"""
+        directory = os.path.abspath(os.path.join(config.archive_dir, name))
+        return self.get(('archive', directory), lambda: HtmlArchive.from_config(config, name))
+
+    def user_agent_pool(self) -> UserAgentPool:
+        return self.get(('user_agent_pool',), UserAgentPool)
+
+    def close(self) -> None:
+        """释放全部资源：停止代理验证并保存快照，关闭连接池"""
+        with self.lock:
+            resources = list(self.resources.items())
+            self.resources.clear()
+
+        for key, resource in resources:
+            try:
+                if isinstance(resource, ProxyPool):
+                    resource.stop(timeout=5)
+                elif isinstance(resource, redis.Redis):
+                    resource.connection_pool.disconnect()
+                elif hasattr(resource, 'dispose'):
+                    resource.dispose()
+                elif hasattr(resource, 'close'):
+                    resource.close()
+            except Exception as e:
+                logger.warning(f"Failed to close shared resource {key[0]}: {e}")
+
+# 进程内默认的注册表，未显式传入时管理器和爬虫都从这里取资源
+default_registry = ResourceRegistry()
@@ -0,0 +1,150 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+logger = logging.getLogger('retry_policy')
+
+# 值得重试的HTTP状态码，其余4xx直接放弃
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+@dataclass
+class RetryStats:
+    """单次运行的重试开销统计"""
+    requests: int = 0  # 逻辑请求数（每个URL计一次）
+    attempts: int = 0  # 实际HTTP尝试次数
+    retries: int = 0  # 重试次数
+    failures: int = 0  # 最终失败的请求数
+    budget_exhausted: int = 0  # 因重试预算耗尽放弃的次数
+    deadline_exceeded: int = 0  # 因超过截止时间放弃的次数
+    retry_wait: float = 0.0  # 退避等待总时长（秒）
+    failed_time: float = 0.0  # 最终失败请求耗费的总时长（秒）
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class RetryBudget:
+    """每次爬取共享的重试预算
+
+    重试次数不超过 min_retries + ratio * 请求数，错误率飙升时自动停止重试，
+    避免失效站点或代理把一次爬取拖成大量无效请求。
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.stats = RetryStats()
+        self.lock = threading.Lock()
+
+    def reset(self) -> RetryStats:
+        """开始新一轮爬取，返回上一轮的统计"""
+        with self.lock:
+            previous, self.stats = self.stats, RetryStats()
+            return previous
+
+    def record_request(self) -> None:
+        with self.lock:
+            self.stats.requests += 1
+
+    def record_attempt(self) -> None:
+        with self.lock:
+            self.stats.attempts += 1
+
+    def try_retry(self, wait: float) -> bool:
+        """申请一次重试，预算耗尽时返回False"""
+        with self.lock:
+            if self.stats.retries >= self.min_retries + self.ratio * self.stats.requests:
+                self.stats.budget_exhausted += 1
+                return False
+            self.stats.retries += 1
+            self.stats.retry_wait += wait
+            return True
+
+    def record_failure(self, elapsed: float, deadline_exceeded: bool = False) -> None:
+        with self.lock:
+            self.stats.failures += 1
+            self.stats.failed_time += elapsed
+            if deadline_exceeded:
+                self.stats.deadline_exceeded += 1
+
+class RetryPolicy:
+    """单个请求的重试策略：总尝试次数、整体截止时间、全抖动指数退避和共享重试预算"""
+
+    def __init__(self, max_attempts: int = 3, deadline: float = 30.0, base_delay: float = 0.5,
+                 max_delay: float = 8.0, budget: RetryBudget = None):
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.attempts = 0
+        self.started = time.monotonic()
+        self.budget.record_request()
+
+    @classmethod
+    def from_config(cls, config, budget: RetryBudget = None) -> 'RetryPolicy':
+        return cls(
+            max_attempts=config.max_retries,
+            deadline=config.retry_deadline,
+            base_delay=config.retry_base_delay,
+            max_delay=config.retry_max_delay,
+            budget=budget
+        )
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - self.elapsed())
+
+    def begin_attempt(self) -> int:
+        """开始一次尝试，返回尝试序号（从1开始）"""
+        self.attempts += 1
+        self.budget.record_attempt()
+        return self.attempts
+
+    def attempt_timeout(self, timeout: float) -> float:
+        """单次尝试的超时时间不超过剩余的截止时间"""
+        return max(0.1, min(timeout, self.remaining()))
+
+    @staticmethod
+    def _status_of(error: Exception) -> Optional[int]:
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None)
+        return status if status is not None else getattr(error, 'status', None)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> float:
+        """读取429/503响应中的 Retry-After（秒）"""
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or getattr(error, 'headers', None) or {}
+        try:
+            return float(headers.get('Retry-After', 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    def is_retryable(self, error: Exception) -> bool:
+        status = self._status_of(error)
+        return status is None or status in RETRYABLE_STATUSES
+
+    def next_delay(self, error: Exception) -> Optional[float]:
+        """本次失败后的退避时间；返回None表示放弃（调用方应抛出异常）"""
+        if not self.is_retryable(error) or self.attempts >= self.max_attempts:
+            self.budget.record_failure(self.elapsed())
+            return None
+
+        cap = min(self.max_delay, self.base_delay * 2 ** (self.attempts - 1))
+        delay = max(random.uniform(0, cap), self._retry_after(error))
+
+        if self.elapsed() + delay >= self.deadline:
+            self.budget.record_failure(self.elapsed(), deadline_exceeded=True)
+            return None
+
+        if not self.budget.try_retry(delay):
+            logger.warning("Retry budget exhausted, giving up without retry")
+            self.budget.record_failure(self.elapsed())
+            return None
+
+        return delay
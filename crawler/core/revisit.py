@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger('revisit')
+
+# 详情页解析出的内容字段，用于判断重访时内容是否变化
+DETAIL_FIELDS = (
+    'description', 'requirements', 'deadline', 'company_type', 'company_size', 'industry',
+    'recruitment_type', 'target_group', 'company_url'
+)
+# 重访时需要保留的列表页字段（详情解析在此基础上补全）
+LIST_FIELDS = ('source', 'source_id', 'job_name', 'company_name', 'location', 'salary', 'publish_date', 'url')
+
+def detail_fingerprint(job: Dict) -> str:
+    raw = json.dumps([job.get(field) for field in DETAIL_FIELDS], ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+def _deadline_ts(value) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+class RevisitScheduler:
+    """详情页重访调度
+
+    按职位记录每次访问时详情内容是否变化，并按站点汇总变化率：
+    内容变化时重访间隔减半，未变化时放大1.5倍，限制在 [min_interval, max_interval]；
+    临近截止日期的职位间隔不超过剩余时间的一半，过了截止日期不再重访。
+    下次访问时间保存在 Redis 有序集合 crawler:revisit:{爬虫名} 中，每次运行按预算取出到期最早的职位。
+    """
+
+    def __init__(self, redis_client, namespace: str, min_interval: int = 3600 * 6,
+                 max_interval: int = 86400 * 30, initial_interval: int = 86400 * 3,
+                 prefix: str = 'crawler:revisit'):
+        self.redis = redis_client
+        self.queue_key = f"{prefix}:{namespace}"
+        self.state_key = f"{prefix}:{namespace}:jobs"
+        self.stats_key = f"{prefix}:{namespace}:stats"
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+
+    @classmethod
+    def from_config(cls, redis_client, namespace: str, config) -> 'RevisitScheduler':
+        return cls(
+            redis_client, namespace,
+            min_interval=config.revisit_min_interval,
+            max_interval=config.revisit_max_interval,
+            initial_interval=config.revisit_initial_interval
+        )
+
+    def _clamp(self, interval: float) -> float:
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def _load_states(self, source_ids: List[str]) -> Dict[str, Dict]:
+        if not source_ids:
+            return {}
+        states = {}
+        for source_id, raw in zip(source_ids, self.redis.hmget(self.state_key, source_ids)):
+            if raw is not None:
+                states[source_id] = json.loads(raw)
+        return states
+
+    def source_change_rate(self) -> Optional[float]:
+        """站点整体的内容变化率（每次重访发现变化的比例），样本不足时返回None"""
+        stats = self.redis.hgetall(self.stats_key) or {}
+        visits = int(stats.get(b'visits', stats.get('visits', 0)) or 0)
+        changes = int(stats.get(b'changes', stats.get('changes', 0)) or 0)
+        return changes / visits if visits >= 20 else None
+
+    def _initial_interval(self, source_rate: Optional[float]) -> float:
+        # 变化频繁的站点新职位更早重访，稳定的站点更晚
+        if source_rate is None:
+            return self._clamp(self.initial_interval)
+        return self._clamp(self.initial_interval * 0.5 / max(source_rate, 0.05))
+
+    def observe(self, jobs: Iterable[Dict], now: float = None) -> Dict[str, bool]:
+        """记录一批详情页访问结果并安排下次访问，返回 {source_id: 内容是否变化}"""
+        now = now or time.time()
+        jobs = [job for job in jobs if job.get('source_id') and job.get('url')]
+        if not jobs:
+            return {}
+
+        ids = [str(job['source_id']) for job in jobs]
+        states = self._load_states(ids)
+        source_rate = self.source_change_rate()
+        changed: Dict[str, bool] = {}
+        revisits = changes = 0
+
+        pipe = self.redis.pipeline(transaction=False)
+        for source_id, job in zip(ids, jobs):
+            fingerprint = detail_fingerprint(job)
+            state = states.get(source_id)
+            if state is None:
+                state = {'visits': 0, 'changes': 0, 'interval': self._initial_interval(source_rate)}
+                changed[source_id] = False
+            else:
+                changed[source_id] = state.get('fingerprint') != fingerprint
+                revisits += 1
+                state['visits'] += 1
+                if changed[source_id]:
+                    state['changes'] += 1
+                    changes += 1
+                    state['interval'] = self._clamp(state['interval'] / 2)
+                else:
+                    state['interval'] = self._clamp(state['interval'] * 1.5)
+
+            state['fingerprint'] = fingerprint
+            state['last_visit'] = now
+            state['job'] = {field: job.get(field) for field in LIST_FIELDS}
+            state['job']['metadata'] = job.get('metadata') or {}
+
+            interval = state['interval']
+            deadline = _deadline_ts(job.get('deadline'))
+            if deadline is not None:
+                if deadline <= now:
+                    # 已截止，不再重访
+                    pipe.hdel(self.state_key, source_id)
+                    pipe.zrem(self.queue_key, source_id)
+                    continue
+                interval = max(self.min_interval, min(interval, (deadline - now) / 2))
+
+            pipe.hset(self.state_key, source_id, json.dumps(state, ensure_ascii=False, default=str))
+            pipe.zadd(self.queue_key, {source_id: now + interval})
+
+        if revisits:
+            pipe.hincrby(self.stats_key, 'visits', revisits)
+            pipe.hincrby(self.stats_key, 'changes', changes)
+        pipe.execute()
+        return changed
+
+    def due(self, limit: int, now: float = None) -> List[Tuple[str, Dict]]:
+        """取出最多 limit 个到期的职位 (source_id, 列表页字段)
+
+        取出的职位先顺延 min_interval 作为租约，进程中途退出时不会在下一轮被立即重复取出。
+        """
+        now = now or time.time()
+        if limit <= 0:
+            return []
+        ids = [
+            member.decode('utf-8') if isinstance(member, bytes) else member
+            for member in self.redis.zrangebyscore(self.queue_key, '-inf', now, start=0, num=limit)
+        ]
+        if not ids:
+            return []
+        self.redis.zadd(self.queue_key, {source_id: now + self.min_interval for source_id in ids})
+        states = self._load_states(ids)
+        return [(source_id, states[source_id]['job']) for source_id in ids if source_id in states]
+
+    def get_stats(self) -> Dict:
+        stats = self.redis.hgetall(self.stats_key) or {}
+        decoded = {
+            (k.decode('utf-8') if isinstance(k, bytes) else k): int(v) for k, v in stats.items()
+        }
+        decoded['scheduled'] = self.redis.zcard(self.queue_key)
+        decoded['due'] = self.redis.zcount(self.queue_key, '-inf', time.time())
+        return decoded
@@ -0,0 +1,267 @@
+import codecs
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import select_proxy
+
+try:
+    import httpx
+except ImportError:  # httpx为可选依赖，仅 HTTP/2 传输需要（pip install 'httpx[http2]'）
+    httpx = None
+
+from .exceptions import CrawlerException
+
+logger = logging.getLogger('transport')
+
+CHUNK_SIZE = 64 * 1024
+
+_CHARSET = re.compile(rb'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+# 国内站点常把GBK内容声明为 gb2312，统一按超集 gb18030 解码，避免生僻字乱码
+_ENCODING_ALIASES = {'gb2312': 'gb18030', 'gbk': 'gb18030'}
+
+def detect_encoding(content_type: str, head: bytes) -> str:
+    """依次按 Content-Type、正文开头的 <meta charset> 确定编码，都没有时按 UTF-8（不对全文做编码探测）"""
+    for source in (content_type.encode('latin-1', 'ignore'), head[:4096]):
+        match = _CHARSET.search(source)
+        if match:
+            try:
+                name = codecs.lookup(match.group(1).decode('ascii')).name
+            except LookupError:
+                continue
+            return _ENCODING_ALIASES.get(name, name)
+    return 'utf-8'
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """响应正文（解压后）超过 http_max_body"""
+    status = 413  # 重试策略按状态码判断，超大响应重试也不会变小
+
+def read_body(chunks: Iterable[bytes], limit: int, url: str) -> bytes:
+    """边解压边读取正文，超过 limit 字节立即中止（0表示不限）"""
+    body = bytearray()
+    for chunk in chunks:
+        body += chunk
+        if limit and len(body) > limit:
+            raise ResponseTooLarge(f"Response body of {url} exceeds {limit} bytes")
+    return bytes(body)
+
+class HttpResponse:
+    """传输层统一的响应：最终URL、状态码、响应头和解压后的正文"""
+
+    def __init__(self, url: str, status_code: int, headers, content: bytes, http_version: str = 'HTTP/1.1'):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.http_version = http_version
+        self.encoding = detect_encoding(headers.get('Content-Type', ''), content)
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.content.decode(self.encoding, errors='replace')
+        return self._text
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """按 (代理, 主机) 复用连接的适配器
+
+    requests 为每个代理地址缓存一个连接池管理器（内部再按主机分池），但缓存没有上限也没有加锁：
+    代理轮换时管理器越积越多，并发线程还可能为同一代理重复创建。这里加锁并按最近使用保留 max_proxies 个，
+    淘汰的管理器关闭其空闲连接。正在使用的代理（hold 之后、release 之前）不会被淘汰，全部在用时暂时超出上限。
+    """
+
+    def __init__(self, max_proxies: int = 64, **kwargs):
+        self.max_proxies = max_proxies
+        self.proxy_lock = threading.Lock()
+        self.in_use: Dict[str, int] = {}
+        super().__init__(**kwargs)
+        self.proxy_manager = OrderedDict()
+
+    def hold(self, proxy: str) -> None:
+        with self.proxy_lock:
+            self.in_use[proxy] = self.in_use.get(proxy, 0) + 1
+
+    def release(self, proxy: str) -> None:
+        with self.proxy_lock:
+            self.in_use[proxy] -= 1
+            if not self.in_use[proxy]:
+                del self.in_use[proxy]
+            self._evict()
+
+    def _evict(self, keep=None) -> None:
+        """从最久未用的开始淘汰空闲代理（keep 为刚取出的代理，不淘汰），直到不超过 max_proxies"""
+        for proxy in list(self.proxy_manager):
+            if len(self.proxy_manager) <= self.max_proxies:
+                break
+            if proxy != keep and proxy not in self.in_use:
+                self.proxy_manager.pop(proxy).clear()
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        with self.proxy_lock:
+            manager = self.proxy_manager.get(proxy)
+            if manager is None:
+                manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+            self.proxy_manager.move_to_end(proxy)
+            self._evict(keep=proxy)
+            return manager
+
+class RequestsTransport:
+    """HTTP/1.1 传输（requests + urllib3）
+
+    每个主机保持 pool_maxsize 个长连接（默认的10个在详情页并发下不够用，多出的连接用完即关，每次都要重新握手）；
+    经代理的请求按 (代理, 主机) 复用连接。gzip/deflate 总是协商，安装 brotli 后自动协商 br；
+    正文以流式读取并逐块解压，编码按响应头和 <meta> 确定。
+    """
+
+    def __init__(self, pool_hosts: int = 20, pool_maxsize: int = 10, max_proxies: int = 64, max_body: int = 0):
+        self.max_body = max_body
+        self.session = requests.Session()
+
+        self.adapter = PooledHTTPAdapter(
+            max_proxies=max_proxies, pool_connections=pool_hosts, pool_maxsize=pool_maxsize, max_retries=0
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def get(self, url: str, params: Dict = None, headers: Dict[str, str] = None,
+            proxies: Dict[str, str] = None, timeout: float = None) -> HttpResponse:
+        # 请求（含读取正文）期间占用该代理，其连接池不会被淘汰
+        proxy = select_proxy(url, proxies or {})
+        if proxy:
+            self.adapter.hold(proxy)
+        try:
+            response = self.session.get(
+                url, params=params, headers=headers, proxies=proxies, timeout=timeout, allow_redirects=True, stream=True
+            )
+            try:
+                length = response.headers.get('Content-Length')
+                if self.max_body and length and length.isdigit() and int(length) > self.max_body:
+                    raise ResponseTooLarge(f"Response body of {url} exceeds {self.max_body} bytes")
+                content = read_body(response.iter_content(CHUNK_SIZE), self.max_body, url)
+            finally:
+                # 正文读完后连接已归还连接池，中途失败时关闭连接
+                response.close()
+        finally:
+            if proxy:
+                self.adapter.release(proxy)
+        version = {10: 'HTTP/1.0', 11: 'HTTP/1.1'}.get(getattr(response.raw, 'version', 11), 'HTTP/1.1')
+        return HttpResponse(response.url, response.status_code, response.headers, content, version)
+
+    def close(self) -> None:
+        self.session.close()
+
+class HttpxTransport:
+    """HTTP/2 传输（httpx + h2）
+
+    同一主机的请求在一条连接上多路复用，详情页并发不再需要为每个工作线程建立连接和TLS握手。
+    httpx 的代理按客户端设置，每个代理一个客户端（客户端内按主机分连接），按最近使用保留 max_proxies 个，
+    正在处理请求的客户端不会被关闭，全部在用时暂时超出上限。
+    """
+
+    def __init__(self, pool_maxsize: int = 10, max_proxies: int = 64, max_body: int = 0, http2: bool = True):
+        if httpx is None:
+            raise CrawlerException("httpx is required for the HTTP/2 transport")
+
+        self.pool_maxsize = pool_maxsize
+        self.max_proxies = max_proxies
+        self.max_body = max_body
+        self.http2 = http2
+        self.clients: 'OrderedDict[Optional[str], httpx.Client]' = OrderedDict()
+        self.in_use: Dict[Optional[str], int] = {}
+        self.lock = threading.Lock()
+        self._client(None)  # 提前创建直连客户端，缺少 h2 时在这里报错
+        self._release(None)
+
+    def _evict(self) -> None:
+        """从最久未用的开始关闭空闲客户端，直到不超过 max_proxies"""
+        for proxy in list(self.clients):
+            if len(self.clients) <= self.max_proxies:
+                break
+            if proxy not in self.in_use:
+                self.clients.pop(proxy).close()
+
+    def _release(self, proxy: Optional[str]) -> None:
+        with self.lock:
+            self.in_use[proxy] -= 1
+            if not self.in_use[proxy]:
+                del self.in_use[proxy]
+            self._evict()
+
+    def _client(self, proxy: Optional[str]) -> 'httpx.Client':
+        """取出代理对应的客户端并登记占用，用完后必须调用 _release"""
+        with self.lock:
+            client = self.clients.get(proxy)
+            if client is None:
+                try:
+                    client = httpx.Client(
+                        http2=self.http2,
+                        proxy=proxy,
+                        limits=httpx.Limits(
+                            max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize
+                        ),
+                        follow_redirects=True
+                    )
+                except ImportError as e:
+                    raise CrawlerException(f"HTTP/2 transport unavailable: {e}") from e
+                self.clients[proxy] = client
+            self.clients.move_to_end(proxy)
+            self.in_use[proxy] = self.in_use.get(proxy, 0) + 1
+            self._evict()
+            return client
+
+    def get(self, url: str, params: Dict = None, headers: Dict[str, str] = None,
+            proxies: Dict[str, str] = None, timeout: float = None) -> HttpResponse:
+        proxy = (proxies or {}).get('https' if url.startswith('https') else 'http')
+        client = self._client(proxy)
+        try:
+            with client.stream('GET', url, params=params, headers=headers, timeout=timeout) as response:
+                content = read_body(response.iter_bytes(CHUNK_SIZE), self.max_body, url)
+        except httpx.ProxyError as e:
+            raise requests.exceptions.ProxyError(str(e)) from e
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        finally:
+            self._release(proxy)
+        return HttpResponse(str(response.url), response.status_code, response.headers, content, response.http_version)
+
+    def close(self) -> None:
+        with self.lock:
+            clients = list(self.clients.values())
+            self.clients.clear()
+        for client in clients:
+            client.close()
+
+def transport_options(config) -> Dict:
+    """传输层的构造参数（共享资源注册表按这些参数区分实例）"""
+    return {
+        'http2': config.http2_enabled,
+        'pool_hosts': config.http_pool_hosts,
+        'pool_maxsize': config.http_pool_maxsize or max(10, config.max_per_host * config.max_concurrent),
+        'max_proxies': config.http_proxy_pools,
+        'max_body': config.http_max_body,
+    }
+
+def create_transport(config):
+    """按配置创建传输层；启用 HTTP/2 但缺少 httpx/h2 时退回 HTTP/1.1"""
+    options = transport_options(config)
+    if options['http2']:
+        try:
+            return HttpxTransport(options['pool_maxsize'], options['max_proxies'], options['max_body'])
+        except CrawlerException as e:
+            logger.warning(f"{e}, falling back to HTTP/1.1 transport")
+    return RequestsTransport(options['pool_hosts'], options['pool_maxsize'], options['max_proxies'], options['max_body'])
@@ -0,0 +1,62 @@
+import logging
+import re
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger('watermark')
+
+# 只有标准格式的日期才参与水位线比较，解析不出的日期一律视为新职位
+_ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+def is_iso_date(value) -> bool:
+    return bool(value) and bool(_ISO_DATE.match(str(value)))
+
+class WatermarkStore:
+    """按关键词保存的增量爬取水位线
+
+    Redis 哈希 crawler:watermark:{爬虫名}:{关键词} 记录已入库的最新发布日期和对应的 source_id，
+    以及最近一次全量扫描的时间。增量模式翻页时，一整页都是水位线及之前的已知职位即可停止。
+    """
+
+    def __init__(self, redis_client, namespace: str, prefix: str = 'crawler:watermark'):
+        self.redis = redis_client
+        self.namespace = namespace
+        self.prefix = prefix
+
+    def _key(self, keyword: str) -> str:
+        return f"{self.prefix}:{self.namespace}:{keyword}"
+
+    def get(self, keyword: str) -> Dict[str, str]:
+        raw = self.redis.hgetall(self._key(keyword)) or {}
+        return {
+            (k.decode('utf-8') if isinstance(k, bytes) else k): (v.decode('utf-8') if isinstance(v, bytes) else v)
+            for k, v in raw.items()
+        }
+
+    def advance(self, keyword: str, publish_date: Optional[str], source_id: Optional[str]) -> None:
+        """把水位线推进到更新的发布日期（不会后退）"""
+        if not is_iso_date(publish_date):
+            return
+        current = self.get(keyword).get('publish_date')
+        if current and current > publish_date:
+            return
+        self.redis.hset(self._key(keyword), mapping={
+            'publish_date': publish_date,
+            'source_id': str(source_id or ''),
+            'updated_at': str(int(time.time()))
+        })
+
+    def needs_full_sweep(self, keyword: str, interval: float) -> bool:
+        """距上次全量扫描超过 interval 秒（或从未扫描、没有水位线）时需要全量扫描"""
+        state = self.get(keyword)
+        if not state.get('publish_date'):
+            return True
+        return time.time() - float(state.get('last_full_sweep') or 0) >= interval
+
+    def mark_full_sweep(self, keyword: str) -> None:
+        self.redis.hset(self._key(keyword), 'last_full_sweep', str(int(time.time())))
+
+    def is_behind(self, watermark: Dict[str, str], publish_date: Optional[str]) -> bool:
+        """职位的发布日期是否在水位线及之前"""
+        mark = watermark.get('publish_date')
+        return bool(mark) and is_iso_date(publish_date) and publish_date <= mark
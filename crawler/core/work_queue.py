@@ -0,0 +1,208 @@
+import json
+import logging
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger('work_queue')
+
+class WorkQueue:
+    """基于Redis的分布式任务队列（可见性超时 + 租约 + 重试 + 死信）
+
+    键（name 为队列名）：
+    - crawler:queue:{name}:ready     待领取的任务ID（列表，先进先出）
+    - crawler:queue:{name}:tasks     任务ID -> 任务JSON（哈希），同一ID在完成前只会入队一次
+    - crawler:queue:{name}:leases    任务ID -> 租约到期时间（有序集合）
+    - crawler:queue:{name}:attempts  任务ID -> 已领取次数，作为租约令牌
+    - crawler:queue:{name}:errors    任务ID -> 最近一次失败原因
+    - crawler:queue:{name}:dead      超过最大尝试次数的任务（列表）
+
+    领取任务时先把租约过期的任务放回队列（工作进程退出或卡住），每次领取计一次尝试；
+    失败的任务在 retry_delay 秒后重新可见，达到 max_attempts 后转入死信列表。
+    所有状态变更都在Lua脚本中原子执行，时间取Redis服务器时间，任意节点的工作进程都可以消费。
+    """
+
+    # KEYS: ready, tasks, leases, attempts, errors, dead
+    _BURY = """
+    local function bury(id, now)
+        local entry = cjson.encode({
+            task = redis.call('HGET', KEYS[2], id),
+            attempts = tonumber(redis.call('HGET', KEYS[4], id) or '0'),
+            error = redis.call('HGET', KEYS[5], id) or '',
+            dead_at = now
+        })
+        redis.call('LPUSH', KEYS[6], entry)
+        redis.call('ZREM', KEYS[3], id)
+        redis.call('HDEL', KEYS[2], id)
+        redis.call('HDEL', KEYS[4], id)
+        redis.call('HDEL', KEYS[5], id)
+    end
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    """
+
+    PUT_SCRIPT = """
+    local added = 0
+    for i = 1, #ARGV, 2 do
+        if redis.call('HSETNX', KEYS[2], ARGV[i], ARGV[i + 1]) == 1 then
+            redis.call('RPUSH', KEYS[1], ARGV[i])
+            added = added + 1
+        end
+    end
+    return added
+    """
+
+    # ARGV: count, visibility_timeout, max_attempts
+    LEASE_SCRIPT = _BURY + """
+    local max_attempts = tonumber(ARGV[3])
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now, 'LIMIT', 0, 100)
+    for _, id in ipairs(expired) do
+        if tonumber(redis.call('HGET', KEYS[4], id) or '0') >= max_attempts then
+            bury(id, now)
+        else
+            redis.call('ZREM', KEYS[3], id)
+            redis.call('RPUSH', KEYS[1], id)
+        end
+    end
+    local leased = {}
+    while #leased < tonumber(ARGV[1]) * 2 do
+        local id = redis.call('LPOP', KEYS[1])
+        if not id then
+            break
+        end
+        local raw = redis.call('HGET', KEYS[2], id)
+        if raw then
+            local attempt = redis.call('HINCRBY', KEYS[4], id, 1)
+            redis.call('ZADD', KEYS[3], now + tonumber(ARGV[2]), id)
+            table.insert(leased, raw)
+            table.insert(leased, tostring(attempt))
+        end
+    end
+    return leased
+    """
+
+    # ARGV: id1, attempt1, id2, attempt2, ...（租约令牌不符说明任务已被其他进程重新领取）
+    ACK_SCRIPT = """
+    local acked = 0
+    for i = 1, #ARGV, 2 do
+        if redis.call('HGET', KEYS[4], ARGV[i]) == ARGV[i + 1] then
+            redis.call('ZREM', KEYS[3], ARGV[i])
+            redis.call('HDEL', KEYS[2], ARGV[i])
+            redis.call('HDEL', KEYS[4], ARGV[i])
+            redis.call('HDEL', KEYS[5], ARGV[i])
+            acked = acked + 1
+        end
+    end
+    return acked
+    """
+
+    # ARGV: id, attempt, error, retry_delay, max_attempts；返回 0 租约已失效，1 稍后重试，2 转入死信
+    FAIL_SCRIPT = _BURY + """
+    local id = ARGV[1]
+    if redis.call('HGET', KEYS[4], id) ~= ARGV[2] then
+        return 0
+    end
+    redis.call('HSET', KEYS[5], id, ARGV[3])
+    if tonumber(ARGV[2]) >= tonumber(ARGV[5]) then
+        bury(id, now)
+        return 2
+    end
+    redis.call('ZADD', KEYS[3], now + tonumber(ARGV[4]), id)
+    return 1
+    """
+
+    def __init__(self, redis_client, name: str = 'default', visibility_timeout: float = 300,
+                 max_attempts: int = 3, retry_delay: float = 30, prefix: str = 'crawler:queue'):
+        self.redis = redis_client
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        base = f"{prefix}:{name}"
+        self.keys = [
+            f"{base}:ready", f"{base}:tasks", f"{base}:leases",
+            f"{base}:attempts", f"{base}:errors", f"{base}:dead"
+        ]
+        self._put = redis_client.register_script(self.PUT_SCRIPT)
+        self._lease = redis_client.register_script(self.LEASE_SCRIPT)
+        self._ack = redis_client.register_script(self.ACK_SCRIPT)
+        self._fail = redis_client.register_script(self.FAIL_SCRIPT)
+
+    @classmethod
+    def from_config(cls, redis_client, config) -> 'WorkQueue':
+        return cls(
+            redis_client, config.queue_name,
+            visibility_timeout=config.task_visibility_timeout,
+            max_attempts=config.task_max_attempts,
+            retry_delay=config.task_retry_delay
+        )
+
+    def put(self, tasks: Iterable[Dict]) -> int:
+        """批量入队（任务必须带 id），尚未完成的同ID任务不会重复入队，返回新入队的数量"""
+        args = []
+        for task in tasks:
+            args.append(str(task['id']))
+            payload = {key: value for key, value in task.items() if key != '_attempt'}
+            args.append(json.dumps(payload, ensure_ascii=False, default=str))
+        if not args:
+            return 0
+        return int(self._put(keys=self.keys, args=args))
+
+    def lease(self, count: int = 1) -> List[Dict]:
+        """领取最多 count 个任务，租约在 visibility_timeout 秒后到期
+
+        返回的任务带 _attempt 字段（第几次领取），确认或失败时据此校验租约。
+        """
+        raw = self._lease(keys=self.keys, args=[count, self.visibility_timeout, self.max_attempts])
+        tasks = []
+        for i in range(0, len(raw), 2):
+            task = json.loads(raw[i])
+            task['_attempt'] = int(raw[i + 1])
+            tasks.append(task)
+        return tasks
+
+    def ack(self, tasks: Iterable[Dict]) -> int:
+        """批量确认完成，返回确认成功的数量（租约已过期并被重新领取的任务不计入）"""
+        args = []
+        for task in tasks:
+            args.extend([str(task['id']), str(task['_attempt'])])
+        if not args:
+            return 0
+        return int(self._ack(keys=self.keys, args=args))
+
+    def fail(self, task: Dict, error: str) -> int:
+        """标记任务失败：未达到最大尝试次数时 retry_delay 秒后重新可见，否则转入死信"""
+        result = int(self._fail(keys=self.keys, args=[
+            str(task['id']), str(task['_attempt']), str(error)[:500], self.retry_delay, self.max_attempts
+        ]))
+        if result == 2:
+            logger.warning(f"Task {task['id']} moved to dead letters after {task['_attempt']} attempts: {error}")
+        return result
+
+    def dead_letters(self, limit: int = 100) -> List[Dict]:
+        """查看死信（最新的在前）"""
+        entries = []
+        for raw in self.redis.lrange(self.keys[5], 0, limit - 1):
+            entry = json.loads(raw)
+            entry['task'] = json.loads(entry['task']) if entry.get('task') else None
+            entries.append(entry)
+        return entries
+
+    def requeue_dead(self, limit: int = 100) -> int:
+        """把死信重新入队（尝试次数清零），返回重新入队的数量"""
+        requeued = 0
+        for _ in range(limit):
+            raw = self.redis.rpop(self.keys[5])
+            if raw is None:
+                break
+            task = json.loads(json.loads(raw).get('task') or 'null')
+            if task:
+                requeued += self.put([task])
+        return requeued
+
+    def get_stats(self) -> Dict[str, int]:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.llen(self.keys[0])
+        pipe.zcard(self.keys[2])
+        pipe.llen(self.keys[5])
+        pipe.hlen(self.keys[1])
+        ready, leased, dead, pending = pipe.execute()
+        return {'ready': ready, 'leased': leased, 'dead': dead, 'pending': pending}
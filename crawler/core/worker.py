@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .pipeline import iter_concurrent
+from .work_queue import WorkQueue
+
+logger = logging.getLogger('worker')
+
+def detail_task(site: str, job: Dict) -> Dict:
+    """详情页任务，ID按 站点:detail:source_id 生成，同一职位在完成前只会入队一次"""
+    return {
+        'id': f"{site}:detail:{job.get('source_id')}",
+        'kind': 'detail',
+        'site': site,
+        'url': job.get('url'),
+        'job': job
+    }
+
+class CrawlWorker:
+    """分布式爬取工作进程：从任务队列领取列表页 / 详情页任务并执行
+
+    列表页任务：抓取并筛选一页，把需要抓取详情的职位作为详情任务入队，并视情况入队下一页；
+    详情页任务：抓取详情，整批清洗、去重、入库成功后才确认，失败的任务交给队列延迟重试。
+    多个工作进程应共享Redis令牌桶（rate_limiter_backend='redis'），总请求速率才不会超过每个主机的预算。
+    """
+
+    def __init__(self, crawlers: Dict[str, object], queue: WorkQueue, batch_size: int = 20,
+                 workers: int = 8, poll_interval: float = 1.0):
+        self.crawlers = crawlers
+        self.queue = queue
+        self.batch_size = batch_size
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.stats = {'leased': 0, 'acked': 0, 'failed': 0, 'enqueued': 0, 'saved': 0}
+
+    def stop(self) -> None:
+        """处理完当前这批任务后退出"""
+        self.stop_event.set()
+
+    def run(self, max_tasks: int = None, idle_timeout: float = None) -> Dict[str, int]:
+        """循环领取并处理任务，直到 stop()、处理满 max_tasks 个，或连续 idle_timeout 秒没有任务"""
+        for crawler in self.crawlers.values():
+            crawler.data_cleaner.start_run()
+        processed = 0
+        idle_since = time.monotonic()
+
+        while not self.stop_event.is_set() and (max_tasks is None or processed < max_tasks):
+            count = self.batch_size if max_tasks is None else min(self.batch_size, max_tasks - processed)
+            tasks = self.queue.lease(count)
+            if not tasks:
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    break
+                self.stop_event.wait(self.poll_interval)
+                continue
+
+            self.process(tasks)
+            processed += len(tasks)
+            idle_since = time.monotonic()
+
+        logger.info(f"Worker finished: {self.stats}, queue: {self.queue.get_stats()}")
+        return self.stats
+
+    def _execute(self, task: Dict) -> Tuple[Dict, object, Optional[str]]:
+        crawler = self.crawlers.get(task.get('site'))
+        if crawler is None:
+            return task, None, f"no crawler registered for site {task.get('site')}"
+        try:
+            if task.get('kind') == 'list':
+                return task, crawler.run_list_task(task), None
+            detail = crawler.fetch_detail(task['job'])
+            if detail is None:
+                return task, None, f"detail fetch failed: {task.get('url')}"
+            return task, detail, None
+        except Exception as e:
+            return task, None, f"{type(e).__name__}: {e}"
+
+    def process(self, tasks: List[Dict]) -> None:
+        """并发执行一批任务；详情结果按站点整批入库后，与列表页任务一起批量确认"""
+        self.stats['leased'] += len(tasks)
+        done: List[Dict] = []
+        details: Dict[str, List[Tuple[Dict, Dict]]] = {}
+
+        for task, result, error in iter_concurrent(
+            self._execute, tasks, workers=self.workers, queue_size=len(tasks), name='worker'
+        ):
+            if error:
+                self.queue.fail(task, error)
+                self.stats['failed'] += 1
+                continue
+            if task.get('kind') == 'list':
+                jobs, next_task = result
+                follow_up = [detail_task(task['site'], job) for job in jobs]
+                if next_task:
+                    follow_up.append(next_task)
+                self.stats['enqueued'] += self.queue.put(follow_up)
+                done.append(task)
+            else:
+                details.setdefault(task['site'], []).append((task, result))
+
+        for site, items in details.items():
+            crawler = self.crawlers[site]
+            try:
+                cleaned = crawler.data_cleaner.clean_batch([job for _, job in items])
+                unique = crawler.select_for_update(cleaned)
+                if unique:
+                    crawler.save_to_database(unique)
+                    self.stats['saved'] += len(unique)
+                done.extend(task for task, _ in items)
+            except Exception as e:
+                logger.error(f"Saving {len(items)} {site} jobs failed: {e}")
+                for task, _ in items:
+                    self.queue.fail(task, f"save failed: {e}")
+                self.stats['failed'] += len(items)
+
+        self.stats['acked'] += self.queue.ack(done)
@@ -1,251 +1,545 @@
 import logging
 import re
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Tuple
 from bs4 import BeautifulSoup, element
+from lxml import etree, html as lxml_html
 from ..core.crawler_manager import BaseCrawler, CrawlerConfig
+from ..core.pipeline import iter_concurrent
+from ..core.classifier import default_classifier, register_dictionary
+from ..core.watermark import is_iso_date
+from ..core.fingerprint import list_fingerprint
+from ..core.frontier import CrawlFrontier
+from ..core.query_planner import CrawlQuery, QueryClaims
 
 logger = logging.getLogger('51job_crawler')
 
+# 解析函数为模块级纯函数（输入HTML字符串，输出普通字典），可以发送到解析进程池执行
+def normalize_publish_date(publish_date: str) -> str:
+    """转换列表页的发布日期为标准格式"""
+    try:
+        if '今天' in publish_date:
+            return datetime.now().strftime('%Y-%m-%d')
+        elif '昨天' in publish_date:
+            return (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        else:
+            # 假设格式为 '08-29'
+            return f"{datetime.now().year}-{publish_date}"
+    except Exception as e:
+        logger.warning(f"Failed to parse publish date: {publish_date}, error: {e}")
+        return datetime.now().strftime('%Y-%m-%d')
+
+def parse_job_list(html: str, source: str = '51job') -> List[Dict]:
+    """解析职位列表页"""
+    soup = BeautifulSoup(html, 'lxml')
+    job_list = []
+
+    # 找到职位列表容器
+    job_items = soup.select('div.j_joblist > div.e > div.el')
+    logger.info(f"Found {len(job_items)} job items on list page")
+
+    for item in job_items:
+        try:
+            # 提取基本信息
+            job_link = item.select_one('p.t1 > a')
+            if not job_link:
+                continue
+
+            job_name = job_link.get('title', '').strip()
+            job_href = job_link.get('href', '')
+            # 提取职位ID（用于去重）
+            match = re.search(r'jobid=(\d+)', job_href)
+            source_id = match.group(1) if match else None
+
+            company_name = item.select_one('span.t2 > a').get('title', '').strip() if item.select_one('span.t2 > a') else ''
+            location = item.select_one('span.t3').text.strip() if item.select_one('span.t3') else ''
+            salary = item.select_one('span.t4').text.strip() if item.select_one('span.t4') else ''
+            publish_date = item.select_one('span.t5').text.strip() if item.select_one('span.t5') else ''
+
+            # 转换发布日期为标准格式
+            publish_date = normalize_publish_date(publish_date)
+
+            job_data = {
+                'source': source,
+                'source_id': source_id,
+                'job_name': job_name,
+                'company_name': company_name,
+                'location': location,
+                'salary': salary,
+                'publish_date': publish_date,
+                'url': job_href,
+                'metadata': {
+                    'salary': salary
+                }
+            }
+
+            job_list.append(job_data)
+        except Exception as e:
+            logger.error(f"Error parsing job item: {e}", exc_info=True)
+            continue
+
+    return job_list
+
+def parse_job_detail(html: str, job_data: Dict) -> Dict:
+    """解析职位详情页"""
+    soup = BeautifulSoup(html, 'lxml')
+
+    try:
+        # 提取公司信息
+        company_info = soup.select_one('div.cn > p.cname > a')
+        if company_info:
+            company_href = company_info.get('href', '')
+            job_data['company_url'] = company_href
+
+        # 提取公司类型、规模、行业
+        company_attrs = soup.select('div.cn > p.msg.ltype')
+        if company_attrs and len(company_attrs) > 0:
+            attrs_text = company_attrs[0].get_text('\n', strip=True)
+            attrs = [attr.strip() for attr in attrs_text.split('\n') if attr.strip()]
+
+            if len(attrs) >= 3:
+                job_data['company_type'] = map_company_type(attrs[0])
+                job_data['company_size'] = attrs[1]
+                job_data['industry'] = attrs[2]
+
+        # 提取职位信息
+        job_info = soup.select('div.tCompany_main > div:nth-child(1) > div')
+        if job_info:
+            job_desc = job_info[0].get_text('\n', strip=True)
+            job_data['description'] = job_desc
+
+            # 从描述中提取招聘类型和目标人群
+            for field, label in classify_description(job_desc).items():
+                if label:
+                    job_data[field] = label
+
+        # 提取截止日期
+        deadline_elem = soup.select_one('div.tCompany_main > div:nth-child(2) > div > p:nth-child(2)')
+        if deadline_elem:
+            deadline_text = deadline_elem.get_text()
+            match = re.search(r'截止日期：(.*)', deadline_text)
+            if match:
+                deadline_str = match.group(1).strip()
+                try:
+                    job_data['deadline'] = datetime.strptime(deadline_str, '%Y-%m-%d').isoformat()
+                except ValueError:
+                    logger.warning(f"Cannot parse deadline: {deadline_str}")
+
+        # 提取工作经验、学历要求等
+        job_requirements = soup.select('div.cn > div.jd > p')
+        if job_requirements:
+            requirements_text = job_requirements[0].get_text('\n', strip=True)
+            job_data['requirements'] = requirements_text
+
+            # 提取到metadata中
+            job_data['metadata']['requirements'] = requirements_text
+
+    except Exception as e:
+        logger.error(f"Error parsing job detail: {e}", exc_info=True)
+
+    return job_data
+
+# 分类词典（关键词 -> 标签），按顺序决定优先级，全部编译进共享分类器的同一个自动机
+register_dictionary('company_type', {
+    '国企': '央国企',
+    '上市公司': '民企',
+    '外商独资': '外企',
+    '中外合资': '外企',
+    '事业单位': '事业单位',
+    '银行': '银行',
+    '民营公司': '民企',
+    '跨国公司': '外企'
+})
+register_dictionary('recruitment_type', {
+    '秋招': '秋招',
+    '秋季招聘': '秋招',
+    '春招': '春招',
+    '春季招聘': '春招',
+    '补录': '补录',
+    '秋招提前批': '秋招提前批',
+    '秋季提前批': '秋招提前批'
+})
+register_dictionary('target_group', {
+    '2024届': '2024',
+    '2025届': '2025',
+    '2026届': '2026',
+    '2027届': '2027'
+})
+
+# 职位描述中未命中时的默认值
+DESCRIPTION_DEFAULTS = {
+    'recruitment_type': '社会招聘',
+    'target_group': '其他'
+}
+
+def map_company_type(type_str: str) -> str:
+    """映射公司类型到标准分类"""
+    return default_classifier.classify_one('company_type', type_str) or type_str
+
+def classify_description(text: str) -> Dict[str, str]:
+    """一次扫描职位描述，提取招聘类型和目标人群"""
+    return default_classifier.classify(text, DESCRIPTION_DEFAULTS, DESCRIPTION_DEFAULTS)
+
+# 快速解析后端：预编译XPath，列表页每个条目单遍提取全部字段，
+# 结果与上面基于 BeautifulSoup 的参考实现一致（见 tests/test_parse_51job.py）
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# 与 BeautifulSoup.get_text 一致，不计入脚本、样式等标签内的文本
+_TEXT = etree.XPath("descendant::text()[not(parent::script or parent::style or parent::template or parent::rt or parent::rp)]")
+_LIST_ITEMS = etree.XPath(
+    f"//div[{_has_class('j_joblist')}]/div[{_has_class('e')}]/div[{_has_class('el')}]"
+)
+_LIST_FIELDS = etree.XPath(
+    f"descendant::p[{_has_class('t1')}]/a | descendant::span[{_has_class('t2')}]/a"
+    f" | descendant::span[{_has_class('t3')} or {_has_class('t4')} or {_has_class('t5')}]"
+)
+_DETAIL_COMPANY_LINK = etree.XPath(f"//div[{_has_class('cn')}]/p[{_has_class('cname')}]/a")
+_DETAIL_COMPANY_ATTRS = etree.XPath(f"//div[{_has_class('cn')}]/p[{_has_class('msg')} and {_has_class('ltype')}]")
+_DETAIL_DESCRIPTION = etree.XPath(f"//div[{_has_class('tCompany_main')}]/*[1][self::div]/div")
+_DETAIL_DEADLINE = etree.XPath(f"//div[{_has_class('tCompany_main')}]/*[2][self::div]/div/*[2][self::p]")
+_DETAIL_REQUIREMENTS = etree.XPath(f"//div[{_has_class('cn')}]/div[{_has_class('jd')}]/p")
+
+def _parse_document(html: str):
+    if not html or not html.strip():
+        return None
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # 带编码声明的字符串需要按字节解析
+        return lxml_html.document_fromstring(html.encode('utf-8'))
+    except etree.ParserError:
+        return None
+
+def _text(node) -> str:
+    return ''.join(_TEXT(node))
+
+def _text_lines(node) -> str:
+    """等价于 get_text('\\n', strip=True)"""
+    return '\n'.join(part for part in (text.strip() for text in _TEXT(node)) if part)
+
+def fast_parse_job_list(html: str, source: str = '51job') -> List[Dict]:
+    """解析职位列表页（快速后端）"""
+    doc = _parse_document(html)
+    job_items = _LIST_ITEMS(doc) if doc is not None else []
+    logger.info(f"Found {len(job_items)} job items on list page")
+    job_list = []
+
+    for item in job_items:
+        try:
+            # 一次查询取出条目内的全部字段节点，每类字段取文档顺序中的第一个
+            fields = {}
+            for node in _LIST_FIELDS(item):
+                if node.tag == 'a':
+                    names = ['t1' if node.getparent().tag == 'p' else 't2']
+                else:
+                    names = [name for name in ('t3', 't4', 't5') if name in node.get('class', '').split()]
+                for name in names:
+                    fields.setdefault(name, node)
+
+            job_link = fields.get('t1')
+            if job_link is None:
+                continue
+
+            job_name = job_link.get('title', '').strip()
+            job_href = job_link.get('href', '')
+            # 提取职位ID（用于去重）
+            match = re.search(r'jobid=(\d+)', job_href)
+            source_id = match.group(1) if match else None
+
+            company_name = fields['t2'].get('title', '').strip() if 't2' in fields else ''
+            location = _text(fields['t3']).strip() if 't3' in fields else ''
+            salary = _text(fields['t4']).strip() if 't4' in fields else ''
+            publish_date = normalize_publish_date(_text(fields['t5']).strip() if 't5' in fields else '')
+
+            job_list.append({
+                'source': source,
+                'source_id': source_id,
+                'job_name': job_name,
+                'company_name': company_name,
+                'location': location,
+                'salary': salary,
+                'publish_date': publish_date,
+                'url': job_href,
+                'metadata': {
+                    'salary': salary
+                }
+            })
+        except Exception as e:
+            logger.error(f"Error parsing job item: {e}", exc_info=True)
+            continue
+
+    return job_list
+
+def fast_parse_job_detail(html: str, job_data: Dict) -> Dict:
+    """解析职位详情页（快速后端）"""
+    doc = _parse_document(html)
+    if doc is None:
+        return job_data
+
+    try:
+        # 提取公司信息
+        company_info = _DETAIL_COMPANY_LINK(doc)
+        if company_info:
+            job_data['company_url'] = company_info[0].get('href', '')
+
+        # 提取公司类型、规模、行业
+        company_attrs = _DETAIL_COMPANY_ATTRS(doc)
+        if company_attrs:
+            attrs = [attr.strip() for attr in _text_lines(company_attrs[0]).split('\n') if attr.strip()]
+            if len(attrs) >= 3:
+                job_data['company_type'] = map_company_type(attrs[0])
+                job_data['company_size'] = attrs[1]
+                job_data['industry'] = attrs[2]
+
+        # 提取职位信息
+        job_info = _DETAIL_DESCRIPTION(doc)
+        if job_info:
+            job_desc = _text_lines(job_info[0])
+            job_data['description'] = job_desc
+
+            for field, label in classify_description(job_desc).items():
+                if label:
+                    job_data[field] = label
+
+        # 提取截止日期
+        deadline_elem = _DETAIL_DEADLINE(doc)
+        if deadline_elem:
+            match = re.search(r'截止日期：(.*)', _text(deadline_elem[0]))
+            if match:
+                deadline_str = match.group(1).strip()
+                try:
+                    job_data['deadline'] = datetime.strptime(deadline_str, '%Y-%m-%d').isoformat()
+                except ValueError:
+                    logger.warning(f"Cannot parse deadline: {deadline_str}")
+
+        # 提取工作经验、学历要求等
+        job_requirements = _DETAIL_REQUIREMENTS(doc)
+        if job_requirements:
+            requirements_text = _text_lines(job_requirements[0])
+            job_data['requirements'] = requirements_text
+            job_data['metadata']['requirements'] = requirements_text
+
+    except Exception as e:
+        logger.error(f"Error parsing job detail: {e}", exc_info=True)
+
+    return job_data
+
+# 解析后端：lxml 为快速实现，soup 为参考实现
+PARSERS = {
+    'lxml': (fast_parse_job_list, fast_parse_job_detail),
+    'soup': (parse_job_list, parse_job_detail),
+}
+
 class FiveOneJobCrawler(BaseCrawler):
     """前程无忧爬虫（企业级网站适配）"""
     name = "51job"
     url = "https://search.51job.com"
+    supports_revisit = True
+    supports_cities = True
+    default_keyword = '校招'  # 默认爬取校招信息
     
-    def __init__(self, config: CrawlerConfig, proxy_pool=None, user_agent_pool=None):
-        super().__init__(config, proxy_pool, user_agent_pool)
+    def __init__(self, config: CrawlerConfig, proxy_pool=None, user_agent_pool=None, rate_limiter=None,
+                 concurrency=None, parse_executor=None, resources=None):
+        super().__init__(config, proxy_pool, user_agent_pool, rate_limiter, concurrency, parse_executor, resources)
         self.base_url = "https://search.51job.com"
         self.detail_base_url = "https://jobs.51job.com"
     
     def _parse_job_list(self, html: str) -> List[Dict]:
-        """解析职位列表页"""
-        soup = BeautifulSoup(html, 'lxml')
-        job_list = []
-        
-        # 找到职位列表容器
-        job_items = soup.select('div.j_joblist > div.e > div.el')
-        logger.info(f"Found {len(job_items)} job items on list page")
-        
-        for item in job_items:
-            try:
-                # 提取基本信息
-                job_link = item.select_one('p.t1 > a')
-                if not job_link:
-                    continue
-                
-                job_name = job_link.get('title', '').strip()
-                job_href = job_link.get('href', '')
-                # 提取职位ID（用于去重）
-                match = re.search(r'jobid=(\d+)', job_href)
-                source_id = match.group(1) if match else None
-                
-                company_name = item.select_one('span.t2 > a').get('title', '').strip() if item.select_one('span.t2 > a') else ''
-                location = item.select_one('span.t3').text.strip() if item.select_one('span.t3') else ''
-                salary = item.select_one('span.t4').text.strip() if item.select_one('span.t4') else ''
-                publish_date = item.select_one('span.t5').text.strip() if item.select_one('span.t5') else ''
-                
-                # 转换发布日期为标准格式
-                try:
-                    if '今天' in publish_date:
-                        publish_date = datetime.now().strftime('%Y-%m-%d')
-                    elif '昨天' in publish_date:
-                        publish_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                    else:
-                        # 假设格式为 '08-29'
-                        publish_date = f"{datetime.now().year}-{publish_date}"
-                except Exception as e:
-                    logger.warning(f"Failed to parse publish date: {publish_date}, error: {e}")
-                    publish_date = datetime.now().strftime('%Y-%m-%d')
-                
-                job_data = {
-                    'source': self.name,
-                    'source_id': source_id,
-                    'job_name': job_name,
-                    'company_name': company_name,
-                    'location': location,
-                    'salary': salary,
-                    'publish_date': publish_date,
-                    'url': job_href,
-                    'metadata': {
-                        'salary': salary
-                    }
-                }
-                
-                job_list.append(job_data)
-            except Exception as e:
-                logger.error(f"Error parsing job item: {e}", exc_info=True)
-                continue
-        
-        return job_list
+        """解析职位列表页（在解析进程池中执行）"""
+        list_parser, _ = PARSERS[self.config.html_parser]
+        return self.parse_executor.run(list_parser, html, self.name)
     
     def _parse_job_detail(self, html: str, job_data: Dict) -> Dict:
-        """解析职位详情页"""
-        soup = BeautifulSoup(html, 'lxml')
+        """解析职位详情页，返回补充了详情字段的职位数据（在解析进程池中执行）"""
+        _, detail_parser = PARSERS[self.config.html_parser]
+        return self.parse_executor.run(detail_parser, html, job_data)
+    
+    def parse(self, html: str) -> List[Dict]:
+        """解析列表页"""
+        return self._parse_job_list(html)
+    
+    def _build_search_params(self, keyword: str, page: int, city: str = None) -> Dict:
+        """构建搜索列表页参数，city 为51job城市编码（如北京 010000），不传时不限城市"""
+        return {
+            'keyword': keyword,
+            'searchType': '2',
+            'industryType': '',
+            'jobArea': city or '000000',
+            'jobType': '',
+            'salary': '',
+            'workYear': '',
+            'education': '',
+            'pageNum': page,
+            'lang': 'c',
+            'stype': '',
+            'postchannel': '0000',
+            'workId': '',
+            'requestId': '',
+            'scene': 'search',
+        }
+    
+    def _iter_list_jobs(self, query: CrawlQuery, max_pages: int = None, frontier: CrawlFrontier = None,
+                        claims: QueryClaims = None) -> Iterator[Dict]:
+        """逐页抓取列表页，产出需要抓取详情的职位（在详情抓取的同时提前发现后续列表页）
         
-        try:
-            # 提取公司信息
-            company_info = soup.select_one('div.cn > p.cname > a')
-            if company_info:
-                company_href = company_info.get('href', '')
-                job_data['company_url'] = company_href
-            
-            # 提取公司类型、规模、行业
-            company_attrs = soup.select('div.cn > p.msg.ltype')
-            if company_attrs and len(company_attrs) > 0:
-                attrs_text = company_attrs[0].get_text('\n', strip=True)
-                attrs = [attr.strip() for attr in attrs_text.split('\n') if attr.strip()]
-                
-                if len(attrs) >= 3:
-                    job_data['company_type'] = self._map_company_type(attrs[0])
-                    job_data['company_size'] = attrs[1]
-                    job_data['industry'] = attrs[2]
-            
-            # 提取职位信息
-            job_info = soup.select('div.tCompany_main > div:nth-child(1) > div')
-            if job_info:
-                job_desc = job_info[0].get_text('\n', strip=True)
-                job_data['description'] = job_desc
-                
-                # 尝试从描述中提取招聘类型
-                recruitment_type = self._extract_recruitment_type(job_desc)
-                if recruitment_type:
-                    job_data['recruitment_type'] = recruitment_type
-                
-                # 尝试提取目标人群
-                target_group = self._extract_target_group(job_desc)
-                if target_group:
-                    job_data['target_group'] = target_group
+        增量模式下，一整页都是水位线及之前的已知职位时停止翻页；
+        全量模式（或到了定期全量扫描的时间）翻完 max_pages 页用于对账。
+        传入断点时跳过已完成的列表页，每页筛选出的职位先写入断点再产出；
+        传入跨查询认领表时，之前的查询已认领的职位不再抓取，整页都被列出过时停止翻页。
+        """
+        max_pages = max_pages or self.config.max_pages
+        full_sweep = self._needs_full_sweep(query.key)
+        watermark = self.watermarks.get(query.key)
+        newest = None  # 本次见到的最新职位 (publish_date, source_id)
+        
+        for page in range(1, max_pages + 1):
+            if frontier is not None and page in frontier.done_pages:
+                continue
+            job_list, selected, stop = self._crawl_list_page(query, page, watermark, full_sweep)
+            if not job_list:
+                break
+            newest = self._newest_job(job_list, newest)
             
-            # 提取截止日期
-            deadline_elem = soup.select_one('div.tCompany_main > div:nth-child(2) > div > p:nth-child(2)')
-            if deadline_elem:
-                deadline_text = deadline_elem.get_text()
-                match = re.search(r'截止日期：(.*)', deadline_text)
-                if match:
-                    deadline_str = match.group(1).strip()
-                    try:
-                        job_data['deadline'] = datetime.strptime(deadline_str, '%Y-%m-%d').isoformat()
-                    except ValueError:
-                        logger.warning(f"Cannot parse deadline: {deadline_str}")
+            if claims is not None:
+                selected, overlapping = claims.claim_page(query, job_list, selected)
+                if overlapping:
+                    logger.info(f"Page {page} of {query.key} was already listed by earlier queries, stopping")
+                    stop = True
             
-            # 提取工作经验、学历要求等
-            job_requirements = soup.select('div.cn > div.jd > p')
-            if job_requirements:
-                requirements_text = job_requirements[0].get_text('\n', strip=True)
-                job_data['requirements'] = requirements_text
-                
-                # 提取到metadata中
-                job_data['metadata']['requirements'] = requirements_text
-        
-        except Exception as e:
-            logger.error(f"Error parsing job detail: {e}", exc_info=True)
+            if frontier is not None:
+                # 上次中断在本页中途时，已写入断点的职位由断点产出
+                selected = [job for job in selected if str(job['source_id']) not in frontier.pending_details]
+                frontier.add_details(selected)
+                frontier.complete_page(page)
+            yield from selected
+            if stop:
+                break
         
-        return job_data
+        # 正常翻完后才推进水位线（中途失败时下次仍从头增量抓取）
+        self._finish_list(query.key, newest, full_sweep)
     
-    def _map_company_type(self, type_str: str) -> str:
-        """映射公司类型到标准分类"""
-        type_map = {
-            '国企': '央国企',
-            '上市公司': '民企',
-            '外商独资': '外企',
-            '中外合资': '外企',
-            '事业单位': '事业单位',
-            '银行': '银行',
-            '民营公司': '民企',
-            '跨国公司': '外企'
-        }
-        
-        for key, value in type_map.items():
-            if key in type_str:
-                return value
+    def _needs_full_sweep(self, scope: str) -> bool:
+        return not self.config.incremental or \
+            self.watermarks.needs_full_sweep(scope, self.config.full_sweep_interval)
+    
+    def _crawl_list_page(self, query: CrawlQuery, page: int, watermark: Dict[str, str],
+                         full_sweep: bool) -> Tuple[List[Dict], List[Dict], bool]:
+        """抓取并筛选一页列表，返回 (整页职位, 需要抓取详情的职位, 是否停止翻页)"""
+        logger.info(f"Crawling 51job page {page} for keyword: {query.keyword}, city: {query.city or 'all'}")
         
-        return type_str
-    
-    def _extract_recruitment_type(self, text: str) -> str:
-        """从文本中提取招聘类型"""
-        patterns = {
-            '秋招': r'秋招|秋季招聘',
-            '春招': r'春招|春季招聘',
-            '补录': r'补录',
-            '秋招提前批': r'秋招提前批|秋季提前批'
-        }
+        # 抓取并解析列表页
+        html = self.fetch(self.base_url, self._build_search_params(query.keyword, page, query.city))
+        job_list = self._parse_job_list(html)
+        if not job_list:
+            logger.info("No more jobs found, stopping crawl")
+            return [], [], True
         
-        for type_name, pattern in patterns.items():
-            if re.search(pattern, text):
-                return type_name
+        # 整页批量筛选：新职位，以及列表指纹变化或超过刷新期限的已知职位才抓取详情
+        for job in job_list:
+            job['metadata']['list_fingerprint'] = list_fingerprint(job)
+        selected = self.select_for_update(job_list)
+        logger.debug(f"Page {page}: {len(selected)}/{len(job_list)} jobs need detail fetch")
         
-        return '社会招聘'  # 默认值
-    
-    def _extract_target_group(self, text: str) -> str:
-        """从文本中提取目标人群"""
-        patterns = {
-            '2024': r'2024届',
-            '2025': r'2025届',
-            '2026': r'2026届',
-            '2027': r'2027届'
+        selected_ids = {id(job) for job in selected}
+        stop = not full_sweep and all(
+            id(job) not in selected_ids and self.watermarks.is_behind(watermark, job.get('publish_date'))
+            for job in job_list
+        )
+        if stop:
+            logger.info(f"Page {page} is entirely behind the watermark {watermark.get('publish_date')}, stopping")
+        return job_list, selected, stop
+    
+    @staticmethod
+    def _newest_job(job_list: List[Dict], newest: Optional[Tuple[str, str]] = None) -> Optional[Tuple[str, str]]:
+        """更新见到的最新职位 (publish_date, source_id)"""
+        for job in job_list:
+            if is_iso_date(job.get('publish_date')) and (newest is None or job['publish_date'] > newest[0]):
+                newest = (job['publish_date'], job.get('source_id'))
+        return newest
+    
+    def _finish_list(self, scope: str, newest: Optional[Tuple[str, str]], full_sweep: bool) -> None:
+        if newest:
+            self.watermarks.advance(scope, *newest)
+        if full_sweep:
+            self.watermarks.mark_full_sweep(scope)
+    
+    def list_task(self, keyword: str = None, city: str = None) -> Optional[Dict]:
+        """分布式模式的第一个列表页任务，是否全量扫描和水位线在入队时确定，随任务逐页传递"""
+        query = CrawlQuery(keyword or self.default_keyword, city)
+        return {
+            'id': f"{self.name}:list:{query.key}:1",
+            'kind': 'list',
+            'site': self.name,
+            'keyword': query.keyword,
+            'city': query.city,
+            'page': 1,
+            'full_sweep': self._needs_full_sweep(query.key),
+            'watermark': self.watermarks.get(query.key),
+            'newest': None
         }
+    
+    def run_list_task(self, task: Dict) -> Tuple[List[Dict], Optional[Dict]]:
+        """执行一个列表页任务；翻页结束时推进水位线，否则返回下一页任务"""
+        query, page = CrawlQuery(task['keyword'], task.get('city')), task['page']
+        job_list, selected, stop = self._crawl_list_page(query, page, task['watermark'], task['full_sweep'])
+        newest = self._newest_job(job_list, tuple(task['newest']) if task.get('newest') else None)
+        if stop or page >= self.config.max_pages:
+            self._finish_list(query.key, newest, task['full_sweep'])
+            return selected, None
+        return selected, dict(task, id=f"{self.name}:list:{query.key}:{page + 1}", page=page + 1, newest=newest)
+    
+    def fetch_detail(self, job: Dict) -> Optional[Dict]:
+        """抓取并解析单个详情页，失败时返回None（新职位和重访共用）"""
+        try:
+            detail_html = self.fetch(job.get('url', ''))
+            return self._parse_job_detail(detail_html, job)
+        except Exception as e:
+            logger.error(f"Failed to fetch detail for {job.get('url')}: {e}")
+            return None
+    
+    def iter_jobs(self, keyword: str = None) -> Iterator[Dict]:
+        """流水线爬取：列表页发现的详情URL进入有界队列，由工作线程并发抓取，按完成顺序产出"""
+        yield from self.iter_query(CrawlQuery(keyword or self.default_keyword))
+    
+    def iter_query(self, query: CrawlQuery, claims: QueryClaims = None) -> Iterator[Dict]:
+        """按查询（关键词 + 城市）流水线爬取，跨查询的重复职位在抓取详情之前按页剔除"""
+        frontier = self.open_frontier(query.key)
+        
+        def discover() -> Iterator[Dict]:
+            # 先处理上次中断时已发现、尚未入库的详情页，再继续未完成的列表页
+            pending = list(frontier.pending_details.values())
+            yield from claims.claim_jobs(query, pending) if claims is not None else pending
+            yield from self._iter_list_jobs(query, frontier=frontier, claims=claims)
+            frontier.exhausted = True
         
-        for group, pattern in patterns.items():
-            if re.search(pattern, text):
-                return group
+        def fetch(job: Dict) -> Optional[Dict]:
+            detail = self.fetch_detail(job)
+            if detail is None:
+                # 抓取失败的详情不留在断点中，未入库的职位下次列表扫描时会重新发现
+                frontier.ack([job.get('source_id')])
+            return detail
         
-        return '其他'
+        yield from iter_concurrent(
+            fetch,
+            discover(),
+            workers=self.config.max_per_host,
+            queue_size=self.config.detail_queue_size,
+            name=self.name
+        )
     
     def crawl(self, keyword: str = None) -> List[Dict]:
         """执行爬取"""
         all_jobs = []
-        keyword = keyword or '校招'  # 默认爬取校招信息
+        completed = False
         
         try:
-            # 爬取前5页
-            for page in range(1, 6):
-                logger.info(f"Crawling 51job page {page} for keyword: {keyword}")
-                
-                # 构建搜索URL
-                params = {
-                    'keyword': keyword,
-                    'searchType': '2',
-                    'industryType': '',
-                    'jobArea': '000000',
-                    'jobType': '',
-                    'salary': '',
-                    'workYear': '',
-                    'education': '',
-                    'pageNum': page,
-                    'lang': 'c',
-                    'stype': '',
-                    'postchannel': '0000',
-                    'workId': '',
-                    'requestId': '',
-                    'scene': 'search',
-                }
-                
-                # 抓取列表页
-                html = self.fetch(self.base_url, params)
-                
-                # 解析列表页
-                job_list = self._parse_job_list(html)
-                if not job_list:
-                    logger.info("No more jobs found, stopping crawl")
-                    break
-                
-                # 抓取详情页
-                for job in job_list:
-                    # 检查去重
-                    if self.is_duplicate(job.get('source_id')):
-                        logger.debug(f"Duplicate job found: {job.get('source_id')}")
-                        continue
-                    
-                    # 抓取详情
-                    try:
-                        detail_html = self.fetch(job.get('url', ''))
-                        detailed_job = self._parse_job_detail(detail_html, job)
-                        all_jobs.append(detailed_job)
-                    except Exception as e:
-                        logger.error(f"Failed to fetch detail for {job.get('url')}: {e}")
-                        continue
-        
+            for job in self.iter_jobs(keyword):
+                all_jobs.append(job)
+            completed = True
         except Exception as e:
             logger.error(f"Crawl failed: {e}", exc_info=True)
+        finally:
+            self.close_frontier(completed)
         
         return all_jobs
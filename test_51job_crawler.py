@@ -2,7 +2,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from crawler.core.crawler_manager import CrawlerConfig
+from crawler.core.crawler_manager import CrawlerConfig, setup_logging
 from crawler.sites.51job_crawler import FiveOneJobCrawler
 import json
 from datetime import datetime
@@ -71,4 +71,5 @@ def test_51job_crawler():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    setup_logging()
     test_51job_crawler()
\ No newline at end of file
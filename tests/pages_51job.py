@@ -0,0 +1,40 @@
+"""51job 页面样例：结构与线上列表页、详情页一致，解析测试和解析基准共用"""
+
+def build_list_page(items: int) -> str:
+    """生成结构与51job列表页一致的页面（含页头、脚本等无关内容）"""
+    rows = []
+    for i in range(items):
+        rows.append(
+            f"<div class='el'>"
+            f"<p class='t1 '><span><input type='checkbox'></span>"
+            f"<a target='_blank' title=' Java开发工程师（2025届校招）{i} ' href='https://jobs.51job.com/shanghai/{i}.html?jobid={100000 + i}'>"
+            f"Java开发工程师</a></p>"
+            f"<span class='t2'><a target='_blank' title='某某科技有限公司{i}' href='https://jobs.51job.com/all/co{i}.html'>某某科技</a></span>"
+            f"<span class='t3'> 上海-浦东新区 </span>"
+            f"<span class='t4'>1-1.5万/月</span>"
+            f"<span class='t5'>{'今天' if i % 3 == 0 else '08-29'}</span>"
+            f"</div>"
+        )
+    nav = ''.join(f"<li><a href='/c{i}'>分类{i}</a><ul><li>子类</li><li>子类</li></ul></li>" for i in range(200))
+    script = "<script>var data = {" + ','.join(f'"k{i}": {i}' for i in range(500)) + "};</script>"
+    return (
+        "<html><head><meta charset='utf-8'><title>校招</title>" + script + "</head><body>"
+        f"<div class='header'><ul>{nav}</ul></div>"
+        "<div class='j_joblist'><div class='e'>" + ''.join(rows) + "</div></div>"
+        f"<div class='footer'><ul>{nav}</ul></div></body></html>"
+    )
+
+def build_detail_page() -> str:
+    """生成结构与51job详情页一致的页面"""
+    paragraphs = ''.join(f"<p>{i}. 负责后端服务开发，面向2025届毕业生的秋季招聘</p>" for i in range(30))
+    return (
+        "<html><head><meta charset='utf-8'><style>.a{color:red}</style></head><body>"
+        "<div class='cn'><h1 title='Java开发'>Java开发</h1>"
+        "<p class='cname'><a href='https://jobs.51job.com/all/co1.html' title='某某科技'>某某科技</a></p>"
+        "<p class='msg ltype'>民营公司&nbsp;&nbsp;|&nbsp;&nbsp;<br>500-1000人<br> 计算机软件 </p>"
+        "<div class='jd'><p>本科 | 无需经验 <!-- 备注 --> | 招5人</p></div></div>"
+        "<div class='tCompany_main'>"
+        f"<div class='tBorderTop_box'><div class='bmsg job_msg inbox'>{paragraphs}<script>track()</script></div></div>"
+        "<div class='tBorderTop_box'><div class='bmsg'><p>联系方式</p><p>截止日期：2025-10-31</p></div></div>"
+        "</div></body></html>"
+    )
@@ -0,0 +1,76 @@
+"""测试用的51job替身站点：替换爬虫的抓取、解析和入库，不访问网络和数据库"""
+import importlib
+
+from crawler.core.crawler_manager import CrawlerConfig, CrawlerManager
+from crawler.core.resources import ResourceRegistry
+
+job51 = importlib.import_module('crawler.sites.51job_crawler')
+
+def list_job(source_id, publish_date='2026-10-01'):
+    return {
+        'source': '51job', 'source_id': source_id, 'url': f"u{source_id}", 'job_name': 'x',
+        'company_name': 'c', 'location': 'l', 'salary': '1-2万', 'publish_date': publish_date
+    }
+
+def make_manager(redis_client, tmp_path, **overrides):
+    """注册了51job爬虫的管理器，共享资源使用传入的（fake）Redis，返回 (管理器, 资源注册表)"""
+    options = {
+        'proxy_enabled': False, 'db_url': 'sqlite://', 'max_pages': 5, 'incremental': False,
+        'frontier_ack_batch': 2, 'proxy_store_path': str(tmp_path / 'proxies.json')
+    }
+    options.update(overrides)
+    config = CrawlerConfig(**options)
+    resources = ResourceRegistry()
+    resources.resources[('redis', config.redis_url)] = redis_client
+    manager = CrawlerManager(config, resources=resources)
+    manager.register_crawler(job51.FiveOneJobCrawler)
+    return manager, resources
+
+class StubSite:
+    """替身站点：默认每个关键词4页列表、每页3个职位，列表页按 (关键词, 页) 记录抓取次数
+
+    listings[关键词] 为每页的职位列表，测试可以直接修改来模拟新发布的职位。
+    """
+
+    def __init__(self, crawler, pages=4, per_page=3):
+        self.crawler = crawler
+        self.pages = pages
+        self.per_page = per_page
+        self.listings = {}
+        self.list_fetches = []
+        self.detail_fetches = []
+        self.fail_page = None
+        self.saved = []
+        crawler.fetch = self.fetch
+        crawler._parse_job_list = self.parse_list
+        crawler._parse_job_detail = lambda html, base: dict(base, description='d')
+        crawler.save_to_database = self.save
+
+    def listing(self, keyword):
+        if keyword not in self.listings:
+            self.listings[keyword] = [
+                [list_job(f"{keyword}-{page}-{i}") for i in range(self.per_page)]
+                for page in range(1, self.pages + 1)
+            ]
+        return self.listings[keyword]
+
+    def fetch(self, url, params=None):
+        if params is None:
+            self.detail_fetches.append(url)
+            return url
+        page = (params['keyword'], params['pageNum'])
+        if page == self.fail_page:
+            raise RuntimeError('list page failed')
+        self.list_fetches.append(page)
+        return page
+
+    def parse_list(self, page):
+        keyword, number = page
+        pages = self.listing(keyword)
+        if number > len(pages):
+            return []
+        return [dict(item, metadata={}) for item in pages[number - 1]]
+
+    def save(self, batch):
+        self.saved.extend(item['source_id'] for item in batch)
+        self.crawler.mark_saved(batch)
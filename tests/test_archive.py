@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from crawler.core.archive import ArchiveReader, HtmlArchive, _list_segments, _segment_paths
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / 'archive')
+
+def page(i: int) -> bytes:
+    return f"<html><body>页面 {i} {'x' * (i % 7) * 50}</body></html>".encode('utf-8')
+
+def test_round_trip_in_write_order(directory):
+    archive = HtmlArchive(directory, codec='gzip')
+    for i in range(5):
+        archive.append(f"https://example.com/{i}", page(i), status=200 + i, fetched_at=1000.0 + i)
+    archive.close()
+
+    with ArchiveReader(directory) as reader:
+        records = [(p.url, p.status, p.fetched_at, p.content, p.text) for p in reader]
+    assert [r[0] for r in records] == [f"https://example.com/{i}" for i in range(5)]
+    assert [r[1] for r in records] == [200, 201, 202, 203, 204]
+    assert records[3][3] == page(3)
+    assert records[3][4] == page(3).decode('utf-8')
+
+def test_sealed_index_lookup_and_history_order(directory):
+    archive = HtmlArchive(directory, segment_bytes=400, codec='gzip')
+    # 同一URL的多次抓取分布在多个段中，且写入顺序与抓取时间不一致
+    for fetched_at in (30.0, 10.0, 20.0, 50.0, 40.0):
+        archive.append('https://example.com/job', page(int(fetched_at)), fetched_at=fetched_at)
+        archive.append(f"https://example.com/other/{fetched_at}", page(1), fetched_at=fetched_at)
+    archive.close()
+    segments = _list_segments(directory)
+    assert len(segments) > 1
+    assert os.path.exists(_segment_paths(directory, segments[0])[1])
+
+    with ArchiveReader(directory) as reader:
+        history = reader.history('https://example.com/job')
+        assert [p.fetched_at for p in history] == [10.0, 20.0, 30.0, 40.0, 50.0]
+        assert reader.lookup('https://example.com/job').content == page(50)
+        assert reader.lookup('https://example.com/job', at=35.0).fetched_at == 30.0
+        assert reader.lookup('https://example.com/job', at=5.0) is None
+        assert reader.lookup('https://example.com/missing') is None
+        assert [p.fetched_at for p in reader.iter_records(since=20.0, until=40.0)] == [30.0, 30.0, 20.0, 20.0]
+
+def test_truncated_tail_is_recovered(directory):
+    archive = HtmlArchive(directory, codec='gzip')
+    for i in range(3):
+        archive.append(f"https://example.com/{i}", page(i))
+    path = _segment_paths(directory, archive.seq)[0]
+    archive.close()
+    size = os.path.getsize(path)
+    # 模拟写到一半时崩溃
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 17)
+
+    with ArchiveReader(directory) as reader:
+        assert len(list(reader)) == 3
+
+    archive = HtmlArchive(directory, codec='gzip')
+    assert os.path.getsize(path) == size
+    archive.append('https://example.com/3', page(3))
+    archive.close()
+    with ArchiveReader(directory) as reader:
+        assert [p.url for p in reader] == [f"https://example.com/{i}" for i in range(4)]
+
+def test_concurrent_writers_use_separate_segments(directory):
+    first = HtmlArchive(directory, codec='gzip')
+    second = HtmlArchive(directory, codec='gzip')
+    assert first.seq != second.seq
+    for i in range(4):
+        first.append(f"https://example.com/a/{i}", page(i))
+        second.append(f"https://example.com/b/{i}", page(i))
+    first.close()
+    second.close()
+
+    with ArchiveReader(directory) as reader:
+        urls = sorted(p.url for p in reader)
+    assert urls == sorted([f"https://example.com/a/{i}" for i in range(4)] +
+                          [f"https://example.com/b/{i}" for i in range(4)])
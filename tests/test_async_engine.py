@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from crawler.core.async_engine import AsyncFetchEngine
+from crawler.core.crawler_manager import CrawlerConfig
+from crawler.core.exceptions import RetryException
+
+class StandIn(BaseHTTPRequestHandler):
+    """本地替身站点：记录峰值并发；/flaky/ 路径第一次返回429，/missing 返回404"""
+    latency = 0.05
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    seen = set()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+            first = self.path not in cls.seen
+            cls.seen.add(self.path)
+        try:
+            time.sleep(self.latency)
+            if self.path == '/missing' or (self.path.startswith('/flaky/') and first):
+                self.send_response(404 if self.path == '/missing' else 429)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body = self.path.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def base_url():
+    StandIn.in_flight = StandIn.peak = 0
+    StandIn.seen = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def make_config(**overrides):
+    options = {'max_per_host': 2, 'adaptive_concurrency': False, 'host_rate': 1000.0, 'host_burst': 100,
+               'retry_base_delay': 0.01, 'proxy_enabled': False}
+    options.update(overrides)
+    return CrawlerConfig(**options)
+
+async def fetch_all(config, urls):
+    async with AsyncFetchEngine(config) as engine:
+        return engine, await engine.fetch_many(urls)
+
+def test_in_flight_requests_are_limited_per_host(base_url):
+    urls = [f"{base_url}/job/{i}" for i in range(8)]
+    engine, results = asyncio.run(fetch_all(make_config(), urls))
+    assert results == [f"/job/{i}" for i in range(8)]
+    assert StandIn.peak == 2
+    assert engine.stats == {'requests': 8, 'failures': 0}
+
+def test_throttled_requests_are_retried(base_url):
+    urls = [f"{base_url}/flaky/{i}" for i in range(3)]
+    engine, results = asyncio.run(fetch_all(make_config(), urls))
+    assert results == [f"/flaky/{i}" for i in range(3)]
+    assert engine.stats == {'requests': 6, 'failures': 3}
+
+def test_client_errors_are_not_retried(base_url):
+    engine, results = asyncio.run(fetch_all(make_config(), [f"{base_url}/missing", f"{base_url}/job/1"]))
+    assert isinstance(results[0], RetryException)
+    assert results[1] == '/job/1'
+    assert engine.stats == {'requests': 2, 'failures': 1}
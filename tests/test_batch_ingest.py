@@ -0,0 +1,97 @@
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip('flask')
+# 后端应用缺少依赖（或在不完整的检出中）时跳过
+backend = pytest.importorskip('backend.app')
+job_routes = pytest.importorskip('backend.app.routes.job_routes')
+from backend.app.config import DevelopmentConfig
+
+TOKEN = 'secret-token'
+
+def make_app(monkeypatch, **overrides):
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'CACHE_TYPE': 'SimpleCache',
+        'RATELIMIT_ENABLED': False,
+        'INGEST_TOKEN': TOKEN,
+    }
+    settings.update(overrides)
+    for key, value in settings.items():
+        monkeypatch.setattr(DevelopmentConfig, key, value, raising=False)
+    app = backend.create_app('dev')
+    app.config['TESTING'] = True
+    return app
+
+def post_batch(client, body, token=TOKEN, **headers):
+    if token is not None:
+        headers['X-Ingest-Token'] = token
+    return client.post('/batch', data=body, content_type='application/x-ndjson', headers=headers)
+
+def record(source_id, **fields):
+    return {'source': '51job', 'source_id': source_id, 'job_name': 'x', 'company_name': 'c', **fields}
+
+def ndjson(*lines):
+    return b''.join(
+        (line if isinstance(line, bytes) else json.dumps(line).encode('utf-8')) + b'\n' for line in lines
+    )
+
+def test_disabled_without_configured_token(monkeypatch):
+    client = make_app(monkeypatch, INGEST_TOKEN=None).test_client()
+    assert post_batch(client, ndjson(record('1'))).status_code == 503
+
+def test_rejects_wrong_or_missing_token(monkeypatch):
+    client = make_app(monkeypatch).test_client()
+    assert post_batch(client, ndjson(record('1')), token='wrong').status_code == 401
+    assert post_batch(client, ndjson(record('1')), token=None).status_code == 401
+
+def test_requires_postgresql(monkeypatch):
+    client = make_app(monkeypatch).test_client()
+    response = post_batch(client, ndjson(record('1')))
+    assert response.status_code == 501
+
+def test_malformed_lines_are_rejected_individually(monkeypatch):
+    app = make_app(monkeypatch)
+    body = ndjson(record('1'), b'not json', b'', [1, 2], {'source': '51job'}, record('2'))
+    with app.test_request_context('/batch', data=body, content_type='application/x-ndjson'):
+        records = list(job_routes._iter_ndjson_records())
+
+    errors = [job_routes._normalize_ingest_record(item)[1] for item in records]
+    assert errors[0] is None and errors[-1] is None
+    assert errors[1].startswith('Invalid JSON')
+    assert errors[2] == 'Record must be an object'
+    assert errors[3].startswith('Missing required fields')
+
+def test_chunks_are_written_while_the_body_streams(monkeypatch):
+    app = make_app(monkeypatch)
+    monkeypatch.setattr(job_routes, 'INGEST_CHUNK_SIZE', 2)
+    consumed, flushed_at = [], []
+
+    def records():
+        for i in range(5):
+            consumed.append(i)
+            yield record(str(i))
+
+    def flush(chunk):
+        flushed_at.append(len(consumed))
+        return [{'index': index, 'source_id': row['source_id'], 'status': 'inserted'} for index, row in chunk]
+
+    monkeypatch.setattr(job_routes, '_flush_ingest_chunk', flush)
+    summary = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+    with app.app_context():
+        results = [result for chunk in job_routes._ingest_records(records(), summary) for result in chunk]
+
+    # 每块在读到下一条记录时就写入，而不是等整个请求体读完
+    assert flushed_at == [3, 5, 5]
+    assert [result['source_id'] for result in results] == ['0', '1', '2', '3', '4']
+    assert summary['inserted'] == 5
+
+def test_gzip_body_over_limit_is_rejected(monkeypatch):
+    app = make_app(monkeypatch, INGEST_MAX_BYTES=1024)
+    body = gzip.compress(ndjson(*(record(str(i)) for i in range(100))))
+    with app.test_request_context('/batch', data=body, content_type='application/x-ndjson',
+                                  headers={'Content-Encoding': 'gzip'}):
+        with pytest.raises(job_routes.IngestTooLarge):
+            list(job_routes._iter_ndjson_records())
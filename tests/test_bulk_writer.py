@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import create_engine, select, update
+
+from crawler.core.bulk_writer import BulkJobWriter, jobs_table, metadata
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+def job(source_id, **fields):
+    return {'source': '51job', 'source_id': source_id, 'job_name': 'x', 'company_name': 'c', **fields}
+
+def rows(engine):
+    with engine.connect() as conn:
+        return {row.source_id: row for row in conn.execute(select(jobs_table))}
+
+def test_upsert_keeps_existing_values_and_user_fields(engine):
+    writer = BulkJobWriter(engine)
+    assert writer.write([job('1', description='详情', location='上海')]) == 1
+    with engine.begin() as conn:
+        conn.execute(update(jobs_table).values(delivery_status='已投递'))
+    created_at = rows(engine)['1'].created_at
+
+    # 只有列表页字段的记录不会清空已抓到的详情
+    assert writer.write([job('1', job_name='y', location='北京')]) == 1
+    row = rows(engine)['1']
+    assert (row.job_name, row.location, row.description) == ('y', '北京', '详情')
+    assert row.delivery_status == '已投递'
+    assert row.created_at == created_at
+    assert row.updated_at >= created_at
+
+def test_batches_and_duplicate_keys(engine):
+    writer = BulkJobWriter(engine, batch_size=2)
+    jobs = [job(str(i)) for i in range(5)] + [job('3', job_name='last')]
+    assert writer.write(jobs) == 5
+    saved = rows(engine)
+    assert sorted(saved) == ['0', '1', '2', '3', '4']
+    assert saved['3'].job_name == 'last'
+
+def test_invalid_jobs_are_skipped_and_extras_kept(engine):
+    writer = BulkJobWriter(engine)
+    jobs = [
+        job('1', salary='1-2万', publish_date='2026-10-01', deadline='2026-11-01', metadata={'list_fingerprint': 'f'}),
+        {'source': '51job', 'source_id': '2', 'job_name': 'x'},
+    ]
+    assert writer.write(jobs) == 1
+    row = rows(engine)['1']
+    assert row.metadata_info == {'salary': '1-2万', 'publish_date': '2026-10-01', 'list_fingerprint': 'f'}
+    assert row.deadline.year == 2026
+    assert writer.write([]) == 0
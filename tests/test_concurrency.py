@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+import requests
+
+from crawler.core import concurrency
+from crawler.core.concurrency import AdaptiveConcurrency, is_congestion_signal
+from crawler.core.exceptions import RateLimitException
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(concurrency, 'time', clock)
+    return clock
+
+def limit_of(controller, host='example.com'):
+    return controller.windows[host].limit
+
+def test_healthy_responses_grow_the_window_additively(clock):
+    controller = AdaptiveConcurrency(initial=2, max_limit=4)
+    for _ in range(2):
+        controller.release(controller.acquire('https://example.com/a'), latency=0.2)
+    # 每次成功增加 1/limit：2 -> 2.5 -> 2.9
+    assert limit_of(controller) == pytest.approx(2.9)
+
+    for _ in range(20):
+        controller.release(controller.acquire('example.com'), latency=0.2)
+    assert limit_of(controller) == 4
+
+def test_429_backs_off_once_per_round_trip(clock):
+    controller = AdaptiveConcurrency(initial=8, max_limit=8)
+    host = controller.acquire('example.com')
+    controller.release(host, latency=0.5)
+
+    error = requests.exceptions.HTTPError(response=type('Response', (), {'status_code': 429})())
+    assert is_congestion_signal(error)
+    for _ in range(3):
+        controller.release(controller.acquire(host), congested=is_congestion_signal(error))
+    # 同一个往返时间内的多次429只减小一次
+    assert limit_of(controller) == 4
+
+    clock.now += 1.0
+    controller.release(controller.acquire(host), congested=True)
+    assert limit_of(controller) == 2
+    for _ in range(5):
+        clock.now += 1.0
+        controller.release(controller.acquire(host), congested=True)
+    assert limit_of(controller) == 1
+    assert controller.get_stats()['example.com']['congestions'] == 9
+
+def test_latency_spike_counts_as_congestion(clock):
+    controller = AdaptiveConcurrency(initial=4, max_limit=8, latency_tolerance=2.0, smoothing=1.0)
+    controller.release(controller.acquire('example.com'), latency=0.1)
+    clock.now += 5
+    controller.release(controller.acquire('example.com'), latency=1.0)
+    assert limit_of(controller) < 4
+
+def test_congestion_signals():
+    assert is_congestion_signal(RateLimitException('slow down'))
+    assert is_congestion_signal(requests.exceptions.ReadTimeout())
+    assert not is_congestion_signal(requests.exceptions.ConnectionError())
+
+def test_acquire_waits_for_a_free_slot(clock):
+    controller = AdaptiveConcurrency(initial=1, max_limit=1)
+    host = controller.acquire('example.com')
+    acquired = threading.Event()
+
+    def second():
+        controller.acquire('example.com')
+        acquired.set()
+
+    thread = threading.Thread(target=second, daemon=True)
+    thread.start()
+    assert not acquired.wait(0.1)
+    controller.release(host, latency=0.1)
+    assert acquired.wait(1.0)
+    thread.join(1.0)
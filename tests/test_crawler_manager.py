@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+import fakeredis
+import pytest
+
+from crawler.core.crawler_manager import CrawlerConfig, CrawlerManager
+from crawler.core.resources import ResourceRegistry
+
+@pytest.fixture
+def manager(tmp_path):
+    config = CrawlerConfig(proxy_enabled=False, db_url='sqlite://', proxy_store_path=str(tmp_path / 'proxies.json'))
+    resources = ResourceRegistry()
+    resources.resources[('redis', config.redis_url)] = fakeredis.FakeRedis()
+    manager = CrawlerManager(config, resources=resources)
+    yield manager
+    resources.close()
+
+class NamedCrawler:
+    def __init__(self, name):
+        self.name = name
+
+def stub_runs(manager):
+    """爬虫 a 本轮失败（返回空列表且没有统计），b 入库2条"""
+    manager.crawlers = [NamedCrawler('a'), NamedCrawler('b')]
+    manager.last_run_stats = {'a': {'saved': 5}, 'b': {'saved': 7}}
+
+    def run_crawler(crawler, *args):
+        manager.last_run_stats.pop(crawler.name, None)
+        if crawler.name == 'b':
+            manager.last_run_stats['b'] = {'saved': 2}
+            return [{}, {}]
+        return []
+    manager.run_crawler = run_crawler
+
+def test_run_all_totals_only_this_run(manager, caplog):
+    stub_runs(manager)
+    with caplog.at_level(logging.INFO, logger='crawler_manager'):
+        manager.run_all(concurrent=False)
+    assert manager.last_run_stats == {'b': {'saved': 2}}
+    assert 'Total unique jobs: 2' in caplog.text
+
+def test_run_all_async_totals_only_this_run(manager, caplog):
+    stub_runs(manager)
+    with caplog.at_level(logging.INFO, logger='crawler_manager'):
+        asyncio.run(manager.run_all_async())
+    assert manager.last_run_stats == {'b': {'saved': 2}}
+    assert 'Total unique jobs: 2' in caplog.text
@@ -0,0 +1,114 @@
+import itertools
+from datetime import datetime
+
+import pytest
+
+from crawler.core.data_cleaner import DataCleaner, LRUCache
+from tests.reference_cleaner import ReferenceDataCleaner
+
+SALARIES = [
+    '', '面议', '薪资面议', '10k-20k', '10K~20K', '1-2万', '1.5-2万/月', '1万-2万', '3-5千', '6千-8千',
+    '10000-20000', '8000~12000元/月', '200元/天', '15-25k·13薪', 'abc',
+]
+LOCATIONS = ['', '上海', '上海-浦东新区', '北京 - 海淀区', '深圳·南山区', '广州•天河', '  杭州\t\n西湖区 ', '成都\x07']
+DATES = [
+    '', '今天', '刚刚发布', '昨天', '前天', '3天前', '天前', '2025-08-29', '2025/8/9', '29-08-2025', '9/8/2025',
+    '2025-02-30', '08-29', 'not a date',
+]
+EDUCATIONS = ['', '本科', '本科及以上', '硕士研究生', 'MBA优先', '学士学位', '大专', '博士', '高中/中专', '无要求']
+EXPERIENCES = ['', '应届毕业生', '1年以下', '1-3年经验', '3-5年', '5-10年', '10年以上', '经验不限', '2年']
+DESCRIPTIONS = ['', '<p>负责\n\n后端开发</p>', '  多余   空白\t字段 ', '<div><b>2026届</b> 校招</div>\n\n<br/>']
+
+def make_jobs():
+    """各字段取值轮流组合，覆盖每个取值并产生重复值（命中缓存）"""
+    jobs = []
+    columns = [SALARIES, LOCATIONS, DATES, EDUCATIONS, EXPERIENCES, DESCRIPTIONS]
+    size = max(len(column) for column in columns) * 3
+    for index, (salary, location, date, education, experience, description) in enumerate(
+        zip(*(itertools.islice(itertools.cycle(column), size) for column in columns))
+    ):
+        jobs.append({
+            'source_id': str(index),
+            'title': f'  Java\t开发 {index % 4} ',
+            'company': '某某\x00科技' if index % 5 == 0 else f' 公司{index % 3} ',
+            'salary': salary,
+            'location': location,
+            'posted_at': date,
+            'deadline': DATES[(index + 3) % len(DATES)],
+            'education': education,
+            'experience': experience,
+            'description': description,
+            'metadata': {'index': index},
+        })
+    return jobs
+
+def without_timestamp(jobs):
+    return [{key: value for key, value in job.items() if key != 'crawled_at'} for job in jobs]
+
+@pytest.fixture
+def cleaners():
+    cleaner = DataCleaner(cache_size=16)
+    cleaner.start_run(datetime.now())
+    return cleaner, ReferenceDataCleaner()
+
+def test_clean_job_data_matches_reference(cleaners):
+    cleaner, reference = cleaners
+    for job in make_jobs():
+        assert without_timestamp([cleaner.clean_job_data(job)]) == without_timestamp([reference.clean_job_data(job)])
+
+def test_clean_batch_matches_reference_across_runs(cleaners):
+    cleaner, reference = cleaners
+    jobs = make_jobs()
+    expected = without_timestamp([reference.clean_job_data(job) for job in jobs])
+    # 第二次运行大部分命中缓存（容量小于取值数，也会触发淘汰），结果必须相同
+    for _ in range(2):
+        assert without_timestamp(cleaner.clean_batch(jobs)) == expected
+    assert cleaner.get_stats()['salary']['hits'] > 0
+
+def test_batch_clean_matches_reference_validation_and_errors(cleaners):
+    cleaner, reference = cleaners
+    jobs = make_jobs()
+    # 原实现中会抛出异常（非字符串薪资）的记录被跳过
+    jobs.append({'source_id': 'bad', 'title': 't', 'company': 'c', 'salary': 15000})
+    jobs.append({'source_id': '', 'title': 't', 'company': 'c'})
+    assert without_timestamp(cleaner.batch_clean(jobs)) == without_timestamp(reference.batch_clean(jobs))
+
+def test_lru_cache_is_bounded_and_counts_hits():
+    cache = LRUCache(maxsize=2)
+    computed = []
+
+    def compute(key):
+        computed.append(key)
+        return key.upper()
+
+    for key in ('a', 'b', 'a', 'c', 'b', 'a'):
+        assert cache.get_or_compute(key, lambda: compute(key)) == key.upper()
+    # 'a' 刚被访问过，加入 'c' 时淘汰 'b'；之后依次淘汰最久未用的 'a' 和 'c'
+    assert computed == ['a', 'b', 'c', 'b', 'a']
+    assert cache.get_stats() == {'size': 2, 'hits': 1, 'misses': 5, 'hit_ratio': 0.1667}
+
+def test_repeated_values_are_normalized_once_across_batches():
+    cleaner = DataCleaner()
+    calls = []
+    parse_salary = cleaner._parse_salary
+    cleaner._parse_salary = lambda raw: calls.append(raw) or parse_salary(raw)
+    cleaner.compile()
+
+    jobs = [{'source_id': str(i), 'title': 't', 'company': 'c', 'salary': '1-2万'} for i in range(3)]
+    cleaner.clean_batch(jobs)
+    cleaner.clean_batch(jobs)
+    assert calls == ['1-2万']
+    assert cleaner.get_stats()['salary'] == {'size': 1, 'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+def test_relative_dates_follow_the_run_reference_time():
+    cleaner = DataCleaner()
+    job = {'source_id': '1', 'title': 't', 'company': 'c', 'posted_at': '3天前', 'deadline': '2026-11-01'}
+
+    cleaner.start_run(datetime(2026, 10, 17, 23, 59))
+    assert cleaner.clean_job_data(job)['posted_at'] == '2026-10-14'
+    assert cleaner.clean_job_data(job)['deadline'] == '2026-11-01'
+
+    # 新一次运行的基准时间不同，缓存的相对日期随之失效
+    cleaner.start_run(datetime(2026, 10, 18, 0, 1))
+    assert cleaner.clean_job_data(job)['posted_at'] == '2026-10-15'
+    assert cleaner.get_stats()['date']['size'] == 2
@@ -0,0 +1,35 @@
+import time
+
+import fakeredis
+import pytest
+
+from crawler.core.dedup import DedupLedger
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+def test_marks_from_other_process_visible_after_refresh(redis_client):
+    ours = DedupLedger(redis_client, 'site', refresh_interval=0.05)
+    other = DedupLedger(redis_client, 'site')
+    assert ours.seen_many(['a', 'b']) == set()
+
+    other.mark_many(['a'])
+    time.sleep(0.1)
+    assert ours.seen_many(['a', 'b']) == {'a'}
+
+def test_filter_is_rebuilt_larger_when_over_capacity(redis_client):
+    ledger = DedupLedger(redis_client, 'site', capacity=10)
+    ledger.seen_many(['x'])
+    ledger.mark_many([str(i) for i in range(50)])
+    assert ledger.bloom.count > ledger.bloom.capacity
+
+    assert ledger.seen_many(['1', 'new']) == {'1'}
+    assert ledger.bloom.capacity >= 100
+    assert ledger.bloom.count == 50
+
+def test_rebuild_keeps_ids_marked_by_this_process(redis_client):
+    ledger = DedupLedger(redis_client, 'site')
+    ledger.mark_many(['a', 'b'])
+    ledger.rebuild()
+    assert 'a' in ledger.bloom and 'b' in ledger.bloom
@@ -0,0 +1,26 @@
+import fakeredis
+
+from crawler.core.fingerprint import FingerprintStore
+
+def test_mark_and_read_back():
+    store = FingerprintStore(fakeredis.FakeRedis(), 'site', refresh_interval=3600)
+    store.mark_many({'1': 'aaa', '2': 'bbb'})
+
+    records = store.get_many(['1', '2', '3'])
+    assert {k: v[0] for k, v in records.items()} == {'1': 'aaa', '2': 'bbb'}
+    assert not store.needs_refresh(records['1'], 'aaa')
+    assert store.needs_refresh(records['1'], 'changed')
+    assert store.needs_refresh(None, 'aaa')
+
+def test_expired_records_are_pruned_on_write(monkeypatch):
+    redis_client = fakeredis.FakeRedis()
+    store = FingerprintStore(redis_client, 'site', refresh_interval=3600)
+    monkeypatch.setattr('crawler.core.fingerprint.time.time', lambda: 1_000_000)
+    store.mark_many({'old': 'aaa'})
+
+    monkeypatch.setattr('crawler.core.fingerprint.time.time', lambda: 1_000_000 + 3600)
+    store.mark_many({'new': 'bbb'})
+
+    assert store.get_many(['old', 'new']).keys() == {'new'}
+    assert redis_client.hlen(store.key) == 1
+    assert redis_client.zcard(store.index_key) == 1
@@ -0,0 +1,114 @@
+import fakeredis
+import pytest
+import redis
+
+from crawler.core.crawler_manager import CrawlerConfig
+from crawler.core.frontier import CrawlFrontier, RedisFrontierStore, SQLiteFrontierStore, create_frontier_store
+from crawler.core.query_planner import CrawlQuery
+from tests.stub_site import StubSite, make_manager
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+@pytest.fixture(params=['redis', 'sqlite'])
+def store(request, redis_client, tmp_path):
+    if request.param == 'redis':
+        return RedisFrontierStore(redis_client)
+    return SQLiteFrontierStore(str(tmp_path / 'frontier.db'))
+
+def job(source_id):
+    return {'source': '51job', 'source_id': source_id, 'url': f"u{source_id}", 'metadata': {}}
+
+def test_interrupted_crawl_resumes_from_checkpoint(store):
+    frontier = CrawlFrontier(store, '51job:k', ack_batch_size=1)
+    assert not frontier.resumed
+    frontier.add_details([job('1'), job('2')])
+    frontier.complete_page(1)
+    frontier.ack(['1'])
+    # 进程在列表页遍历完之前退出
+    frontier.complete()
+
+    resumed = CrawlFrontier(store, '51job:k')
+    assert resumed.resumed
+    assert resumed.done_pages == {1}
+    assert list(resumed.pending_details) == ['2']
+    assert resumed.pending_details['2']['url'] == 'u2'
+
+def test_acks_are_batched(store):
+    frontier = CrawlFrontier(store, '51job:k', ack_batch_size=3, ack_interval=3600)
+    frontier.add_details([job(str(i)) for i in range(4)])
+
+    frontier.ack(['0', '1'])
+    assert set(store.load('51job:k')[2]) == {'0', '1', '2', '3'}
+    frontier.ack(['2'])
+    assert set(store.load('51job:k')[2]) == {'3'}
+
+    frontier.ack(['3'])
+    frontier.flush()
+    assert store.load('51job:k')[2] == {}
+
+def test_ack_ignores_ids_of_other_frontiers(store):
+    first = CrawlFrontier(store, '51job:a', ack_batch_size=1)
+    second = CrawlFrontier(store, '51job:b', ack_batch_size=1)
+    first.add_details([job('1')])
+    second.add_details([job('2')])
+
+    first.ack(['1', '2'])
+    second.ack(['1'])
+    assert store.load('51job:a')[2] == {}
+    assert set(store.load('51job:b')[2]) == {'2'}
+
+def test_complete_clears_exhausted_crawl_only(store):
+    frontier = CrawlFrontier(store, '51job:k')
+    frontier.add_details([job('1')])
+    frontier.complete_page(1)
+    frontier.complete()
+    assert store.load('51job:k')[0]
+
+    frontier.exhausted = True
+    frontier.complete()
+    assert store.load('51job:k') == ({}, set(), {})
+
+def test_falls_back_to_sqlite_without_redis(tmp_path):
+    class Unreachable:
+        def ping(self):
+            raise redis.ConnectionError('refused')
+
+    config = CrawlerConfig(frontier_path=str(tmp_path / 'frontier.db'))
+    assert isinstance(create_frontier_store(config, Unreachable()), SQLiteFrontierStore)
+
+@pytest.fixture
+def manager(redis_client, tmp_path):
+    manager, resources = make_manager(redis_client, tmp_path)
+    yield manager
+    resources.close()
+
+def test_multi_query_run_clears_every_checkpoint(manager, redis_client):
+    crawler = manager.crawlers[0]
+    site = StubSite(crawler)
+    queries = [CrawlQuery('a'), CrawlQuery('b')]
+
+    manager.run_crawler(crawler, collect=False, queries=queries)
+    assert len(site.saved) == 24
+    assert redis_client.keys('crawler:frontier:*') == []
+
+    # 再次运行不会因为残留的断点跳过列表页
+    site.list_fetches.clear()
+    manager.run_crawler(crawler, collect=False, queries=queries)
+    assert set(site.list_fetches) >= {('a', 1), ('b', 1)}
+    assert redis_client.keys('crawler:frontier:*') == []
+
+def test_failed_run_keeps_checkpoint_and_resumes(manager, redis_client):
+    crawler = manager.crawlers[0]
+    site = StubSite(crawler)
+    site.fail_page = ('a', 3)
+
+    manager.run_crawler(crawler, 'a', collect=False)
+    assert redis_client.smembers('crawler:frontier:51job:a:pages') == {b'1', b'2'}
+
+    site.fail_page = None
+    site.list_fetches.clear()
+    manager.run_crawler(crawler, 'a', collect=False)
+    assert site.list_fetches == [('a', 3), ('a', 4), ('a', 5)]
+    assert redis_client.keys('crawler:frontier:*') == []
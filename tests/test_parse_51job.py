@@ -0,0 +1,97 @@
+import importlib
+
+import pytest
+
+from tests.pages_51job import build_detail_page, build_list_page
+
+# 站点模块名以数字开头，只能通过 importlib 导入
+job51 = importlib.import_module('crawler.sites.51job_crawler')
+
+def list_page(rows: str) -> str:
+    return f"<html><body><div class='j_joblist'><div class='e'>{rows}</div></div></body></html>"
+
+def detail_page(cn: str = '', main: str = '') -> str:
+    return f"<html><head><meta charset='utf-8'></head><body><div class='cn'>{cn}</div>{main}</body></html>"
+
+LIST_PAGES = {
+    'generated': build_list_page(50),
+    'empty': '<html><body></body></html>',
+    'missing_fields': list_page(
+        # 缺少公司、薪资、日期
+        "<div class='el'><p class='t1'><a title=' 测试工程师 ' href='https://jobs.51job.com/a/1.html?jobid=1'>x</a></p>"
+        "<span class='t3'>北京</span></div>"
+        # 缺少职位链接（跳过）
+        "<div class='el'><span class='t2'><a title='某公司'>某公司</a></span></div>"
+        # 链接中没有 jobid
+        "<div class='el'><p class='t1'><a title='运维' href='https://jobs.51job.com/a/2.html'>x</a></p></div>"
+    ),
+    'nbsp_and_comments': list_page(
+        "<div class='el'><p class='t1'><a title='算法&nbsp;工程师' href='/j?jobid=3'>x</a></p>"
+        "<span class='t2'><a title='某&nbsp;公司'>x</a></span>"
+        "<span class='t3'>&nbsp;上海&nbsp;-&nbsp;徐汇<!-- 区域 --></span>"
+        "<span class='t4'>1-1.5万/月<script>var s = 1;</script></span>"
+        "<span class='t5'>昨天</span></div>"
+    ),
+    'multiple_classes': list_page(
+        "<div class='el odd'><p class='t1 hot'><a title='产品' href='/j?jobid=4'>x</a></p>"
+        "<span class='t3 area'>深圳</span><span class='t4'>面议</span><span class='t5'>今天</span></div>"
+    ),
+}
+
+DETAIL_PAGES = {
+    'generated': build_detail_page(),
+    'empty': '<html><body></body></html>',
+    'missing_company': detail_page(
+        main="<div class='tCompany_main'><div class='tBorderTop_box'><div class='bmsg'><p>2026届秋招</p></div></div></div>"
+    ),
+    'missing_main': detail_page(
+        cn="<p class='cname'><a href='https://jobs.51job.com/all/co2.html'>公司</a></p>"
+           "<div class='jd'><p>硕士&nbsp;|&nbsp;1年经验</p></div>"
+    ),
+    'short_company_attrs': detail_page(cn="<p class='msg ltype'>国企&nbsp;&nbsp;|&nbsp;&nbsp;<br>100人</p>"),
+    'description_noise': detail_page(
+        cn="<p class='msg ltype'>外商独资<br>1000人以上<br>互联网</p>",
+        main="<div class='tCompany_main'>"
+             "<div class='tBorderTop_box'><div class='bmsg job_msg'>"
+             "<p>负责&nbsp;数据平台<!-- 内部备注：2024届 --></p>"
+             "<script>var target = '2027届';</script><style>.x{}</style>"
+             "<p>面向2025届&nbsp;春季招聘</p></div></div>"
+             "<div class='tBorderTop_box'><div class='bmsg'><p>联系</p><p>截止日期：2026-03-01</p></div></div>"
+             "</div>"
+    ),
+    'bad_deadline': detail_page(
+        main="<div class='tCompany_main'><div><div>描述</div></div>"
+             "<div><div><p>联系</p><p>截止日期：尽快</p></div></div></div>"
+    ),
+}
+
+def base_job():
+    return {'source': '51job', 'metadata': {}}
+
+@pytest.mark.parametrize('name', sorted(LIST_PAGES))
+def test_fast_list_parser_matches_reference(name):
+    page = LIST_PAGES[name]
+    assert job51.fast_parse_job_list(page) == job51.parse_job_list(page)
+
+@pytest.mark.parametrize('name', sorted(DETAIL_PAGES))
+def test_fast_detail_parser_matches_reference(name):
+    page = DETAIL_PAGES[name]
+    assert job51.fast_parse_job_detail(page, base_job()) == job51.parse_job_detail(page, base_job())
+
+def test_list_parser_edge_cases():
+    jobs = job51.fast_parse_job_list(LIST_PAGES['missing_fields'])
+    assert [job['source_id'] for job in jobs] == ['1', None]
+    assert jobs[0]['job_name'] == '测试工程师'
+    assert jobs[0]['company_name'] == '' and jobs[0]['salary'] == ''
+
+    job = job51.fast_parse_job_list(LIST_PAGES['nbsp_and_comments'])[0]
+    assert job['location'] == '上海\xa0-\xa0徐汇'
+    assert 'var s' not in job['salary']
+
+def test_detail_description_skips_comments_and_scripts():
+    job = job51.fast_parse_job_detail(DETAIL_PAGES['description_noise'], base_job())
+    assert job['description'] == '负责\xa0数据平台\n面向2025届\xa0春季招聘'
+    assert job['target_group'] == '2025'
+    assert job['recruitment_type'] == '春招'
+    assert job['company_type'] == '外企'
+    assert job['deadline'] == '2026-03-01T00:00:00'
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from crawler.core.pipeline import StreamingPipeline, iter_concurrent
+
+def test_iter_concurrent_yields_all_results_and_drops_none():
+    results = iter_concurrent(lambda x: x * 2 if x % 3 else None, range(10), workers=3, queue_size=2)
+    assert sorted(results) == [2, 4, 8, 10, 14, 16]
+
+def test_iter_concurrent_skips_failed_items():
+    def func(x):
+        if x == 2:
+            raise ValueError('bad item')
+        return x
+    assert sorted(iter_concurrent(func, range(4), workers=2)) == [0, 1, 3]
+
+def test_iter_concurrent_reraises_producer_error_after_draining():
+    def items():
+        yield from range(5)
+        raise RuntimeError('list page failed')
+
+    results = []
+    with pytest.raises(RuntimeError, match='list page failed'):
+        for result in iter_concurrent(lambda x: x, items(), workers=2):
+            results.append(result)
+    # 出错前已入队的项仍然处理完
+    assert sorted(results) == [0, 1, 2, 3, 4]
+
+def test_streaming_pipeline_runs_stages_in_order():
+    pipeline = (
+        StreamingPipeline(queue_size=4)
+        .map('double', lambda x: x * 2)
+        .batch('sum_pairs', lambda batch: [sum(batch)], batch_size=2, flush_interval=1.0)
+    )
+    assert list(pipeline.run(range(5))) == [2, 10, 8]
+
+def test_streaming_pipeline_flushes_partial_batches_on_interval():
+    batches = []
+
+    def record(batch):
+        batches.append(list(batch))
+        return batch
+
+    def slow_source():
+        yield 1
+        time.sleep(0.3)
+        yield 2
+
+    pipeline = StreamingPipeline().batch('save', record, batch_size=10, flush_interval=0.1)
+    assert list(pipeline.run(slow_source())) == [1, 2]
+    assert batches == [[1], [2]]
+
+def test_streaming_pipeline_reraises_source_failure():
+    def source():
+        yield 1
+        raise RuntimeError('list page failed')
+
+    pipeline = StreamingPipeline().batch('save', lambda batch: batch, batch_size=1, flush_interval=0.1)
+    with pytest.raises(RuntimeError, match='list page failed'):
+        list(pipeline.run(source()))
+
+def test_streaming_pipeline_stops_on_batch_failure():
+    saved = []
+
+    def save(batch):
+        if 3 in batch:
+            raise ConnectionError('database down')
+        saved.extend(batch)
+        return batch
+
+    pipeline = StreamingPipeline(queue_size=2).batch('save', save, batch_size=1, flush_interval=0.1)
+    with pytest.raises(ConnectionError, match='database down'):
+        list(pipeline.run(range(100)))
+    # 入库失败后不再处理后续批次
+    assert saved == [0, 1, 2]
+
+def test_streaming_pipeline_map_failures_drop_only_that_item():
+    def parse(x):
+        if x == 1:
+            raise ValueError('bad page')
+        return x
+
+    assert list(StreamingPipeline().map('parse', parse).run(range(3))) == [0, 2]
@@ -0,0 +1,190 @@
+import time
+
+import fakeredis
+import pytest
+
+from crawler.core import proxy_pool as proxy_pool_module
+from crawler.core.proxy_pool import FileProxyStore, ProxyPool, RedisProxyStore
+
+@pytest.fixture(autouse=True)
+def no_network(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('unexpected network request')
+    monkeypatch.setattr(proxy_pool_module.requests, 'get', fail)
+
+def record(address, **fields):
+    return {'proxy': address, 'response_time': 0.5, 'latency': 0.5, 'success_rate': 1.0, 'success_count': 0,
+            'fail_count': 0, 'status': 'active', 'checked_at': time.time(), **fields}
+
+def test_warm_start_from_snapshot_without_network(tmp_path):
+    store = FileProxyStore(str(tmp_path / 'proxies.json'))
+    store.save([record('1.1.1.1:80'), record('2.2.2.2:80', status='unchecked')])
+
+    pool = ProxyPool(store=store, autostart=False)
+    assert pool.get_proxy() == {'http': 'http://1.1.1.1:80', 'https': 'http://1.1.1.1:80'}
+    assert pool.get_proxy()['http'] == 'http://1.1.1.1:80'
+    assert pool.get_stats()['unchecked_proxies'] == 1
+
+def test_snapshot_round_trip_through_redis():
+    store = RedisProxyStore(fakeredis.FakeRedis())
+    pool = ProxyPool(store=store, autostart=False)
+    pool._discover = lambda: None
+    pool.proxies['1.1.1.1:80'] = pool._new_proxy('1.1.1.1:80')
+    pool._apply_results({'1.1.1.1:80': {'response_time': 0.2}})
+    pool.stop()
+
+    saved = store.load()
+    assert [(r['proxy'], r['status'], r['latency']) for r in saved] == [('1.1.1.1:80', 'active', 0.2)]
+    assert 'last_used' not in saved[0]
+    assert ProxyPool(store=store, autostart=False).get_proxy()['http'] == 'http://1.1.1.1:80'
+
+def test_empty_pool_returns_immediately_and_wakes_validator():
+    pool = ProxyPool(autostart=False)
+    assert pool.get_proxy() is None
+    assert pool.wakeup.is_set()
+
+def test_validation_results():
+    pool = ProxyPool(autostart=False)
+    for address in ('new-bad:80', 'new-good:80'):
+        pool.proxies[address] = pool._new_proxy(address)
+    pool._apply_results({'new-bad:80': None, 'new-good:80': {'response_time': 0.3}})
+    assert list(pool.proxies) == ['new-good:80']
+    assert pool.get_proxy()['http'] == 'http://new-good:80'
+
+    # 已可用的代理连续3次验证失败才移除
+    pool._apply_results({'new-good:80': None})
+    pool._apply_results({'new-good:80': None})
+    assert 'new-good:80' in pool.proxies
+    pool._apply_results({'new-good:80': None})
+    assert pool.proxies == {}
+
+def test_background_validator_discovers_and_persists(tmp_path, monkeypatch):
+    store = FileProxyStore(str(tmp_path / 'proxies.json'))
+    pool = ProxyPool(store=store, autostart=False)
+    monkeypatch.setattr(pool, '_fetch_free_proxies', lambda: ['1.1.1.1:80', '2.2.2.2:80'])
+    monkeypatch.setattr(pool, '_test_proxy', lambda address: {'response_time': 0.1} if address.startswith('1.') else None)
+
+    pool.start()
+    deadline = time.monotonic() + 5
+    while pool._active_count() == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.stop(timeout=5)
+
+    assert not pool.validator.is_alive()
+    assert list(pool.proxies) == ['1.1.1.1:80']
+    assert [r['proxy'] for r in store.load()] == ['1.1.1.1:80']
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(proxy_pool_module, 'time', clock)
+    return clock
+
+def make_pool(*latencies, **options):
+    pool = ProxyPool(autostart=False, **options)
+    for i, latency in enumerate(latencies):
+        address = f"10.0.0.{i}:80"
+        pool.proxies[address] = pool._new_proxy(address)
+        pool._apply_results({address: {'response_time': latency}})
+    return pool
+
+def picks(pool, count):
+    return [pool.get_proxy()['http'].split('//')[1] for _ in range(count)]
+
+def test_selection_is_proportional_to_cost(clock):
+    pool = make_pool(0.1, 0.3)
+    chosen = picks(pool, 400)
+    assert chosen.count('10.0.0.0:80') == pytest.approx(300, abs=2)
+
+    # 成功率下降的代理代价变大，被选中的比例随之下降
+    for _ in range(5):
+        pool.report('10.0.0.0:80', False)
+        pool.report('10.0.0.0:80', True, latency=0.1)
+    chosen = picks(pool, 400)
+    assert chosen.count('10.0.0.0:80') < 300
+
+def test_report_updates_ewma(clock):
+    pool = make_pool(1.0, smoothing=0.5)
+    pool.report('10.0.0.0:80', True, latency=3.0)
+    assert pool.proxies['10.0.0.0:80']['latency'] == 2.0
+    pool.report('10.0.0.0:80', False)
+    assert pool.proxies['10.0.0.0:80']['success_rate'] == 0.5
+    # 失败不更新延迟
+    assert pool.proxies['10.0.0.0:80']['latency'] == 2.0
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    pool = make_pool(0.1, 0.1, failure_threshold=3, min_success_rate=0.0)
+    pool.report('10.0.0.0:80', False)
+    pool.report('10.0.0.0:80', False)
+    pool.report('10.0.0.0:80', True)
+    pool.report('10.0.0.0:80', False)
+    pool.report('10.0.0.0:80', False)
+    assert pool.proxies['10.0.0.0:80']['breaker'] == 'closed'
+
+    pool.report('10.0.0.0:80', False)
+    assert pool.proxies['10.0.0.0:80']['breaker'] == 'open'
+    assert pool.get_stats()['open_circuits'] == 1
+    assert set(picks(pool, 10)) == {'10.0.0.1:80'}
+
+def test_low_success_rate_opens_breaker(clock):
+    pool = make_pool(0.1, failure_threshold=100, min_success_rate=0.5, smoothing=0.3)
+    pool.report('10.0.0.0:80', False)
+    assert pool.proxies['10.0.0.0:80']['breaker'] == 'closed'
+    pool.report('10.0.0.0:80', False)
+    assert pool.proxies['10.0.0.0:80']['breaker'] == 'open'
+
+def test_half_open_probe_after_cooldown(clock):
+    pool = make_pool(0.1, 0.1, cooldown=30)
+    pool.mark_bad_proxy('10.0.0.0:80')
+    assert set(picks(pool, 3)) == {'10.0.0.1:80'}
+
+    clock.advance(30)
+    # 冷却结束只放行一个探测请求
+    assert picks(pool, 3) == ['10.0.0.0:80', '10.0.0.1:80', '10.0.0.1:80']
+    assert pool.proxies['10.0.0.0:80']['breaker'] == 'half_open'
+
+    pool.report('10.0.0.0:80', True, latency=0.1)
+    assert pool.proxies['10.0.0.0:80']['breaker'] == 'closed'
+    assert set(picks(pool, 4)) == {'10.0.0.0:80', '10.0.0.1:80'}
+
+def test_failed_probe_doubles_cooldown(clock):
+    pool = make_pool(0.1, 0.1, cooldown=30, max_cooldown=100)
+    pool.mark_bad_proxy('10.0.0.0:80')
+    clock.advance(30)
+    assert picks(pool, 1) == ['10.0.0.0:80']
+    pool.report('10.0.0.0:80', False)
+    assert pool.proxies['10.0.0.0:80']['breaker'] == 'open'
+
+    clock.advance(59)
+    assert '10.0.0.0:80' not in picks(pool, 3)
+    clock.advance(1)
+    assert picks(pool, 1) == ['10.0.0.0:80']
+    pool.report('10.0.0.0:80', False)
+    # 冷却时间不超过 max_cooldown
+    clock.advance(99)
+    assert '10.0.0.0:80' not in picks(pool, 3)
+    clock.advance(1)
+    assert picks(pool, 1) == ['10.0.0.0:80']
+
+def test_unreported_probe_is_retried_after_cooldown(clock):
+    pool = make_pool(0.1, 0.1, cooldown=30)
+    pool.mark_bad_proxy('10.0.0.0:80')
+    clock.advance(30)
+    assert picks(pool, 1) == ['10.0.0.0:80']
+    assert '10.0.0.0:80' not in picks(pool, 3)
+
+    clock.advance(30)
+    assert picks(pool, 1) == ['10.0.0.0:80']
@@ -0,0 +1,78 @@
+import fakeredis
+import pytest
+import redis
+
+from crawler.core import rate_limiter
+from crawler.core.rate_limiter import RateLimiter, RedisRateLimiter, TokenBucket, host_of
+
+class FakeClock:
+    """替代 time 模块：monotonic 只在 advance / sleep 时前进"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+def test_burst_then_reservations_queue_behind_each_other(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # 透支的令牌按到达顺序排队
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+def test_tokens_refill_with_time_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock.advance(0.5)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+    clock.advance(60)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, pytest.approx(0.5)]
+
+def test_limiter_keeps_one_bucket_per_host(clock):
+    limiter = RateLimiter(rate=1.0, burst=1)
+    assert limiter.reserve('https://jobs.51job.com/a') == 0.0
+    assert limiter.reserve('https://we.51job.com/list') == 0.0
+    assert limiter.reserve('https://JOBS.51job.com/b') == pytest.approx(1.0)
+    assert host_of('we.51job.com') == 'we.51job.com'
+
+def test_acquire_sleeps_only_when_over_budget(clock):
+    limiter = RateLimiter(rate=4.0, burst=1)
+    assert limiter.acquire('example.com') == 0.0
+    assert limiter.acquire('example.com') == pytest.approx(0.25)
+    assert clock.slept == [pytest.approx(0.25)]
+
+def test_redis_buckets_are_shared_between_processes():
+    client = fakeredis.FakeRedis()
+    first = RedisRateLimiter(client, rate=1.0, burst=2)
+    second = RedisRateLimiter(client, rate=1.0, burst=2)
+    assert first.reserve('example.com') == 0.0
+    assert second.reserve('example.com') == 0.0
+    assert first.reserve('example.com') > 0.5
+
+def test_redis_limiter_falls_back_to_local_bucket(clock):
+    limiter = RedisRateLimiter(fakeredis.FakeRedis(), rate=1.0, burst=1)
+
+    def unavailable(*args, **kwargs):
+        raise redis.ConnectionError('down')
+    limiter._script = unavailable
+    assert limiter.reserve('example.com') == 0.0
+    assert limiter.reserve('example.com') == pytest.approx(1.0)
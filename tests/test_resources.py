@@ -0,0 +1,34 @@
+import pytest
+
+from crawler.core.crawler_manager import CrawlerConfig
+from crawler.core.resources import ResourceRegistry
+
+@pytest.fixture
+def registry():
+    registry = ResourceRegistry()
+    yield registry
+    registry.close()
+
+def make_config(tmp_path, **overrides):
+    options = {'proxy_enabled': False, 'proxy_persistence': 'none', 'http2_enabled': False,
+               'proxy_store_path': str(tmp_path / 'proxies.json')}
+    options.update(overrides)
+    return CrawlerConfig(**options)
+
+def test_same_config_shares_transport_and_proxy_pool(registry, tmp_path):
+    first, second = make_config(tmp_path), make_config(tmp_path)
+    assert registry.transport(first) is registry.transport(second)
+    assert registry.proxy_pool(first) is registry.proxy_pool(second)
+
+def test_different_pool_sizes_get_separate_transports(registry, tmp_path):
+    small = registry.transport(make_config(tmp_path, http_pool_maxsize=4))
+    large = registry.transport(make_config(tmp_path, http_pool_maxsize=32))
+    assert small is not large
+    assert small.adapter._pool_maxsize == 4
+    assert large.adapter._pool_maxsize == 32
+
+def test_different_proxy_settings_get_separate_pools(registry, tmp_path):
+    default = registry.proxy_pool(make_config(tmp_path))
+    strict = registry.proxy_pool(make_config(tmp_path, proxy_failure_threshold=1))
+    assert default is not strict
+    assert strict.failure_threshold == 1
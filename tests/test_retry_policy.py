@@ -0,0 +1,66 @@
+import pytest
+import requests
+
+from crawler.core import retry_policy
+from crawler.core.retry_policy import RetryBudget, RetryPolicy
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retry_policy, 'time', clock)
+    # 退避取上限，便于断言
+    monkeypatch.setattr(retry_policy.random, 'uniform', lambda low, high: high)
+    return clock
+
+class StatusError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.headers = headers or {}
+
+def failed_attempt(policy, error):
+    policy.begin_attempt()
+    return policy.next_delay(error)
+
+def test_exponential_backoff_until_max_attempts(clock):
+    policy = RetryPolicy(max_attempts=3, deadline=60, base_delay=0.5, max_delay=8, budget=RetryBudget(0, 10))
+    error = requests.exceptions.ConnectionError('reset')
+    assert failed_attempt(policy, error) == 0.5
+    assert failed_attempt(policy, error) == 1.0
+    assert failed_attempt(policy, error) is None
+    assert policy.budget.stats.failures == 1
+
+def test_client_errors_are_not_retried(clock):
+    policy = RetryPolicy(budget=RetryBudget())
+    assert failed_attempt(policy, StatusError(404)) is None
+    assert failed_attempt(RetryPolicy(budget=RetryBudget()), StatusError(413)) is None
+
+def test_retry_after_is_honoured(clock):
+    policy = RetryPolicy(deadline=60, base_delay=0.5, budget=RetryBudget())
+    assert failed_attempt(policy, StatusError(429, {'Retry-After': '5'})) == 5.0
+
+def test_deadline_stops_retries(clock):
+    policy = RetryPolicy(max_attempts=5, deadline=10, base_delay=4, max_delay=8, budget=RetryBudget())
+    clock.now = 7.0
+    assert failed_attempt(policy, StatusError(503)) is None
+    assert policy.budget.stats.deadline_exceeded == 1
+    assert policy.attempt_timeout(30) == pytest.approx(3.0)
+
+def test_budget_runs_out_across_requests(clock):
+    budget = RetryBudget(ratio=0.5, min_retries=1)
+    policies = [RetryPolicy(max_attempts=5, deadline=60, budget=budget) for _ in range(4)]
+    # 预算 = 1 + 0.5 * 4 = 3 次重试
+    delays = [failed_attempt(policy, StatusError(503)) for policy in policies]
+    assert [delay is not None for delay in delays] == [True, True, True, False]
+    assert budget.stats.retries == 3
+    assert budget.stats.budget_exhausted == 1
+
+    previous = budget.reset()
+    assert previous.requests == 4 and budget.stats.requests == 0
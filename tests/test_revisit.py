@@ -0,0 +1,122 @@
+import json
+
+import fakeredis
+import pytest
+
+from crawler.core import revisit as revisit_module
+from crawler.core.revisit import RevisitScheduler
+from tests.stub_site import StubSite, make_manager
+
+HOUR = 3600
+DAY = 86400
+NOW = 1_000_000_000.0
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+@pytest.fixture
+def scheduler(redis_client):
+    return RevisitScheduler(redis_client, '51job', min_interval=6 * HOUR, max_interval=30 * DAY,
+                            initial_interval=3 * DAY)
+
+def detail(source_id, description='d', **fields):
+    return {'source': '51job', 'source_id': source_id, 'url': f"u{source_id}", 'description': description, **fields}
+
+def next_visit(scheduler, source_id):
+    return scheduler.redis.zscore(scheduler.queue_key, source_id)
+
+def interval(scheduler, source_id):
+    return json.loads(scheduler.redis.hget(scheduler.state_key, source_id))['interval']
+
+def test_interval_backs_off_when_unchanged_and_shrinks_on_change(scheduler):
+    assert scheduler.observe([detail('1')], now=NOW) == {'1': False}
+    assert next_visit(scheduler, '1') == NOW + 3 * DAY
+
+    assert scheduler.observe([detail('1')], now=NOW + 3 * DAY) == {'1': False}
+    assert interval(scheduler, '1') == 4.5 * DAY
+
+    assert scheduler.observe([detail('1', 'new')], now=NOW + 8 * DAY) == {'1': True}
+    assert interval(scheduler, '1') == 2.25 * DAY
+    assert next_visit(scheduler, '1') == NOW + 8 * DAY + 2.25 * DAY
+    assert scheduler.get_stats()['visits'] == 2
+    assert scheduler.get_stats()['changes'] == 1
+
+def test_interval_is_clamped(scheduler):
+    scheduler.observe([detail('1')], now=NOW)
+    for i in range(10):
+        scheduler.observe([detail('1', str(i))], now=NOW)
+    assert interval(scheduler, '1') == 6 * HOUR
+
+    for i in range(20):
+        scheduler.observe([detail('1', '9')], now=NOW)
+    assert interval(scheduler, '1') == 30 * DAY
+
+def test_deadline_caps_interval_and_expired_jobs_are_dropped(scheduler):
+    deadline = '2026-10-20'
+    now = revisit_module._deadline_ts(deadline) - DAY
+    scheduler.observe([detail('1', deadline=deadline)], now=now)
+    assert next_visit(scheduler, '1') == now + DAY / 2
+
+    scheduler.observe([detail('1', deadline=deadline)], now=now + 2 * DAY)
+    assert next_visit(scheduler, '1') is None
+    assert scheduler.redis.hget(scheduler.state_key, '1') is None
+
+def test_volatile_source_schedules_new_jobs_sooner(scheduler):
+    jobs = [detail(str(i)) for i in range(20)]
+    scheduler.observe(jobs, now=NOW)
+    scheduler.observe([detail(str(i), 'changed') for i in range(20)], now=NOW)
+    assert scheduler.source_change_rate() == 1.0
+
+    scheduler.observe([detail('new')], now=NOW)
+    assert next_visit(scheduler, 'new') == NOW + 1.5 * DAY
+
+def test_due_returns_earliest_first_and_leases_them(scheduler):
+    for i, offset in enumerate((3 * DAY, 1 * DAY, 2 * DAY)):
+        scheduler.initial_interval = offset
+        scheduler.observe([detail(str(i))], now=NOW)
+
+    assert scheduler.due(10, now=NOW + DAY / 2) == []
+    due = scheduler.due(2, now=NOW + 4 * DAY)
+    assert [source_id for source_id, _ in due] == ['1', '2']
+    assert due[0][1]['url'] == 'u1'
+    # 已取出的职位顺延 min_interval，不会被立即重复取出
+    assert [source_id for source_id, _ in scheduler.due(10, now=NOW + 4 * DAY)] == ['0']
+    assert scheduler.due(10, now=NOW + 4 * DAY + 6 * HOUR - 1) == []
+    assert len(scheduler.due(10, now=NOW + 4 * DAY + 6 * HOUR)) == 3
+
+class FakeClock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def manager(redis_client, tmp_path):
+    manager, resources = make_manager(redis_client, tmp_path)
+    yield manager
+    resources.close()
+
+def test_revisit_yields_only_changed_details(manager, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(revisit_module, 'time', clock)
+    crawler = manager.crawlers[0]
+    site = StubSite(crawler, pages=1, per_page=3)
+    manager.run_crawler(crawler, 'a', collect=False)
+    assert crawler.revisits.get_stats()['scheduled'] == 3
+
+    clock.now += 3 * DAY
+    site.detail_fetches.clear()
+    crawler._parse_job_detail = lambda html, base: dict(
+        base, description='changed' if base['source_id'] == 'a-1-1' else 'd'
+    )
+    changed = list(crawler.iter_revisits(10))
+    assert [job['source_id'] for job in changed] == ['a-1-1']
+    assert sorted(site.detail_fetches) == ['ua-1-0', 'ua-1-1', 'ua-1-2']
+    assert crawler.forced_updates == {'a-1-1'}
+
+    # 变化的职位入库后不再重复记录访问
+    site.save(changed)
+    assert crawler.forced_updates == set()
+    assert crawler.revisits.get_stats()['visits'] == 3
@@ -0,0 +1,23 @@
+from crawler.core.transport import PooledHTTPAdapter
+
+def test_adapter_evicts_least_recently_used_proxy():
+    adapter = PooledHTTPAdapter(max_proxies=2)
+    for port in (1, 2, 3):
+        adapter.proxy_manager_for(f"http://127.0.0.1:{port}")
+
+    assert list(adapter.proxy_manager) == ["http://127.0.0.1:2", "http://127.0.0.1:3"]
+
+def test_adapter_keeps_proxy_in_use_until_released():
+    adapter = PooledHTTPAdapter(max_proxies=1)
+    busy = "http://127.0.0.1:1"
+    adapter.hold(busy)
+    manager = adapter.proxy_manager_for(busy)
+    adapter.proxy_manager_for("http://127.0.0.1:2")
+
+    # 在用的代理不淘汰，暂时超出上限
+    assert busy in adapter.proxy_manager
+    assert adapter.proxy_manager[busy] is manager
+
+    adapter.release(busy)
+    assert list(adapter.proxy_manager) == ["http://127.0.0.1:2"]
+    assert adapter.in_use == {}
@@ -0,0 +1,118 @@
+import fakeredis
+import pytest
+
+from crawler.core import watermark as watermark_module
+from crawler.core.query_planner import CrawlQuery
+from crawler.core.watermark import WatermarkStore
+from tests.stub_site import StubSite, list_job, make_manager
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(watermark_module, 'time', clock)
+    return clock
+
+def test_advance_never_moves_back(redis_client):
+    store = WatermarkStore(redis_client, '51job')
+    store.advance('k', '2026-10-05', '5')
+    store.advance('k', '2026-10-03', '3')
+    assert store.get('k')['publish_date'] == '2026-10-05'
+    assert store.get('k')['source_id'] == '5'
+
+    store.advance('k', '2026-10-06', '6')
+    assert store.get('k')['publish_date'] == '2026-10-06'
+
+def test_non_iso_dates_are_ignored(redis_client):
+    store = WatermarkStore(redis_client, '51job')
+    store.advance('k', '10-05发布', '1')
+    store.advance('k', None, '2')
+    assert store.get('k') == {}
+
+    store.advance('k', '2026-10-05', '3')
+    mark = store.get('k')
+    assert store.is_behind(mark, '2026-10-05')
+    assert store.is_behind(mark, '2026-10-01')
+    assert not store.is_behind(mark, '2026-10-06')
+    # 解析不出的日期视为新职位
+    assert not store.is_behind(mark, '昨天')
+    assert not store.is_behind({}, '2026-10-01')
+
+def test_full_sweep_is_due_without_watermark_or_after_interval(redis_client, clock):
+    store = WatermarkStore(redis_client, '51job')
+    assert store.needs_full_sweep('k', 3600)
+
+    store.mark_full_sweep('k')
+    # 没有水位线时仍需要全量扫描
+    assert store.needs_full_sweep('k', 3600)
+
+    store.advance('k', '2026-10-05', '1')
+    assert not store.needs_full_sweep('k', 3600)
+    clock.advance(3599)
+    assert not store.needs_full_sweep('k', 3600)
+    clock.advance(1)
+    assert store.needs_full_sweep('k', 3600)
+
+@pytest.fixture
+def manager(redis_client, tmp_path):
+    manager, resources = make_manager(redis_client, tmp_path, incremental=True, full_sweep_interval=3600)
+    yield manager
+    resources.close()
+
+@pytest.fixture
+def site(manager):
+    site = StubSite(manager.crawlers[0])
+    # 列表按发布日期倒序：第1页最新
+    site.listings['a'] = [
+        [list_job(f"{page}-{i}", f"2026-10-0{5 - page}") for i in range(3)]
+        for page in range(1, 5)
+    ]
+    return site
+
+def test_incremental_run_stops_at_known_page(manager, site, clock):
+    crawler = manager.crawlers[0]
+    manager.run_crawler(crawler, 'a', collect=False)
+    # 没有水位线时全量扫描
+    assert site.list_fetches == [('a', 1), ('a', 2), ('a', 3), ('a', 4), ('a', 5)]
+    assert crawler.watermarks.get('a')['publish_date'] == '2026-10-04'
+
+    site.list_fetches.clear()
+    site.saved.clear()
+    manager.run_crawler(crawler, 'a', collect=False)
+    assert site.list_fetches == [('a', 1)]
+    assert site.saved == []
+
+def test_new_job_on_first_page_keeps_paging(manager, site, clock):
+    crawler = manager.crawlers[0]
+    manager.run_crawler(crawler, 'a', collect=False)
+
+    site.listings['a'][0].insert(0, list_job('new', '2026-10-06'))
+    site.list_fetches.clear()
+    site.saved.clear()
+    manager.run_crawler(crawler, 'a', collect=False)
+    # 第1页有新职位，翻到全是已知职位的第2页停止
+    assert site.list_fetches == [('a', 1), ('a', 2)]
+    assert site.saved == ['new']
+    assert crawler.watermarks.get('a')['publish_date'] == '2026-10-06'
+
+def test_periodic_full_sweep_pages_to_the_end(manager, site, clock):
+    crawler = manager.crawlers[0]
+    manager.run_crawler(crawler, 'a', collect=False)
+
+    clock.advance(3600)
+    site.list_fetches.clear()
+    manager.run_crawler(crawler, 'a', collect=False)
+    assert len(site.list_fetches) == 5
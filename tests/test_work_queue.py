@@ -0,0 +1,157 @@
+import time
+
+import fakeredis
+import pytest
+
+from crawler.core.work_queue import WorkQueue
+from crawler.core.worker import CrawlWorker, detail_task
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+def make_queue(redis_client, **kwargs):
+    options = {'visibility_timeout': 30, 'max_attempts': 3, 'retry_delay': 0}
+    options.update(kwargs)
+    return WorkQueue(redis_client, name='test', **options)
+
+def test_put_deduplicates_pending_tasks(redis_client):
+    queue = make_queue(redis_client)
+    assert queue.put([{'id': 'a'}, {'id': 'b'}, {'id': 'a'}]) == 2
+    assert queue.put([{'id': 'a'}]) == 0
+    assert queue.get_stats() == {'ready': 2, 'leased': 0, 'dead': 0, 'pending': 2}
+
+def test_lease_hides_tasks_until_ack(redis_client):
+    queue = make_queue(redis_client)
+    queue.put([{'id': 'a', 'payload': 1}, {'id': 'b'}])
+
+    tasks = queue.lease(5)
+    assert [(task['id'], task['_attempt']) for task in tasks] == [('a', 1), ('b', 1)]
+    assert tasks[0]['payload'] == 1
+    assert queue.lease(5) == []
+
+    assert queue.ack(tasks) == 2
+    assert queue.get_stats() == {'ready': 0, 'leased': 0, 'dead': 0, 'pending': 0}
+    # 完成后同一ID可以再次入队
+    assert queue.put([{'id': 'a'}]) == 1
+
+def test_expired_lease_is_reclaimed_and_stale_ack_rejected(redis_client):
+    queue = make_queue(redis_client, visibility_timeout=0.05)
+    queue.put([{'id': 'a'}])
+
+    first = queue.lease(1)
+    time.sleep(0.1)
+    second = queue.lease(1)
+    assert [task['_attempt'] for task in second] == [2]
+
+    # 原持有者的租约已失效，确认和失败都不生效
+    assert queue.ack(first) == 0
+    assert queue.fail(first[0], 'late') == 0
+    assert queue.ack(second) == 1
+
+def test_failed_task_retries_then_moves_to_dead_letters(redis_client):
+    queue = make_queue(redis_client, max_attempts=2)
+    queue.put([{'id': 'a'}])
+
+    task = queue.lease(1)[0]
+    assert queue.fail(task, 'boom 1') == 1
+    task = queue.lease(1)[0]
+    assert task['_attempt'] == 2
+    assert queue.fail(task, 'boom 2') == 2
+
+    assert queue.lease(1) == []
+    assert queue.get_stats() == {'ready': 0, 'leased': 0, 'dead': 1, 'pending': 0}
+    dead = queue.dead_letters()
+    assert dead[0]['task'] == {'id': 'a'}
+    assert dead[0]['attempts'] == 2
+    assert dead[0]['error'] == 'boom 2'
+
+    assert queue.requeue_dead() == 1
+    assert queue.lease(1)[0]['_attempt'] == 1
+
+def test_expired_lease_at_max_attempts_is_buried(redis_client):
+    queue = make_queue(redis_client, visibility_timeout=0.05, max_attempts=1)
+    queue.put([{'id': 'a'}])
+    queue.lease(1)
+    time.sleep(0.1)
+
+    assert queue.lease(1) == []
+    assert queue.get_stats()['dead'] == 1
+
+class StubCleaner:
+    def start_run(self):
+        pass
+
+    def clean_batch(self, jobs):
+        return jobs
+
+class StubCrawler:
+    """按 source_id 决定详情抓取是否失败，记录入库的职位"""
+
+    def __init__(self, failing=(), save_error=None):
+        self.data_cleaner = StubCleaner()
+        self.failing = set(failing)
+        self.save_error = save_error
+        self.saved = []
+
+    def fetch_detail(self, job):
+        if job['source_id'] in self.failing:
+            return None
+        return dict(job, description='d')
+
+    def run_list_task(self, task):
+        jobs = [{'source_id': f"{task['page']}-{i}", 'url': f"u{task['page']}-{i}"} for i in range(2)]
+        next_task = {'id': 'site:list:2', 'kind': 'list', 'site': 'site', 'page': 2} if task['page'] < 2 else None
+        return jobs, next_task
+
+    def select_for_update(self, jobs):
+        return jobs
+
+    def save_to_database(self, jobs):
+        if self.save_error:
+            raise self.save_error
+        self.saved.extend(job['source_id'] for job in jobs)
+
+def run_worker(queue, crawler):
+    worker = CrawlWorker({'site': crawler}, queue, batch_size=10, workers=2, poll_interval=0.01)
+    return worker.run(idle_timeout=0.05)
+
+def test_worker_acks_saved_details_and_fails_the_rest(redis_client):
+    queue = make_queue(redis_client, max_attempts=1)
+    crawler = StubCrawler(failing={'bad'})
+    queue.put([detail_task('site', {'source_id': sid, 'url': sid}) for sid in ('ok1', 'ok2', 'bad')])
+
+    stats = run_worker(queue, crawler)
+
+    assert sorted(crawler.saved) == ['ok1', 'ok2']
+    assert stats['acked'] == 2
+    assert stats['failed'] == 1
+    assert [entry['task']['id'] for entry in queue.dead_letters()] == ['site:detail:bad']
+    assert queue.get_stats()['pending'] == 0
+
+def test_worker_expands_list_tasks(redis_client):
+    queue = make_queue(redis_client)
+    crawler = StubCrawler()
+    queue.put([{'id': 'site:list:1', 'kind': 'list', 'site': 'site', 'page': 1}])
+
+    stats = run_worker(queue, crawler)
+
+    assert sorted(crawler.saved) == ['1-0', '1-1', '2-0', '2-1']
+    assert stats['enqueued'] == 5
+    assert queue.get_stats() == {'ready': 0, 'leased': 0, 'dead': 0, 'pending': 0}
+
+def test_worker_nacks_whole_batch_when_save_fails(redis_client):
+    queue = make_queue(redis_client, max_attempts=2)
+    crawler = StubCrawler(save_error=RuntimeError('db down'))
+    queue.put([detail_task('site', {'source_id': sid, 'url': sid}) for sid in ('a', 'b')])
+
+    worker = CrawlWorker({'site': crawler}, queue, batch_size=10, workers=2)
+    worker.process(queue.lease(10))
+    assert worker.stats['failed'] == 2
+    assert worker.stats['acked'] == 0
+
+    # 数据库恢复后重试成功
+    crawler.save_error = None
+    worker.process(queue.lease(10))
+    assert sorted(crawler.saved) == ['a', 'b']
+    assert queue.get_stats()['pending'] == 0